@@ -0,0 +1,80 @@
+"""
+回测吞吐量基准
+用随机游走 K 线分别运行向量化回测（均线信号）和事件回测（逐根下限价单），统计每秒处理的 K 线数
+
+用法:
+    python examples/benchmark_backtest.py                  # 向量化 2 × 1000000 根，事件 2 × 20000 根
+    python examples/benchmark_backtest.py -n 5000000 --event-bars 50000
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from trade_pilot import Backtester
+
+
+def random_walk(n: int, price: float, rng: np.random.Generator) -> pd.DataFrame:
+    """n 根 1 分钟随机游走 K 线"""
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.r_[price, close[:-1]]
+    return pd.DataFrame({
+        'timestamp': np.arange(n, dtype=np.int64) * 60_000,
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.001, n)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.001, n)),
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    })
+
+
+def sma_signal(df: pd.DataFrame, window: int = 20) -> np.ndarray:
+    """收盘价在均线之上做多、之下做空"""
+    close = df['close'].to_numpy()
+    total = np.cumsum(close)
+    sma = np.full(len(close), np.nan)
+    sma[window - 1:] = (total[window - 1:] - np.r_[0.0, total[:-window]]) / window
+    return np.sign(close - sma)
+
+
+def on_bar(client, bars):
+    """没有持仓和挂单时在收盘价下方挂买单，浮盈后平仓"""
+    positions = {p['symbol']: p for p in client.get_positions()}
+    for symbol, bar in bars.items():
+        position = positions.get(symbol)
+        if position is None and not client.get_open_orders(symbol):
+            client.create_limit_order(symbol, 'buy', 1000 / bar['close'], bar['close'] * 0.999)
+        elif position is not None and position['unrealizedPnl'] > 1:
+            client.close_position(symbol)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回测吞吐量基准")
+    parser.add_argument("-n", "--bars", type=int, default=1_000_000, help="向量化回测每个交易对的 K 线数")
+    parser.add_argument("--event-bars", type=int, default=20_000, help="事件回测每个交易对的 K 线数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    rng = np.random.default_rng(args.seed)
+
+    data = {'BTC': random_walk(args.bars, 45000, rng), 'ETH': random_walk(args.bars, 2300, rng)}
+    report = Backtester(data, timeframe='1m').run_vectorized(sma_signal)
+    print(f"vectorized:  {report['bars']} bars, {report['bars_per_second']:,.0f} bars/s")
+    for symbol, result in report['symbols'].items():
+        print(f"  {symbol}: pnl {result['pnl']:,.2f}, max drawdown {result['max_drawdown']:.1%}, "
+              f"turnover {result['turnover']:,.1f}x")
+
+    data = {symbol: df.iloc[:args.event_bars] for symbol, df in data.items()}
+    start = time.perf_counter()
+    report = Backtester(data, timeframe='1m').run(on_bar)
+    elapsed = time.perf_counter() - start
+    print(f"event:       {report['bars']} bars, {report['bars'] / elapsed:,.0f} bars/s")
+    print(f"  pnl {report['pnl']:,.2f}, max drawdown {report['max_drawdown']:.1%}, "
+          f"turnover {report['turnover']:,.1f}x, fills {report['trades']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+导入耗时基准
+在全新的子进程中分别导入 trade_pilot 的每个公开名称，统计冷启动耗时和新加载的模块数
+
+用法:
+    python examples/benchmark_imports.py            # 每个名称运行 5 次，取中位数
+    python examples/benchmark_imports.py -n 10 MockHyperliquidClient
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# 在子进程中执行：记录导入前后的模块数量和耗时
+_PROBE = """
+import json, sys, time
+before = len(sys.modules)
+start = time.perf_counter()
+import trade_pilot
+package_time = time.perf_counter() - start
+{import_stmt}
+total_time = time.perf_counter() - start
+print(json.dumps({{
+    "package_ms": package_time * 1000,
+    "total_ms": total_time * 1000,
+    "modules": len(sys.modules) - before,
+}}))
+"""
+
+
+def measure(name: str, runs: int) -> dict:
+    """在 runs 个全新进程中导入 name，返回耗时中位数（毫秒）和新加载的模块数"""
+    import_stmt = f"getattr(trade_pilot, {name!r})" if name else ""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(import_stmt=import_stmt)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "package_ms": statistics.median(s["package_ms"] for s in samples),
+        "total_ms": statistics.median(s["total_ms"] for s in samples),
+        "modules": samples[-1]["modules"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="trade_pilot 导入耗时基准")
+    parser.add_argument("names", nargs="*", help="要测量的公开名称（默认全部）")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="每个名称的运行次数")
+    args = parser.parse_args()
+
+    import trade_pilot
+    names = args.names or trade_pilot.__all__
+
+    print(f"{'name':<28}{'total (ms)':>12}{'modules':>10}")
+    print("-" * 50)
+    baseline = measure("", args.runs)
+    print(f"{'import trade_pilot':<28}{baseline['total_ms']:>12.1f}{baseline['modules']:>10}")
+    for name in names:
+        result = measure(name, args.runs)
+        print(f"{name:<28}{result['total_ms']:>12.1f}{result['modules']:>10}")
+
+
+if __name__ == "__main__":
+    main()
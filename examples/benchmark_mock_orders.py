@@ -0,0 +1,90 @@
+"""
+Mock 撮合引擎吞吐量基准
+随机下限价单 / 市价单、撤单和更新参考价，统计每秒处理的订单操作数
+（随机操作序列预先生成，计时只包含客户端调用）
+
+用法:
+    python examples/benchmark_mock_orders.py             # 默认 200000 次操作
+    python examples/benchmark_mock_orders.py -n 1000000 --seed 7
+"""
+import argparse
+import logging
+import random
+import time
+
+from trade_pilot import MockHyperliquidClient
+
+
+def _operations(operations: int, symbols: list, seed: int) -> list:
+    """预先生成随机操作 (动作, 交易对, 方向, 参数)，计时只包含客户端调用"""
+    rng = random.Random(seed)
+    ops = []
+    for _ in range(operations):
+        symbol = rng.choice(symbols)
+        action = rng.random()
+        side = 'buy' if rng.random() < 0.5 else 'sell'
+        if action < 0.6:
+            ops.append(('limit', symbol, side, 1 + rng.uniform(-0.002, 0.002)))
+        elif action < 0.85:
+            ops.append(('cancel', symbol, side, rng.random()))
+        elif action < 0.95:
+            ops.append(('market', symbol, side, None))
+        else:
+            ops.append(('price', symbol, side, 1 + rng.gauss(0, 0.0005)))
+    return ops
+
+
+def run(operations: int, seed: int) -> dict:
+    """执行 operations 次随机订单操作，返回耗时和账户状态"""
+    client = MockHyperliquidClient()
+    prices = client.prices
+    ops = _operations(operations, list(prices), seed)
+    open_ids = []
+
+    start = time.perf_counter()
+    for action, symbol, side, arg in ops:
+        if action == 'limit':
+            order = client.create_limit_order(symbol, side, 0.01, round(prices[symbol] * arg, 2))
+            if order['status'] == 'open':
+                open_ids.append((order['id'], symbol))
+        elif action == 'cancel':
+            if open_ids:
+                # 随机撤一个挂单：与末尾交换后弹出，O(1)
+                index = int(arg * len(open_ids))
+                open_ids[index], open_ids[-1] = open_ids[-1], open_ids[index]
+                client.cancel_order(*open_ids.pop())
+            else:
+                client.create_market_order(symbol, side, 0.01)
+        elif action == 'market':
+            client.create_market_order(symbol, side, 0.01)
+        else:
+            client.set_price(symbol, prices[symbol] * arg)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'elapsed': elapsed,
+        'ops_per_second': operations / elapsed,
+        'fills': len(client.engine.fills),
+        'positions': len(client.get_positions()),
+        'balance': client.get_balance()['total']['USDT'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock 撮合引擎吞吐量基准")
+    parser.add_argument("-n", "--operations", type=int, default=200_000, help="订单操作次数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    # 关闭逐笔订单日志（包括撤销已成交订单的警告），只测撮合本身
+    logging.disable(logging.WARNING)
+    result = run(args.operations, args.seed)
+    print(f"operations:   {args.operations}")
+    print(f"elapsed:      {result['elapsed']:.2f} s")
+    print(f"throughput:   {result['ops_per_second']:,.0f} ops/s")
+    print(f"positions:    {result['positions']}")
+    print(f"balance:      {result['balance']:,.2f} USDT")
+
+
+if __name__ == "__main__":
+    main()
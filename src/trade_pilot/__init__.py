@@ -1,20 +1,69 @@
 """
 Trade-Pilot: AI-Powered Trading Agent
 """
-from .hyperliquid_client import HyperliquidClient
-from .hyperliquid_sdk_client import HyperliquidSDKClient
-from .mock_client import MockHyperliquidClient
-from .agent import TradingAgent
-from .tools import create_trading_tools
+from typing import TYPE_CHECKING
 
 __version__ = "0.1.0"
-__all__ = [
-    "HyperliquidClient",
-    "HyperliquidSDKClient",
-    "MockHyperliquidClient",
-    "TradingAgent",
-    "create_trading_tools"
-]
+
+# 公开名称 -> 所在子模块。子模块在首次访问对应属性时才导入，
+# 例如只使用 MockHyperliquidClient 时不会加载 ccxt、hyperliquid SDK 和 langchain
+_LAZY_IMPORTS = {
+    "HyperliquidClient": ".hyperliquid_client",
+    "HyperliquidSDKClient": ".hyperliquid_sdk_client",
+    "AsyncHyperliquidSDKClient": ".hyperliquid_async_client",
+    "MockHyperliquidClient": ".mock_client",
+    "PaperTradingClient": ".paper_client",
+    "Backtester": ".backtest",
+    "BacktestClient": ".backtest",
+    "TradingAgent": ".agent",
+    "create_trading_tools": ".tools",
+    "MarketScreener": ".screener",
+    "ToolRegistry": ".tool_registry",
+    "CandleStore": ".candle_store",
+    "SubscriptionManager": ".subscriptions",
+    "MetadataCache": ".metadata_cache",
+    "RequestScheduler": ".rate_limiter",
+    "get_default_scheduler": ".rate_limiter",
+    "OrderIndex": ".order_index",
+    "new_cloid": ".order_index",
+    "OrderTracker": ".order_tracker",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+if TYPE_CHECKING:
+    from .hyperliquid_client import HyperliquidClient
+    from .hyperliquid_sdk_client import HyperliquidSDKClient
+    from .hyperliquid_async_client import AsyncHyperliquidSDKClient
+    from .mock_client import MockHyperliquidClient
+    from .paper_client import PaperTradingClient
+    from .backtest import Backtester, BacktestClient
+    from .agent import TradingAgent
+    from .tools import create_trading_tools
+    from .screener import MarketScreener
+    from .tool_registry import ToolRegistry
+    from .candle_store import CandleStore
+    from .subscriptions import SubscriptionManager
+    from .metadata_cache import MetadataCache
+    from .rate_limiter import RequestScheduler, get_default_scheduler
+    from .order_index import OrderIndex, new_cloid
+    from .order_tracker import OrderTracker
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # 缓存到模块全局变量，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 
 def main():
@@ -22,6 +71,8 @@ def main():
     import os
     import logging
     from dotenv import load_dotenv
+    from .hyperliquid_client import HyperliquidClient
+    from .agent import TradingAgent
 
     # 加载环境变量
     load_dotenv()
@@ -2,14 +2,19 @@
 交易 Agent
 使用 LangGraph 构建智能交易代理
 """
-from typing import TypedDict, Annotated, Sequence
+from typing import TYPE_CHECKING, TypedDict, Annotated, Sequence, List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain.tools import BaseTool
 from langgraph.graph import StateGraph, END
 import operator
 import logging
-from .hyperliquid_client import HyperliquidClient
 from .tools import create_trading_tools
+from .tool_registry import ToolRegistry
+
+if TYPE_CHECKING:
+    from .hyperliquid_client import HyperliquidClient
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +30,11 @@ class TradingAgent:
     
     def __init__(
         self,
-        hyperliquid_client: HyperliquidClient,
+        hyperliquid_client: "HyperliquidClient",
         openrouter_api_key: str,
-        model: str = "anthropic/claude-3.5-sonnet"
+        model: str = "anthropic/claude-3.5-sonnet",
+        max_tool_concurrency: int = 4,
+        extra_tools: Optional[List[BaseTool]] = None
     ):
         """
         初始化交易 Agent
@@ -36,11 +43,26 @@ class TradingAgent:
             hyperliquid_client: Hyperliquid 客户端
             openrouter_api_key: OpenRouter API 密钥
             model: 使用的模型名称
+            max_tool_concurrency: 只读工具并发执行的最大线程数（1 表示全部顺序执行；
+                客户端的 concurrent_reads 不为 True 时总是顺序执行）
+            extra_tools: 额外注册的工具（与交易工具同名时会覆盖）
         """
         self.client = hyperliquid_client
+        # 只有声明只读方法线程安全的客户端（concurrent_reads=True）才并发执行只读工具，
+        # Mock / 模拟盘 / 回测客户端的查询会推进撮合引擎，必须顺序执行
+        if not getattr(hyperliquid_client, "concurrent_reads", False):
+            max_tool_concurrency = 1
+        self.max_tool_concurrency = max(1, max_tool_concurrency)
+        self._tool_executor = ThreadPoolExecutor(
+            max_workers=self.max_tool_concurrency,
+            thread_name_prefix="trading-tool"
+        )
 
-        # 创建交易工具
-        self.tools = create_trading_tools(hyperliquid_client)
+        # 创建交易工具并按名称注册
+        self.tool_registry = ToolRegistry(create_trading_tools(hyperliquid_client))
+        if extra_tools:
+            self.tool_registry.extend(extra_tools, replace=True)
+        self.tools = self.tool_registry.tools()
 
         # 初始化 LLM（通过 OpenRouter）
         self.llm = ChatOpenAI(
@@ -74,23 +96,7 @@ class TradingAgent:
             last_message = messages[-1]
 
             # 执行工具调用
-            tool_calls = last_message.tool_calls
-            tool_messages = []
-
-            for tool_call in tool_calls:
-                tool_name = tool_call["name"]
-                tool_args = tool_call["args"]
-
-                # 查找并执行工具
-                tool = next((t for t in self.tools if t.name == tool_name), None)
-                if tool:
-                    result = tool.invoke(tool_args)
-                    # 创建 ToolMessage
-                    tool_message = ToolMessage(
-                        content=str(result),
-                        tool_call_id=tool_call["id"]
-                    )
-                    tool_messages.append(tool_message)
+            tool_messages = self._execute_tool_calls(last_message.tool_calls)
 
             # 返回工具执行结果
             return {"messages": tool_messages}
@@ -130,6 +136,56 @@ class TradingAgent:
         
         return workflow.compile()
     
+    def _execute_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[ToolMessage]:
+        """
+        执行一轮工具调用
+
+        客户端支持并发读取（concurrent_reads=True）时，连续的只读工具（read_only=True）
+        并发执行，否则全部顺序执行；下单、撤单、平仓等写操作作为分隔点按原顺序单独执行。
+        返回的 ToolMessage 与 tool_calls 顺序一致。
+        """
+        results: List[Any] = [None] * len(tool_calls)
+        batch: List[tuple] = []
+
+        def flush():
+            if not batch:
+                return
+            if len(batch) == 1 or self.max_tool_concurrency == 1:
+                for index, name, args in batch:
+                    results[index] = self.tool_registry.invoke(name, args)
+            else:
+                futures = [
+                    (index, self._tool_executor.submit(self.tool_registry.invoke, name, args))
+                    for index, name, args in batch
+                ]
+                for index, future in futures:
+                    results[index] = future.result()
+            batch.clear()
+
+        for index, tool_call in enumerate(tool_calls):
+            # 查找工具（未知工具直接返回错误信息，避免模型反复重试）
+            tool = self.tool_registry.get(tool_call["name"])
+            if tool is None:
+                results[index] = self.tool_registry.unknown_tool_error(tool_call["name"])
+                continue
+
+            if getattr(tool, "read_only", False):
+                batch.append((index, tool.name, tool_call["args"]))
+            else:
+                flush()
+                results[index] = self.tool_registry.invoke(tool.name, tool_call["args"])
+        flush()
+
+        # 创建 ToolMessage
+        return [
+            ToolMessage(
+                content=result,
+                tool_call_id=tool_call["id"],
+                status="success" if tool_call["name"] in self.tool_registry else "error"
+            )
+            for tool_call, result in zip(tool_calls, results)
+        ]
+
     def run(self, user_input: str, system_prompt: str = None) -> str:
         """
         运行 Agent
@@ -157,6 +213,9 @@ class TradingAgent:
                                 5. 获取当前持仓
                                 6. 获取实时行情
                                 7. 平仓
+                                8. 计算技术指标（SMA、EMA、RSI、ATR、布林带、MACD）
+                                9. 批量下单（一次提交多个订单，如挂单阶梯）
+                                10. 修改挂单的价格和数量（改价时优先使用，不要先取消再下单）
                                 
                                 在执行交易操作前，请务必：
                                 - 确认用户的交易意图
@@ -0,0 +1,210 @@
+"""
+K 线历史回补
+将长时间范围拆分为交易所单次请求上限以内的分段，并发拉取、去重、检测缺口
+"""
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import CandleStore, normalize_candles
+
+logger = logging.getLogger(__name__)
+
+# Hyperliquid candleSnapshot 单次最多返回 5000 根 K 线
+MAX_CANDLES_PER_REQUEST = 5000
+
+# K 线周期对应的毫秒数（Hyperliquid 支持的全部周期，1M 按 30 天计）
+TIMEFRAME_MS = {
+    '1m': 60 * 1000,
+    '3m': 3 * 60 * 1000,
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '30m': 30 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+    '2h': 2 * 60 * 60 * 1000,
+    '4h': 4 * 60 * 60 * 1000,
+    '8h': 8 * 60 * 60 * 1000,
+    '12h': 12 * 60 * 60 * 1000,
+    '1d': 24 * 60 * 60 * 1000,
+    '3d': 3 * 24 * 60 * 60 * 1000,
+    '1w': 7 * 24 * 60 * 60 * 1000,
+    '1M': 30 * 24 * 60 * 60 * 1000,
+}
+
+
+def find_gaps(candles: pd.DataFrame, interval_ms: int) -> List[Dict[str, int]]:
+    """
+    检测 K 线序列中的缺口
+
+    Args:
+        candles: 按时间排序的 K 线（timestamp 为毫秒）
+        interval_ms: 周期长度（毫秒）
+
+    Returns:
+        缺口列表，每项包含 start / end（缺失的第一根和最后一根 K 线时间）和 missing（缺失根数）
+    """
+    if len(candles) < 2:
+        return []
+
+    ts = candles['timestamp'].to_numpy(dtype='int64')
+    diffs = np.diff(ts)
+    # 允许 50% 误差，兼容按自然月划分的 1M 周期
+    idx = np.nonzero(diffs > interval_ms * 1.5)[0]
+    return [
+        {
+            'start': int(ts[i] + interval_ms),
+            'end': int(ts[i + 1] - interval_ms),
+            'missing': int(round(diffs[i] / interval_ms)) - 1,
+        }
+        for i in idx
+    ]
+
+
+class OHLCVBackfiller:
+    """
+    K 线历史回补引擎
+
+    - 按 max_bars_per_request 将 [start, end] 拆分为多个请求
+    - 最多 max_workers 个请求同时进行，结果按时间顺序逐段产出（流式）
+    - 相邻分段重叠的 K 线只保留一次
+    - 指定 store 时每一段拉取完成后立即写入 CandleStore
+
+    示例:
+        backfiller = OHLCVBackfiller(fetch_chunk, max_workers=4)
+        result = backfiller.backfill("BTC", "1m", start_ms, end_ms)
+        print(result['bars'], result['gaps'])
+    """
+
+    def __init__(
+        self,
+        fetch_chunk: Callable[[str, str, int, int], Any],
+        max_bars_per_request: int = MAX_CANDLES_PER_REQUEST,
+        max_workers: int = 4,
+        store: Optional[CandleStore] = None
+    ):
+        """
+        初始化回补引擎
+
+        Args:
+            fetch_chunk: 拉取单段 K 线的函数 (symbol, timeframe, start_ms, end_ms) -> DataFrame
+            max_bars_per_request: 单次请求的最大 K 线数量
+            max_workers: 最大并发请求数
+            store: K 线存储（可选）
+        """
+        self._fetch_chunk = fetch_chunk
+        self.max_bars_per_request = max_bars_per_request
+        self.max_workers = max(1, max_workers)
+        self.store = store
+
+        self.requests = 0
+
+    def plan(self, start_ms: int, end_ms: int, interval_ms: int) -> List[Tuple[int, int]]:
+        """
+        将时间范围拆分为请求分段
+
+        Args:
+            start_ms: 开始时间（毫秒）
+            end_ms: 结束时间（毫秒）
+            interval_ms: 周期长度（毫秒）
+
+        Returns:
+            [(分段开始, 分段结束), ...]
+        """
+        start = start_ms - start_ms % interval_ms
+        span = self.max_bars_per_request * interval_ms
+        ranges = []
+        while start <= end_ms:
+            ranges.append((start, min(start + span - 1, end_ms)))
+            start += span
+        return ranges
+
+    def iter_chunks(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        按时间顺序逐段产出 K 线（已去重）
+
+        Args:
+            symbol: 交易对符号
+            timeframe: 时间周期
+            start_ms: 开始时间（毫秒）
+            end_ms: 结束时间（毫秒，默认当前时间）
+
+        Yields:
+            每个分段的 K 线 DataFrame
+        """
+        if timeframe not in TIMEFRAME_MS:
+            raise ValueError(f"不支持的时间周期: {timeframe}")
+        if end_ms is None:
+            end_ms = int(time.time() * 1000)
+
+        ranges = iter(self.plan(start_ms, end_ms, TIMEFRAME_MS[timeframe]))
+        last_ts = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ohlcv-backfill") as pool:
+            pending = deque(
+                pool.submit(self._fetch_chunk, symbol, timeframe, start, end)
+                for start, end in islice(ranges, self.max_workers)
+            )
+            while pending:
+                chunk = normalize_candles(pending.popleft().result())
+                self.requests += 1
+
+                # 保持固定数量的请求在途
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    pending.append(pool.submit(self._fetch_chunk, symbol, timeframe, *next_range))
+
+                if last_ts is not None:
+                    chunk = chunk[chunk['timestamp'] > last_ts].reset_index(drop=True)
+                if chunk.empty:
+                    continue
+
+                last_ts = int(chunk['timestamp'].iloc[-1])
+                if self.store is not None:
+                    self.store.merge(symbol, timeframe, chunk)
+                yield chunk
+
+    def backfill(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        回补一段时间范围内的全部 K 线
+
+        Args:
+            symbol: 交易对符号
+            timeframe: 时间周期
+            start_ms: 开始时间（毫秒）
+            end_ms: 结束时间（毫秒，默认当前时间）
+
+        Returns:
+            {'data': K 线 DataFrame, 'bars': K 线数量, 'gaps': 缺口列表, 'requests': 请求次数}
+        """
+        requests_before = self.requests
+        chunks = list(self.iter_chunks(symbol, timeframe, start_ms, end_ms))
+        data = pd.concat(chunks, ignore_index=True) if chunks else normalize_candles(None)
+
+        gaps = find_gaps(data, TIMEFRAME_MS[timeframe])
+        if gaps:
+            logger.warning(f"{symbol} {timeframe} K 线存在 {len(gaps)} 处缺口")
+
+        return {
+            'data': data,
+            'bars': len(data),
+            'gaps': gaps,
+            'requests': self.requests - requests_before,
+        }
@@ -0,0 +1,356 @@
+"""
+回测引擎
+用本地存储的 K 线回放历史：
+- 向量化路径：策略一次性给出每根 K 线的目标仓位，收益、手续费、回撤全部用 NumPy 计算
+- 事件路径：逐根 K 线驱动与 MockHyperliquidClient 方法一致的回测客户端，策略通过下单 / 撤单等方法交易
+两种路径都报告盈亏、最大回撤和换手率
+"""
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import CANDLE_COLUMNS, CandleStore, normalize_candles
+from .matching_engine import MatchingEngine
+from .mock_client import MockHyperliquidClient
+
+logger = logging.getLogger(__name__)
+
+
+def _max_drawdown(equity: np.ndarray) -> float:
+    """最大回撤（相对前高的最大跌幅，0.2 表示 20%）"""
+    if len(equity) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(equity)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = 1.0 - equity / peaks
+    # 权益跌到 0 以下（事件路径爆仓后继续亏损）时回撤按 100% 计
+    return float(min(np.nanmax(drawdown), 1.0))
+
+
+def vectorized_backtest(
+    close: Any,
+    positions: Any,
+    initial_balance: float = 10000.0,
+    fee: float = 0.00045,
+    slippage: float = 0.0001,
+    lag: int = 1
+) -> Dict[str, Any]:
+    """
+    向量化回测（只需要信号的策略）
+
+    第 t 根 K 线收盘时给出的目标仓位 positions[t]（权益的倍数，1 为满仓做多，-1 为满仓做空），
+    在 lag 根 K 线之后开始持有；每次调仓按调整的名义金额收取 fee + slippage。
+    某根 K 线的亏损达到权益的 100% 时视为爆仓，权益从该根起保持为 0，之后不再调仓
+
+    Args:
+        close: 收盘价序列
+        positions: 目标仓位序列（与 close 等长）
+        initial_balance: 初始资金
+        fee: 手续费率
+        slippage: 滑点（相对成交价）
+        lag: 信号到持仓的延迟（K 线根数，至少 1，避免用到未来数据）
+
+    Returns:
+        回测报告（pnl、return、max_drawdown、turnover、trades、fees、equity 等）
+    """
+    close = np.asarray(close, dtype=float)
+    target = np.nan_to_num(np.asarray(positions, dtype=float))
+    if close.shape != target.shape:
+        raise ValueError("close 和 positions 的长度必须相同")
+    if lag < 1:
+        raise ValueError("lag 至少为 1")
+    n = len(close)
+
+    held = np.zeros(n)
+    held[lag:] = target[:n - lag]
+    returns = np.zeros(n)
+    returns[1:] = close[1:] / close[:-1] - 1.0
+    trades = np.abs(np.diff(held, prepend=0.0))
+
+    net = held * returns - trades * (fee + slippage)
+    # 单根亏损不超过全部权益：爆仓后累乘保持为 0，不会变成负权益
+    equity = initial_balance * np.cumprod(np.maximum(1.0 + net, 0.0))
+    # 调仓的名义金额按调仓前的权益计算，爆仓之后的调仓不再计入
+    before = np.empty(n)
+    before[0] = initial_balance
+    before[1:] = equity[:-1]
+    trades[before <= 0] = 0.0
+    traded = trades * before
+
+    final = float(equity[-1]) if n else initial_balance
+    return {
+        'bars': n,
+        'initial_balance': initial_balance,
+        'final_equity': final,
+        'pnl': final - initial_balance,
+        'return': final / initial_balance - 1.0,
+        'max_drawdown': _max_drawdown(equity),
+        'turnover': float(traded.sum() / initial_balance),
+        'trades': int(np.count_nonzero(trades)),
+        'fees': float(traded.sum() * fee),
+        'equity': equity,
+    }
+
+
+class BacktestClient(MockHyperliquidClient):
+    """
+    回测客户端（方法与 MockHyperliquidClient 一致，可直接用于 create_trading_tools）
+
+    - 行情、订单簿、K 线只包含当前 K 线及之前的数据，没有未来数据
+    - 每根 K 线按 开 → 低 → 高 → 收（阴线为 开 → 高 → 低 → 收）的路径更新撮合引擎参考价，
+      被路径穿过的挂单按挂单价成交；市价单按当前收盘价加半价差成交
+    - 订单和成交的时间戳为 K 线时间
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, pd.DataFrame],
+        timeframe: Optional[str] = None,
+        initial_balance: float = 10000.0,
+        engine: Optional[MatchingEngine] = None,
+        order_history: int = 10000
+    ):
+        """
+        初始化回测客户端
+
+        Args:
+            data: {symbol: K 线 DataFrame}（列为 timestamp、open、high、low、close、volume）
+            timeframe: K 线周期（可选，指定后 fetch_ohlcv 只接受该周期）
+            initial_balance: 初始 USDT 余额
+            engine: 撮合引擎（可选，用于自定义价差、流动性和手续费）
+            order_history: 保留的已结束订单数量
+        """
+        super().__init__(initial_balance=initial_balance, engine=engine, order_history=order_history, prices={})
+        self.timeframe = timeframe
+        self.frames = {symbol: normalize_candles(df) for symbol, df in data.items()}
+        self.arrays = {
+            symbol: {col: df[col].to_numpy() for col in CANDLE_COLUMNS}
+            for symbol, df in self.frames.items()
+        }
+        self.cursor: Dict[str, int] = {}
+        self.now = 0
+        self.engine.clock = lambda: self.now / 1000
+
+    def apply_bar(self, symbol: str, index: int) -> List[Dict[str, Any]]:
+        """
+        推进到 symbol 的第 index 根 K 线，按 K 线内的价格路径撮合挂单
+
+        Returns:
+            本根 K 线内成交的挂单
+        """
+        bar = self.arrays[symbol]
+        self.cursor[symbol] = index
+        self.now = int(bar['timestamp'][index])
+        o, h, l, c = bar['open'][index], bar['high'][index], bar['low'][index], bar['close'][index]
+        path = (o, l, h, c) if c >= o else (o, h, l, c)
+        touched = []
+        for price in path:
+            touched += self.engine.update_price(symbol, float(price))
+        return touched
+
+    def _bar(self, symbol: str) -> Dict[str, float]:
+        index = self.cursor.get(symbol)
+        if index is None:
+            raise ValueError(f"{symbol} 还没有 K 线数据")
+        bar = self.arrays[symbol]
+        return {col: bar[col][index].item() for col in CANDLE_COLUMNS}
+
+    def get_current_price(self, symbol: str) -> float:
+        """当前 K 线收盘价"""
+        return self._bar(symbol)['close']
+
+    def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        """当前 K 线的行情（买一 / 卖一为撮合引擎的外部报价）"""
+        bar = self._bar(symbol)
+        quote = self.engine.quote(symbol)
+        return {
+            'symbol': symbol,
+            'last': bar['close'],
+            'bid': quote['bid'],
+            'ask': quote['ask'],
+            'open': bar['open'],
+            'high': bar['high'],
+            'low': bar['low'],
+            'volume': bar['volume'],
+            'timestamp': bar['timestamp'],
+        }
+
+    def get_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """当前 K 线的批量行情（None 表示已有 K 线的全部交易对，还没有 K 线的交易对不包含在结果中）"""
+        if symbols is None:
+            symbols = list(self.cursor)
+        return {symbol: self.get_ticker(symbol) for symbol in symbols if symbol in self.cursor}
+
+    def get_orderbook(self, symbol: str, limit: int = 20) -> Dict[str, Any]:
+        """撮合引擎的外部报价（一档）"""
+        self._bar(symbol)
+        quote = self.engine.quote(symbol)
+        return {
+            'symbol': symbol,
+            'bids': [[quote['bid'], quote['size']]],
+            'asks': [[quote['ask'], quote['size']]],
+            'timestamp': self.now,
+        }
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = "1h", limit: int = 100) -> pd.DataFrame:
+        """截至当前 K 线的最近 limit 根 K 线"""
+        if self.timeframe is not None and timeframe != self.timeframe:
+            raise ValueError(f"回测数据只有 {self.timeframe} 周期，不支持 {timeframe}")
+        end = self.cursor.get(symbol, -1) + 1
+        df = self.frames[symbol].iloc[max(0, end - limit):end].copy()
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df.set_index('timestamp')
+
+    def equity(self) -> float:
+        """当前权益（初始余额 + 已实现 / 未实现盈亏 - 手续费）"""
+        engine = self.engine
+        return self.initial_balance + engine.realized_pnl - engine.fees + engine.unrealized_pnl()
+
+
+class Backtester:
+    """
+    回测运行器
+
+    示例:
+        bt = Backtester.from_store(store, ["BTC", "ETH"], "1h")
+
+        # 向量化：策略返回目标仓位序列
+        report = bt.run_vectorized(lambda df: np.sign(df['close'] - df['close'].rolling(20).mean()))
+
+        # 事件驱动：每根 K 线调用一次策略，策略通过客户端下单
+        def on_bar(client, bars):
+            for symbol, bar in bars.items():
+                if not client.get_positions():
+                    client.create_market_order(symbol, 'buy', 0.01)
+        report = bt.run(on_bar)
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, pd.DataFrame],
+        timeframe: Optional[str] = None,
+        initial_balance: float = 10000.0,
+        fee: float = 0.00045,
+        slippage: float = 0.0001,
+        engine_factory: Optional[Callable[[], MatchingEngine]] = None
+    ):
+        """
+        初始化回测运行器
+
+        Args:
+            data: {symbol: K 线 DataFrame}
+            timeframe: K 线周期（可选）
+            initial_balance: 初始资金
+            fee: 吃单手续费率（向量化路径的调仓费率；事件路径的撮合引擎吃单费率）
+            slippage: 滑点（向量化路径的调仓滑点；事件路径的外部报价半价差）
+            engine_factory: 事件路径的撮合引擎工厂（可选，覆盖 fee / slippage）
+        """
+        self.data = {symbol: normalize_candles(df) for symbol, df in data.items()}
+        self.timeframe = timeframe
+        self.initial_balance = initial_balance
+        self.fee = fee
+        self.slippage = slippage
+        self.engine_factory = engine_factory or (lambda: MatchingEngine(half_spread=slippage, taker_fee=fee))
+
+    @classmethod
+    def from_store(cls, store: CandleStore, symbols: Sequence[str], timeframe: str, **kwargs: Any) -> "Backtester":
+        """用 CandleStore 中保存的 K 线创建回测"""
+        return cls({symbol: store.get(symbol, timeframe) for symbol in symbols}, timeframe=timeframe, **kwargs)
+
+    def run_vectorized(
+        self,
+        strategy: Callable[[pd.DataFrame], Any],
+        symbols: Optional[Sequence[str]] = None,
+        lag: int = 1
+    ) -> Dict[str, Any]:
+        """
+        向量化回测：strategy(df) 返回每根 K 线的目标仓位（权益的倍数），每个交易对单独使用全部初始资金
+
+        Returns:
+            {'symbols': {symbol: 报告}, 'bars', 'elapsed', 'bars_per_second'}
+        """
+        start = time.perf_counter()
+        reports = {}
+        bars = 0
+        for symbol in symbols or list(self.data):
+            df = self.data[symbol]
+            report = vectorized_backtest(
+                df['close'].to_numpy(), strategy(df), self.initial_balance,
+                fee=self.fee, slippage=self.slippage, lag=lag
+            )
+            report['equity'] = pd.Series(report['equity'], index=pd.to_datetime(df['timestamp'], unit='ms'))
+            reports[symbol] = report
+            bars += len(df)
+        elapsed = time.perf_counter() - start
+        logger.info(f"向量化回测完成: {bars} 根 K 线, {elapsed:.3f} 秒")
+        return {
+            'symbols': reports,
+            'bars': bars,
+            'elapsed': elapsed,
+            'bars_per_second': bars / elapsed if elapsed > 0 else float('inf'),
+        }
+
+    def run(
+        self,
+        strategy: Callable[[BacktestClient, Dict[str, Dict[str, float]]], None],
+        symbols: Optional[Sequence[str]] = None,
+        warmup: int = 0
+    ) -> Dict[str, Any]:
+        """
+        事件驱动回测：按时间顺序逐根推进 K 线，每个时间点调用一次 strategy(client, bars)
+
+        Args:
+            strategy: 策略函数，bars 为本时间点有 K 线的交易对 {symbol: K 线}
+            symbols: 参与回测的交易对（默认全部）
+            warmup: 前 warmup 个时间点只推进行情、不调用策略（用于计算指标）
+
+        Returns:
+            回测报告（pnl、return、max_drawdown、turnover、trades、fees、equity、positions 等）
+        """
+        symbols = list(symbols or self.data)
+        client = BacktestClient(
+            {symbol: self.data[symbol] for symbol in symbols},
+            timeframe=self.timeframe,
+            initial_balance=self.initial_balance,
+            engine=self.engine_factory()
+        )
+        timestamps = np.unique(np.concatenate([client.arrays[s]['timestamp'] for s in symbols]))
+        pointers = dict.fromkeys(symbols, 0)
+        equity = np.empty(len(timestamps))
+
+        start = time.perf_counter()
+        for step, ts in enumerate(timestamps):
+            bars = {}
+            for symbol in symbols:
+                i = pointers[symbol]
+                series = client.arrays[symbol]['timestamp']
+                if i < len(series) and series[i] == ts:
+                    client.apply_bar(symbol, i)
+                    bars[symbol] = client._bar(symbol)
+                    pointers[symbol] = i + 1
+            if step >= warmup:
+                strategy(client, bars)
+            equity[step] = client.equity()
+        elapsed = time.perf_counter() - start
+
+        engine = client.engine
+        final = float(equity[-1]) if len(equity) else self.initial_balance
+        logger.info(f"事件回测完成: {len(timestamps)} 个时间点, {elapsed:.3f} 秒")
+        return {
+            'bars': int(sum(len(client.arrays[s]['timestamp']) for s in symbols)),
+            'initial_balance': self.initial_balance,
+            'final_equity': final,
+            'pnl': final - self.initial_balance,
+            'return': final / self.initial_balance - 1.0,
+            'max_drawdown': _max_drawdown(equity),
+            'turnover': engine.volume / self.initial_balance,
+            'trades': engine.fill_count,
+            'fees': engine.fees,
+            'equity': pd.Series(equity, index=pd.to_datetime(timestamps, unit='ms')),
+            'positions': client.get_positions(),
+            'elapsed': elapsed,
+            'client': client,
+        }
@@ -0,0 +1,145 @@
+"""
+快照缓存
+为行情、账户等"整包拉取"的接口提供带过期时间的共享快照
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class _Flight:
+    """一次正在进行中的刷新请求"""
+
+    __slots__ = ("event", "value", "error", "generation")
+
+    def __init__(self, generation: int):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.generation = generation
+
+
+class TTLSnapshotCache:
+    """
+    带过期时间的单值快照缓存
+
+    - 在 ttl 秒内的重复读取直接返回同一份快照
+    - 快照过期时，并发调用方只会触发一次刷新，其余调用方等待并共享结果
+    - 记录命中 / 未命中 / 合并请求次数，便于观察缓存效果
+
+    示例:
+        cache = TTLSnapshotCache(info.all_mids, ttl=0.25)
+        mids = cache.get()
+    """
+
+    def __init__(self, loader: Callable[[], Any], ttl: float = 0.25):
+        """
+        初始化快照缓存
+
+        Args:
+            loader: 拉取完整快照的函数（无参数）
+            ttl: 快照有效期（秒），0 表示每次都刷新
+        """
+        self._loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._has_value = False
+        self._fetched_at = 0.0
+        self._generation = 0
+        self._inflight: Optional[_Flight] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, max_age: Optional[float] = None) -> Any:
+        """
+        获取快照
+
+        Args:
+            max_age: 本次调用可接受的最大快照年龄（秒），默认使用 ttl
+
+        Returns:
+            快照数据
+        """
+        ttl = self.ttl if max_age is None else max_age
+
+        with self._lock:
+            if self._has_value and time.monotonic() - self._fetched_at <= ttl:
+                self.hits += 1
+                return self._value
+
+            flight = self._inflight
+            if flight is None:
+                flight = _Flight(self._generation)
+                self._inflight = flight
+                self.misses += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = self._loader()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                if self._inflight is flight:
+                    self._inflight = None
+            flight.event.set()
+            raise
+
+        with self._lock:
+            # 刷新期间若被 invalidate，结果只交给本轮调用方，不写回缓存
+            if flight.generation == self._generation:
+                self._value = value
+                self._has_value = True
+                self._fetched_at = time.monotonic()
+            if self._inflight is flight:
+                self._inflight = None
+
+        flight.value = value
+        flight.event.set()
+        return value
+
+    def set(self, value: Any) -> None:
+        """直接写入最新快照（例如来自推送数据）"""
+        with self._lock:
+            self._generation += 1
+            self._value = value
+            self._has_value = True
+            self._fetched_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """使当前快照失效，下一次读取将重新拉取"""
+        with self._lock:
+            self._generation += 1
+            self._has_value = False
+            self._value = None
+            self._inflight = None
+
+    def age(self) -> Optional[float]:
+        """当前快照的年龄（秒），没有快照时返回 None"""
+        with self._lock:
+            if not self._has_value:
+                return None
+            return time.monotonic() - self._fetched_at
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        total = self.hits + self.misses + self.coalesced
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': (self.hits + self.coalesced) / total if total else 0.0,
+            'ttl': self.ttl,
+            'age': self.age(),
+        }
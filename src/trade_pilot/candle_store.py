@@ -0,0 +1,299 @@
+"""
+K 线本地存储
+按 (交易对, 周期) 保存 OHLCV 数据，只增量拉取最后一根 K 线之后的新数据
+"""
+import os
+import re
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 存储使用的列，timestamp 为毫秒时间戳（K 线开盘时间）
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def normalize_candles(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将 K 线数据整理为存储格式
+
+    只保留 CANDLE_COLUMNS，timestamp 转为 int64 毫秒，价格和成交量转为 float，
+    按时间排序并去重（重复时保留最后一条）
+    """
+    if df is None or df.empty:
+        return pd.DataFrame({col: pd.Series(dtype='int64' if col == 'timestamp' else 'float64')
+                             for col in CANDLE_COLUMNS})
+
+    df = df[CANDLE_COLUMNS].copy()
+    if pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        df['timestamp'] = df['timestamp'].astype('datetime64[ms]').astype('int64')
+    df['timestamp'] = df['timestamp'].astype('int64')
+    for col in CANDLE_COLUMNS[1:]:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+
+    df = df.drop_duplicates('timestamp', keep='last').sort_values('timestamp')
+    return df.reset_index(drop=True)
+
+
+class CandleStore:
+    """
+    K 线本地存储
+
+    - 内存中按 (symbol, timeframe) 保存一份整理好的 DataFrame
+    - 指定 directory 时同时写入磁盘：每个 (symbol, timeframe) 一个 CSV 文件，重启后从磁盘恢复；
+      文件内容与内存中的数据一致，没有重复行：
+        * 只有比已存最后一根更新的 K 线追加到文件末尾
+        * 只有最后一根被更新（未收盘 K 线重新拉取的常见情况）时截掉文件最后一行再追加
+        * 更早的 K 线被更新时整个文件重写（写入临时文件后替换）
+    - fetch() 只向交易所请求最后一根已存 K 线之后的数据（最后一根可能尚未收盘，会重新拉取）
+
+    示例:
+        store = CandleStore("~/.cache/trade_pilot/candles")
+        df = store.fetch("BTC", "1h", 1000, fetcher, interval_ms=3600_000)
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        初始化 K 线存储
+
+        Args:
+            directory: 磁盘存储目录（可选，不指定则只保存在内存中）
+        """
+        self.directory = os.path.expanduser(directory) if directory else None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+        self._frames: Dict[Tuple[str, str], pd.DataFrame] = {}
+        # 磁盘文件中最后一行的起始偏移（字节），用于只重写最后一根 K 线；未知时为 None
+        self._last_row_offsets: Dict[Tuple[str, str], Optional[int]] = {}
+        self._lock = threading.RLock()
+        # 每个 (symbol, timeframe) 一把锁，拉取不同交易对时互不阻塞
+        self._fetch_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+
+    def _path(self, symbol: str, timeframe: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        safe_symbol = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol)
+        return os.path.join(self.directory, f"{safe_symbol}_{timeframe}.csv")
+
+    def _load(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """从磁盘加载，并在存在重复行时压缩文件"""
+        path = self._path(symbol, timeframe)
+        if not path or not os.path.exists(path):
+            return normalize_candles(None)
+
+        raw = pd.read_csv(path)
+        df = normalize_candles(raw)
+        if len(df) < len(raw) or not raw['timestamp'].is_monotonic_increasing:
+            # 旧版本只追加写入的文件可能包含重复行
+            self._rewrite(symbol, timeframe, df)
+        elif not df.empty:
+            self._last_row_offsets[(symbol, timeframe)] = self._find_last_row(path)
+        return df
+
+    @staticmethod
+    def _find_last_row(path: str) -> Optional[int]:
+        """文件最后一行的起始偏移（读取文件末尾的一小段，找不到完整的最后一行时返回 None）"""
+        with open(path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - 4096))
+            tail = f.read()
+        body = tail.rstrip(b'\n')
+        if len(tail) - len(body) != 1 or b'\n' not in body:
+            return None
+        return size - len(tail) + body.rindex(b'\n') + 1
+
+    def get(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """
+        获取已存储的 K 线
+
+        Args:
+            symbol: 交易对符号
+            timeframe: 时间周期
+
+        Returns:
+            按时间排序的 K 线 DataFrame（可能为空）
+        """
+        key = (symbol, timeframe)
+        with self._lock:
+            df = self._frames.get(key)
+            if df is None:
+                df = self._load(symbol, timeframe)
+                self._frames[key] = df
+            return df
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        """最后一根已存 K 线的时间戳（毫秒），没有数据时返回 None"""
+        df = self.get(symbol, timeframe)
+        if df.empty:
+            return None
+        return int(df['timestamp'].iloc[-1])
+
+    def merge(self, symbol: str, timeframe: str, candles: pd.DataFrame) -> pd.DataFrame:
+        """
+        合并新的 K 线（相同时间戳以新数据为准）
+
+        Args:
+            symbol: 交易对符号
+            timeframe: 时间周期
+            candles: 新的 K 线数据
+
+        Returns:
+            合并后的全部 K 线
+        """
+        new = normalize_candles(candles)
+        with self._lock:
+            stored = self.get(symbol, timeframe)
+            if new.empty:
+                return stored
+
+            if stored.empty:
+                merged = new
+            elif new['timestamp'].iloc[0] > stored['timestamp'].iloc[-1]:
+                # 常见情况：新数据全部在已存数据之后，直接拼接
+                merged = pd.concat([stored, new], ignore_index=True)
+            else:
+                merged = normalize_candles(pd.concat([stored, new], ignore_index=True))
+
+            self._frames[(symbol, timeframe)] = merged
+            if self.directory:
+                self._write_to_disk(symbol, timeframe, stored, merged, int(new['timestamp'].iloc[0]))
+            return merged
+
+    def _write_to_disk(
+        self,
+        symbol: str,
+        timeframe: str,
+        stored: pd.DataFrame,
+        merged: pd.DataFrame,
+        first_new_ts: int
+    ) -> None:
+        """把合并结果同步到磁盘，只写入与已存文件不同的部分"""
+        key = (symbol, timeframe)
+        count = len(stored)
+        if count and not os.path.exists(self._path(symbol, timeframe)):
+            # 文件在运行期间被删除，按内存中的数据重建
+            self._rewrite(symbol, timeframe, merged)
+            return
+        # 早于新数据第一根的已存 K 线不会变化
+        unchanged = int(stored['timestamp'].searchsorted(first_new_ts))
+        if unchanged < count and merged.iloc[unchanged:count].reset_index(drop=True).equals(
+                stored.iloc[unchanged:].reset_index(drop=True)):
+            unchanged = count
+
+        if unchanged == count:
+            self._append(symbol, timeframe, merged.iloc[count:])
+        elif unchanged == count - 1 and self._last_row_offsets.get(key) is not None:
+            self._append(symbol, timeframe, merged.iloc[unchanged:], truncate=self._last_row_offsets[key])
+        else:
+            self._rewrite(symbol, timeframe, merged)
+
+    def _append(self, symbol: str, timeframe: str, candles: pd.DataFrame, truncate: Optional[int] = None) -> None:
+        """追加 K 线到文件末尾（truncate 指定时先截断到该偏移）"""
+        path = self._path(symbol, timeframe)
+        if candles.empty and truncate is None:
+            return
+        try:
+            exists = os.path.exists(path)
+            with open(path, 'r+b' if exists else 'wb') as f:
+                if truncate is not None:
+                    f.truncate(truncate)
+                offset = f.seek(0, os.SEEK_END)
+                self._write_rows(symbol, timeframe, f, candles, offset, header=not exists)
+        except OSError as e:
+            self._last_row_offsets[(symbol, timeframe)] = None
+            logger.warning(f"写入 K 线文件失败 {path}: {e}")
+
+    def _rewrite(self, symbol: str, timeframe: str, candles: pd.DataFrame) -> None:
+        """重写整个文件（先写临时文件再替换，中途失败不会留下不完整的文件）"""
+        path = self._path(symbol, timeframe)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                self._write_rows(symbol, timeframe, f, candles, 0, header=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self._last_row_offsets[(symbol, timeframe)] = None
+            logger.warning(f"写入 K 线文件失败 {path}: {e}")
+
+    def _write_rows(self, symbol: str, timeframe: str, f, candles: pd.DataFrame, offset: int, header: bool) -> None:
+        """在 offset 处写入 CSV 行，并记录最后一行的起始偏移"""
+        data = candles.to_csv(header=header, index=False, lineterminator='\n').encode()
+        f.write(data)
+        if candles.empty:
+            # 只写了表头（或什么都没写），文件中没有可截断的数据行
+            self._last_row_offsets[(symbol, timeframe)] = None
+            return
+        last_line = data.rstrip(b'\n').rsplit(b'\n', 1)[-1]
+        self._last_row_offsets[(symbol, timeframe)] = offset + len(data) - len(last_line) - 1
+
+    def fetch(
+        self,
+        symbol: str,
+        timeframe: str,
+        limit: int,
+        fetcher: Callable[[int], pd.DataFrame],
+        interval_ms: int
+    ) -> pd.DataFrame:
+        """
+        获取最近 limit 根 K 线，只从交易所拉取缺失的部分
+
+        Args:
+            symbol: 交易对符号
+            timeframe: 时间周期
+            limit: 返回的 K 线数量
+            fetcher: 拉取函数，参数为起始时间（毫秒），返回该时间之后的 K 线
+            interval_ms: 周期长度（毫秒）
+
+        Returns:
+            最近 limit 根 K 线（按时间排序）
+        """
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault((symbol, timeframe), threading.Lock())
+
+        with fetch_lock:
+            stored = self.get(symbol, timeframe)
+            now_ms = int(time.time() * 1000)
+            last_ts = int(stored['timestamp'].iloc[-1]) if not stored.empty else None
+
+            # 已存数据不足 limit 根，或距离最后一根太久（中间可能超过单次返回上限），全量拉取
+            if last_ts is None or len(stored) < limit or now_ms - last_ts > limit * interval_ms:
+                since = now_ms - limit * interval_ms
+                self.full_fetches += 1
+            else:
+                since = last_ts
+                self.incremental_fetches += 1
+
+            merged = self.merge(symbol, timeframe, fetcher(since))
+            return merged.tail(limit).reset_index(drop=True)
+
+    def clear(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> None:
+        """清除内存和磁盘中的 K 线数据（不指定参数时清除全部）"""
+        with self._lock:
+            keys = {key for key in self._frames
+                    if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe)}
+            if symbol is not None and timeframe is not None:
+                keys.add((symbol, timeframe))
+            for key in keys:
+                self._frames.pop(key, None)
+                self._last_row_offsets.pop(key, None)
+                path = self._path(*key)
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    def stats(self) -> Dict[str, int]:
+        """存储统计信息"""
+        with self._lock:
+            return {
+                'series': len(self._frames),
+                'bars': sum(len(df) for df in self._frames.values()),
+                'full_fetches': self.full_fetches,
+                'incremental_fetches': self.incremental_fetches,
+            }
@@ -0,0 +1,610 @@
+"""
+Hyperliquid 异步客户端
+基于 asyncio + aiohttp 的 Hyperliquid 客户端，接口与 HyperliquidSDKClient 保持一致
+
+- 所有查询通过一个复用连接（keep-alive）的 aiohttp 会话直接请求 /info
+- 多交易对查询可以通过 gather() 并发执行，总耗时取决于最慢的一次请求
+- 下单、撤单等需要签名的操作复用官方 SDK 的 Exchange，在线程池中执行
+"""
+import asyncio
+import time
+from typing import Optional, Dict, List, Any, Iterable
+
+import aiohttp
+import pandas as pd
+import eth_account
+from eth_account.signers.local import LocalAccount
+from hyperliquid.exchange import Exchange
+from hyperliquid.utils import constants
+
+from .backfill import TIMEFRAME_MS
+from .rate_limiter import RequestScheduler, get_default_scheduler, request_lane, request_weight
+from .hyperliquid_parsers import (
+    asset_ctxs_by_name,
+    base_symbol as _base_symbol,
+    candles_to_dataframe,
+    parse_balance,
+    parse_open_orders,
+    parse_order_book,
+    parse_positions,
+    ticker_from_ctx,
+)
+
+
+class AsyncHyperliquidSDKClient:
+    """
+    Hyperliquid 异步客户端
+
+    认证方式与 HyperliquidSDKClient 相同:
+    1. 主钱包认证: wallet_address + private_key
+    2. API Wallet 认证: wallet_address + api_wallet_private_key + vault_address
+    3. 只读模式: read_only=True (无需认证)
+
+    示例:
+        async with AsyncHyperliquidSDKClient(read_only=True) as client:
+            prices = await client.gather("get_current_price", ["BTC", "ETH", "SOL"])
+    """
+
+    def __init__(
+        self,
+        wallet_address: Optional[str] = None,
+        private_key: Optional[str] = None,
+        vault_address: Optional[str] = None,
+        testnet: bool = False,
+        read_only: bool = False,
+        custom_endpoint: Optional[str] = None,
+        timeout: float = 10.0,
+        max_connections: int = 32,
+        max_concurrency: int = 16,
+        rate_limiter: Optional[RequestScheduler] = None
+    ):
+        """
+        初始化 Hyperliquid 异步客户端
+
+        Args:
+            wallet_address: 钱包地址（主钱包地址）
+            private_key: 私钥（主钱包私钥或 API Wallet 私钥）
+            vault_address: Vault 地址（用于 API Wallet 代理子账户）
+            testnet: 是否使用测试网
+            read_only: 是否只读模式（无需认证）
+            custom_endpoint: 自定义 API endpoint
+            timeout: 单次请求超时时间（秒）
+            max_connections: 连接池最大连接数
+            max_concurrency: gather() 的最大并发请求数
+            rate_limiter: 请求调度器（默认使用进程内共享的调度器）
+        """
+        self.wallet_address = wallet_address
+        self.private_key = private_key
+        self.vault_address = vault_address
+        self.testnet = testnet
+        self.read_only = read_only
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or get_default_scheduler()
+
+        # 确定 API URL
+        if custom_endpoint:
+            self.api_url = custom_endpoint
+        elif testnet:
+            self.api_url = constants.TESTNET_API_URL
+        else:
+            self.api_url = constants.MAINNET_API_URL
+
+        # 验证认证参数
+        if not read_only and (not wallet_address or not private_key):
+            raise ValueError(
+                "必须提供以下认证方式之一：\n"
+                "1. wallet_address + private_key（钱包认证）\n"
+                "2. read_only=True（只读模式）\n"
+                "\n"
+                "注意：Hyperliquid 不支持传统的 API Key + Secret 认证！\n"
+                "如需使用 API Wallet，请访问 https://app.hyperliquid.xyz/API 生成并授权。"
+            )
+
+        self.account: Optional[LocalAccount] = None
+        if not read_only:
+            self.account = eth_account.Account.from_key(private_key)
+
+        # 设置认证方式标识
+        if read_only:
+            self.auth_method = "read_only"
+        elif vault_address:
+            self.auth_method = "api_wallet"
+        else:
+            self.auth_method = "main_wallet"
+
+        self.markets: Dict[str, Any] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._exchange: Optional[Exchange] = None
+
+    # ========== 连接管理 ==========
+
+    async def __aenter__(self) -> "AsyncHyperliquidSDKClient":
+        await self.load_markets()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取（必要时创建）复用连接的 HTTP 会话"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                base_url=self.api_url,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Content-Type": "application/json"}
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """关闭 HTTP 会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _post_info(self, payload: Dict[str, Any]) -> Any:
+        """请求 /info 接口"""
+        await asyncio.to_thread(
+            self.rate_limiter.acquire,
+            request_weight("/info", payload),
+            request_lane("/info", payload)
+        )
+        async with self._get_session().post("/info", json=payload) as response:
+            if response.status == 429:
+                self.rate_limiter.backoff()
+            if response.status >= 400:
+                text = await response.text()
+                raise Exception(f"HTTP {response.status}: {text}")
+            return await response.json(content_type=None)
+
+    async def _get_exchange(self) -> Exchange:
+        """获取（必要时创建）用于签名交易的 SDK Exchange 实例"""
+        if self.read_only:
+            raise Exception("只读模式无法交易")
+        if self._exchange is None:
+            # Exchange 初始化时会同步拉取 meta，放到线程中避免阻塞事件循环
+            self._exchange = await asyncio.to_thread(
+                Exchange,
+                self.account,
+                base_url=self.api_url,
+                account_address=self.wallet_address if self.vault_address else None
+            )
+            self._exchange.post = self.rate_limiter.wrap_post(self._exchange.post)
+            self._exchange.info.post = self.rate_limiter.wrap_post(self._exchange.info.post)
+        return self._exchange
+
+    def _require_wallet(self, action: str) -> None:
+        if self.read_only:
+            raise Exception(f"只读模式无法{action}")
+        if not self.wallet_address:
+            raise Exception("需要提供钱包地址")
+
+    # ========== 并发工具 ==========
+
+    async def gather(
+        self,
+        method: str,
+        symbols: Iterable[str],
+        *args,
+        return_exceptions: bool = True,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        对多个交易对并发调用同一个方法
+
+        Args:
+            method: 方法名，例如 "get_ticker"、"get_order_book"
+            symbols: 交易对列表
+            *args, **kwargs: 传递给方法的其他参数
+            return_exceptions: 为 True 时单个交易对失败不影响其他结果，异常作为值返回
+
+        Returns:
+            {symbol: 结果}
+        """
+        func = getattr(self, method)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        symbols = list(symbols)
+
+        async def run(symbol: str) -> Any:
+            async with semaphore:
+                return await func(symbol, *args, **kwargs)
+
+        results = await asyncio.gather(
+            *(run(symbol) for symbol in symbols),
+            return_exceptions=return_exceptions
+        )
+        return dict(zip(symbols, results))
+
+    # ========== 市场数据 ==========
+
+    async def load_markets(self) -> Dict[str, Any]:
+        """加载市场数据"""
+        try:
+            meta = await self._post_info({"type": "meta"})
+            markets = {}
+            for asset in meta.get('universe', []):
+                symbol = asset['name']
+                markets[symbol] = {
+                    'symbol': symbol,
+                    'name': asset.get('name'),
+                    'szDecimals': asset.get('szDecimals', 0),
+                }
+            self.markets = markets
+            return markets
+        except Exception as e:
+            raise Exception(f"加载市场数据失败: {e}")
+
+    async def get_all_mids(self) -> Dict[str, float]:
+        """获取全市场中间价"""
+        try:
+            all_mids = await self._post_info({"type": "allMids"})
+            return {coin: float(mid) for coin, mid in all_mids.items()}
+        except Exception as e:
+            raise Exception(f"获取价格失败: {e}")
+
+    async def get_current_price(self, symbol: str) -> float:
+        """
+        获取当前价格
+
+        Args:
+            symbol: 交易对符号，例如 "BTC" 或 "ETH"
+
+        Returns:
+            当前价格
+        """
+        base_symbol = _base_symbol(symbol)
+        all_mids = await self.get_all_mids()
+        if base_symbol not in all_mids:
+            raise Exception(f"获取价格失败: 未找到交易对: {symbol}")
+        return all_mids[base_symbol]
+
+    async def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        一次请求获取多个交易对的价格
+
+        Args:
+            symbols: 交易对列表
+
+        Returns:
+            {symbol: price}，未找到的交易对不包含在结果中
+        """
+        all_mids = await self.get_all_mids()
+        prices = {}
+        for symbol in symbols:
+            base_symbol = _base_symbol(symbol)
+            if base_symbol in all_mids:
+                prices[symbol] = all_mids[base_symbol]
+        return prices
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        """
+        获取行情数据
+
+        Args:
+            symbol: 交易对符号
+
+        Returns:
+            行情数据字典
+        """
+        try:
+            tickers = await self.get_tickers([symbol])
+            if symbol not in tickers:
+                raise ValueError(f"未找到交易对: {symbol}")
+            return tickers[symbol]
+        except Exception as e:
+            raise Exception(f"获取行情失败: {e}")
+
+    async def get_tickers(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        一次请求（metaAndAssetCtxs）获取多个交易对的行情
+
+        Args:
+            symbols: 交易对列表（None 表示全部永续合约）
+
+        Returns:
+            {symbol: 行情数据}，未找到的交易对不包含在结果中
+        """
+        ctxs = asset_ctxs_by_name(await self._post_info({"type": "metaAndAssetCtxs"}))
+        if symbols is None:
+            symbols = list(ctxs)
+        tickers = {}
+        for symbol in symbols:
+            ctx = ctxs.get(_base_symbol(symbol))
+            if ctx is not None:
+                tickers[symbol] = ticker_from_ctx(symbol, ctx)
+        return tickers
+
+    async def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = "1h",
+        limit: int = 100
+    ) -> pd.DataFrame:
+        """
+        获取 K 线数据
+
+        Args:
+            symbol: 交易对符号
+            timeframe: 时间周期 (1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 8h, 12h, 1d, 3d, 1w, 1M)
+            limit: 返回的 K 线数量
+
+        Returns:
+            包含 OHLCV 数据的 DataFrame
+        """
+        try:
+            interval = timeframe if timeframe in TIMEFRAME_MS else '1h'
+            end_time = int(time.time() * 1000)
+            start_time = end_time - limit * TIMEFRAME_MS[interval]
+
+            candles = await self._post_info({
+                "type": "candleSnapshot",
+                "req": {
+                    "coin": _base_symbol(symbol),
+                    "interval": interval,
+                    "startTime": start_time,
+                    "endTime": end_time,
+                },
+            })
+            return candles_to_dataframe(candles, limit)
+        except Exception as e:
+            raise Exception(f"获取 K 线数据失败: {e}")
+
+    async def get_order_book(self, symbol: str, depth: int = 10) -> Dict[str, Any]:
+        """
+        获取订单簿
+
+        Args:
+            symbol: 交易对符号，例如 "BTC"
+            depth: 深度（默认 10 档）
+
+        Returns:
+            订单簿信息
+        """
+        try:
+            base_symbol = _base_symbol(symbol)
+            l2_data = await self._post_info({"type": "l2Book", "coin": base_symbol})
+            return parse_order_book(l2_data, base_symbol, depth)
+        except Exception as e:
+            raise Exception(f"获取订单簿失败: {e}")
+
+    async def get_funding_rate(self, symbol: str) -> Dict[str, Any]:
+        """
+        获取资金费率
+
+        Args:
+            symbol: 交易对符号，例如 "BTC"
+
+        Returns:
+            资金费率信息
+        """
+        try:
+            base_symbol = _base_symbol(symbol)
+            meta, asset_ctxs = await self._post_info({"type": "metaAndAssetCtxs"})
+
+            for asset, ctx in zip(meta.get('universe', []), asset_ctxs):
+                if asset.get('name') == base_symbol:
+                    funding = float(ctx.get('funding', 0))
+                    return {
+                        'symbol': base_symbol,
+                        'funding_rate': funding,
+                        'funding_rate_percent': funding * 100
+                    }
+
+            raise Exception(f"未找到 {base_symbol} 的资金费率信息")
+        except Exception as e:
+            raise Exception(f"获取资金费率失败: {e}")
+
+    # ========== 账户数据 ==========
+
+    async def get_user_state(self) -> Dict[str, Any]:
+        """获取用户状态（包含持仓、订单、余额等完整信息）"""
+        self._require_wallet("获取用户状态")
+        try:
+            return await self._post_info({"type": "clearinghouseState", "user": self.wallet_address})
+        except Exception as e:
+            raise Exception(f"获取用户状态失败: {e}")
+
+    async def fetch_balance(self) -> Dict[str, Any]:
+        """获取账户余额"""
+        self._require_wallet("获取余额")
+        try:
+            return parse_balance(await self.get_user_state())
+        except Exception as e:
+            raise Exception(f"获取余额失败: {e}")
+
+    async def fetch_positions(self, symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """获取持仓信息"""
+        self._require_wallet("获取持仓")
+        try:
+            return parse_positions(await self.get_user_state(), symbols)
+        except Exception as e:
+            raise Exception(f"获取持仓失败: {e}")
+
+    async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """获取未成交订单（frontendOpenOrders，clearinghouseState 中不包含挂单）"""
+        self._require_wallet("获取订单")
+        try:
+            orders = await self._post_info({"type": "frontendOpenOrders", "user": self.wallet_address})
+            return parse_open_orders(orders, symbol)
+        except Exception as e:
+            raise Exception(f"获取未成交订单失败: {e}")
+
+    # ========== 交易 ==========
+
+    async def place_limit_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float,
+        reduce_only: bool = False,
+        tif: str = 'Gtc'
+    ) -> Dict[str, Any]:
+        """下限价单"""
+        try:
+            base_symbol = _base_symbol(symbol)
+            exchange = await self._get_exchange()
+            result = await asyncio.to_thread(
+                exchange.order,
+                name=base_symbol,
+                is_buy=side.lower() == 'buy',
+                sz=amount,
+                limit_px=price,
+                order_type={'limit': {'tif': tif}},
+                reduce_only=reduce_only
+            )
+            return {
+                'success': True,
+                'result': result,
+                'symbol': base_symbol,
+                'side': side,
+                'amount': amount,
+                'price': price
+            }
+        except Exception as e:
+            raise Exception(f"下限价单失败: {e}")
+
+    async def place_market_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        slippage: float = 0.05
+    ) -> Dict[str, Any]:
+        """下市价单"""
+        try:
+            base_symbol = _base_symbol(symbol)
+            exchange = await self._get_exchange()
+            current_price = await self.get_current_price(base_symbol)
+            result = await asyncio.to_thread(
+                exchange.market_open,
+                name=base_symbol,
+                is_buy=side.lower() == 'buy',
+                sz=amount,
+                px=current_price,
+                slippage=slippage
+            )
+            return {
+                'success': True,
+                'result': result,
+                'symbol': base_symbol,
+                'side': side,
+                'amount': amount,
+                'reference_price': current_price
+            }
+        except Exception as e:
+            raise Exception(f"下市价单失败: {e}")
+
+    async def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        """取消订单"""
+        try:
+            base_symbol = _base_symbol(symbol)
+            exchange = await self._get_exchange()
+            result = await asyncio.to_thread(exchange.cancel, name=base_symbol, oid=order_id)
+            return {
+                'success': True,
+                'result': result,
+                'symbol': base_symbol,
+                'order_id': order_id
+            }
+        except Exception as e:
+            raise Exception(f"取消订单失败: {e}")
+
+    async def cancel_all_orders(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """取消所有订单"""
+        try:
+            exchange = await self._get_exchange()
+            orders = await self.get_open_orders(symbol)
+
+            if not orders:
+                return {
+                    'success': True,
+                    'message': '没有需要取消的订单',
+                    'cancelled_count': 0
+                }
+
+            from hyperliquid.utils.signing import CancelRequest
+
+            cancel_requests = [
+                CancelRequest(coin=order['symbol'], oid=int(order['id']))
+                for order in orders
+            ]
+            result = await asyncio.to_thread(exchange.bulk_cancel, cancel_requests)
+
+            return {
+                'success': True,
+                'result': result,
+                'cancelled_count': len(cancel_requests)
+            }
+        except Exception as e:
+            raise Exception(f"取消所有订单失败: {e}")
+
+    async def close_position(
+        self,
+        symbol: str,
+        amount: Optional[float] = None,
+        slippage: float = 0.05
+    ) -> Dict[str, Any]:
+        """平仓"""
+        try:
+            base_symbol = _base_symbol(symbol)
+            exchange = await self._get_exchange()
+            current_price = await self.get_current_price(base_symbol)
+            result = await asyncio.to_thread(
+                exchange.market_close,
+                coin=base_symbol,
+                sz=amount,
+                px=current_price,
+                slippage=slippage
+            )
+            return {
+                'success': True,
+                'result': result,
+                'symbol': base_symbol,
+                'amount': amount or 'all',
+                'reference_price': current_price
+            }
+        except Exception as e:
+            raise Exception(f"平仓失败: {e}")
+
+    async def set_leverage(
+        self,
+        symbol: str,
+        leverage: int,
+        is_cross: bool = True
+    ) -> Dict[str, Any]:
+        """设置杠杆"""
+        try:
+            base_symbol = _base_symbol(symbol)
+            exchange = await self._get_exchange()
+            result = await asyncio.to_thread(
+                exchange.update_leverage,
+                leverage=leverage,
+                name=base_symbol,
+                is_cross=is_cross
+            )
+            return {
+                'success': True,
+                'result': result,
+                'symbol': base_symbol,
+                'leverage': leverage,
+                'mode': 'cross' if is_cross else 'isolated'
+            }
+        except Exception as e:
+            raise Exception(f"设置杠杆失败: {e}")
+
+    def __repr__(self) -> str:
+        """字符串表示"""
+        return (
+            f"AsyncHyperliquidSDKClient("
+            f"auth_method={self.auth_method}, "
+            f"testnet={self.testnet}, "
+            f"markets={len(self.markets)})"
+        )
@@ -7,9 +7,34 @@ import ccxt
 import pandas as pd
 from typing import Optional, Dict, Any, List
 import logging
+import threading
+import time
+from .price_feed import PriceFeed
+from .metadata_cache import MetadataCache
+from .rate_limiter import RequestScheduler, get_default_scheduler
+from .order_index import new_cloid, is_cloid, submit_idempotent
+from .order_tracker import OrderTracker
+from .candle_store import CandleStore
 
 logger = logging.getLogger(__name__)
 
+
+def _order_from_ccxt(order: Dict[str, Any]) -> Dict[str, Any]:
+    """将 CCXT 订单结构转换为订单表使用的订单字典"""
+    return {
+        'id': order['id'],
+        'cloid': order.get('clientOrderId'),
+        'symbol': order['symbol'],
+        'side': order['side'],
+        'type': order.get('type') or 'limit',
+        'amount': order.get('amount'),
+        'price': order.get('price'),
+        'filled': order.get('filled') or 0.0,
+        'status': order.get('status') or 'open',
+        'timestamp': order.get('timestamp'),
+    }
+
+
 #https://docs.ccxt.com/#/exchanges/hyperliquid?id=createvault
 class HyperliquidClient:
     """
@@ -23,8 +48,14 @@ class HyperliquidClient:
 
     注意：Hyperliquid 不支持传统的 API Key + Secret 认证方式！
     如需使用 API Wallet，请在 https://app.hyperliquid.xyz/API 生成并授权。
+
+    不保证线程安全：CCXT 的同步交易所对象在请求过程中会修改自身状态（限频计数、
+    最近一次响应等），所有方法应在同一线程中顺序调用（concurrent_reads=False）
     """
 
+    # 只读方法不能并发调用（TradingAgent 会按顺序执行只读工具）
+    concurrent_reads: bool = False
+
     def __init__(
         self,
         wallet_address: Optional[str] = None,
@@ -32,7 +63,16 @@ class HyperliquidClient:
         vault_address: Optional[str] = None,
         testnet: bool = False,
         read_only: bool = False,
-        custom_endpoint: Optional[str] = None
+        custom_endpoint: Optional[str] = None,
+        price_max_age: float = 1.0,
+        price_poll_interval: Optional[float] = None,
+        candle_store: Optional[CandleStore] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        lazy_markets: bool = False,
+        rate_limiter: Optional[RequestScheduler] = None,
+        order_retries: int = 2,
+        order_index: Optional[OrderTracker] = None,
+        order_state_ttl: float = 1.0
     ):
         """
         初始化 Hyperliquid 客户端
@@ -50,6 +90,15 @@ class HyperliquidClient:
             testnet: 是否使用测试网（自动设置为 https://api.hyperliquid-testnet.xyz）
             read_only: 只读模式（不需要认证，仅查询公开数据）
             custom_endpoint: 自定义 API endpoint（可选，会覆盖 testnet 设置）
+            price_max_age: 价格表中价格的最大可接受年龄（秒，默认 1.0）
+            price_poll_interval: 后台批量轮询价格的间隔（秒，可选，不设置则按需刷新）
+            candle_store: K 线本地存储（可选，设置后 fetch_ohlcv 只增量拉取新 K 线）
+            metadata_cache: 市场元数据磁盘缓存（可选，设置后从缓存启动，过期时后台刷新）
+            lazy_markets: 是否延迟到首次需要市场数据时才加载
+            rate_limiter: 请求调度器（默认使用进程内共享的调度器，替代 CCXT 按实例的限流）
+            order_retries: 下单请求超时后使用同一个 cloid 重试的次数（默认 2）
+            order_index: 订单状态跟踪器（可选，默认每个客户端单独创建）
+            order_state_ttl: 订单表的有效期（秒，默认 1.0，过期后用 fetch_open_orders 对账）
 
         认证方式：
         1. 主钱包认证（推荐）：
@@ -79,6 +128,14 @@ class HyperliquidClient:
         self.read_only = read_only
         self.custom_endpoint = custom_endpoint
         self.vault_address = vault_address
+        self.candle_store = candle_store
+        self.metadata_cache = metadata_cache
+        self.order_retries = order_retries
+        self.order_index = order_index if order_index is not None else OrderTracker(max_age=order_state_ttl)
+        if self.order_index.reconcile_fn is None and wallet_address:
+            self.order_index.reconcile_fn = self._fetch_open_orders
+        if self.order_index.status_fn is None and wallet_address:
+            self.order_index.status_fn = self._fetch_order_status
 
         # 确定使用的 endpoint
         if custom_endpoint:
@@ -158,23 +215,107 @@ class HyperliquidClient:
                 "如需使用 API Wallet，请访问 https://app.hyperliquid.xyz/API 生成并授权。"
             )
 
+        # 所有客户端共享同一个按权重计费的调度器，替代 CCXT 按实例的 enableRateLimit
+        self.rate_limiter = rate_limiter or get_default_scheduler()
+        self.exchange.request = self.rate_limiter.wrap_ccxt_request(self.exchange.request)
+        self.exchange.enableRateLimit = False
+
         # 加载市场数据
         self.markets = {}
-        self._load_markets()
+        self._coin_to_symbol = {}
+        self._markets_key = f"ccxt:{endpoint_url}"
+        self._markets_loaded = False
+        self._markets_lock = threading.Lock()
+        self._markets_fetched_at: Optional[float] = None  # 市场数据的拉取时间（time.monotonic() 时钟）
+        if not lazy_markets:
+            self._load_markets()
+
+        # 实时价格表（批量拉取 allMids，不再依赖 load_markets 时的 midPx）
+        self.price_feed = PriceFeed(
+            self._fetch_all_mids,
+            max_age=price_max_age,
+            poll_interval=price_poll_interval
+        )
+        # 初始价格带上市场数据的拉取时间：来自磁盘缓存的 midPx 可能已经过期，不能当作最新价格
+        self.price_feed.update(self._initial_mids(), timestamp=self._markets_fetched_at)
+        if price_poll_interval:
+            self.price_feed.start()
 
         logger.info(f"Hyperliquid 客户端初始化完成 (认证方式={self.auth_method}, endpoint={endpoint_url})")
     
     def _load_markets(self) -> None:
-        """加载市场数据"""
+        """加载市场数据（设置了 metadata_cache 时优先读取磁盘缓存，过期时后台刷新）"""
         try:
-            self.markets = self.exchange.load_markets()
+            if self.metadata_cache is not None:
+                # 在 get 之前读取缓存年龄：过期缓存会触发后台刷新，之后读到的是新数据的年龄
+                age = self.metadata_cache.age(self._markets_key) or 0.0
+                metadata = self.metadata_cache.get(
+                    self._markets_key,
+                    self._fetch_markets,
+                    on_update=self._apply_markets
+                )
+            else:
+                metadata = self._fetch_markets()
+                age = 0.0
+            self._markets_fetched_at = time.monotonic() - age
+            self._apply_markets(metadata)
             logger.info(f"成功加载 {len(self.markets)} 个交易对")
         except Exception as e:
             logger.error(f"加载市场数据失败: {e}")
             raise Exception(f"Failed to load markets: {str(e)}")
+
+    def _fetch_markets(self) -> Dict[str, Any]:
+        """从交易所拉取市场和币种数据（可序列化为 JSON）"""
+        markets = self.exchange.load_markets(reload=True)
+        return {
+            'markets': list(markets.values()),
+            'currencies': self.exchange.currencies,
+        }
+
+    def _apply_markets(self, metadata: Dict[str, Any]) -> None:
+        """将市场数据写入 CCXT 实例并重建币种索引"""
+        self.markets = self.exchange.set_markets(metadata['markets'], metadata.get('currencies'))
+
+        # allMids 中永续合约使用币种名（如 "BTC"），现货使用市场 id（如 "@107"）
+        coin_to_symbol = {}
+        for symbol, market in self.markets.items():
+            coin = market.get("baseName") if market.get("swap") else market.get("id")
+            if coin:
+                coin_to_symbol[coin] = symbol
+        self._coin_to_symbol = coin_to_symbol
+        self._markets_loaded = True
+
+    def _ensure_markets(self) -> None:
+        """市场数据尚未加载时加载（延迟加载模式）"""
+        if self._markets_loaded:
+            return
+        with self._markets_lock:
+            if not self._markets_loaded:
+                self._load_markets()
+
+    def _initial_mids(self) -> Dict[str, float]:
+        """从已加载的市场数据中提取初始中间价"""
+        mids = {}
+        for symbol, market in self.markets.items():
+            mid = (market.get("info") or {}).get("midPx")
+            if mid is not None:
+                mids[symbol] = float(mid)
+        return mids
+
+    def _fetch_all_mids(self) -> Dict[str, float]:
+        """批量获取全市场中间价，返回 {symbol: price}"""
+        self._ensure_markets()
+        response = self.exchange.public_post_info({"type": "allMids"})
+        mids = {}
+        for coin, mid in response.items():
+            symbol = self._coin_to_symbol.get(coin)
+            if symbol is not None:
+                mids[symbol] = float(mid)
+        return mids
     
     def _amount_to_precision(self, symbol: str, amount: float) -> float:
         """转换数量到交易所精度要求"""
+        self._ensure_markets()
         try:
             result = self.exchange.amount_to_precision(symbol, amount)
             return float(result)
@@ -183,6 +324,7 @@ class HyperliquidClient:
     
     def _price_to_precision(self, symbol: str, price: float) -> float:
         """转换价格到交易所精度要求"""
+        self._ensure_markets()
         try:
             result = self.exchange.price_to_precision(symbol, price)
             return float(result)
@@ -192,7 +334,7 @@ class HyperliquidClient:
     def get_current_price(self, symbol: str) -> float:
         """获取当前市场价格"""
         try:
-            return float(self.markets[symbol]["info"]["midPx"])
+            return self.price_feed.get(symbol)
         except Exception as e:
             raise Exception(f"Failed to get price for {symbol}: {str(e)}")
     
@@ -254,15 +396,58 @@ class HyperliquidClient:
             logger.error(f"获取 {symbol} 行情失败: {e}")
             raise
     
+    def get_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取行情（一次 metaAndAssetCtxs 请求，买一 / 卖一为 impactPxs）
+
+        Args:
+            symbols: 交易对列表（None 表示全部永续合约）
+
+        Returns:
+            {symbol: 行情数据}，附带 markPrice、openInterest、fundingRate；未知交易对不包含在结果中
+        """
+        self._ensure_markets()
+        try:
+            if symbols is not None:
+                symbols = [symbol for symbol in symbols if symbol in self.markets]
+                if not symbols:
+                    return {}
+            # 只有永续合约时不请求现货资产上下文
+            swap_only = symbols is None or all(self.markets[symbol].get("swap") for symbol in symbols)
+            tickers = self.exchange.fetch_tickers(symbols, params={"type": "swap"} if swap_only else {})
+            for ticker in tickers.values():
+                info = ticker.get("info") or {}
+                ticker["markPrice"] = float(info["markPx"]) if info.get("markPx") is not None else None
+                ticker["openInterest"] = float(info["openInterest"]) if info.get("openInterest") is not None else None
+                ticker["fundingRate"] = float(info["funding"]) if info.get("funding") is not None else None
+            logger.info(f"批量获取行情成功: {len(tickers)} 个交易对")
+            return tickers
+        except Exception as e:
+            logger.error(f"批量获取行情失败: {e}")
+            raise
+    
     def fetch_ohlcv(self, symbol: str, timeframe: str = "1d", limit: int = 100) -> pd.DataFrame:
         """获取 K 线数据"""
         try:
-            ohlcv_data = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            
-            df = pd.DataFrame(
-                data=ohlcv_data,
-                columns=["timestamp", "open", "high", "low", "close", "volume"]
-            )
+            if self.candle_store is not None:
+                # 使用本地存储时只拉取最后一根已存 K 线之后的数据
+                df = self.candle_store.fetch(
+                    symbol,
+                    timeframe,
+                    limit,
+                    fetcher=lambda since: pd.DataFrame(
+                        data=self.exchange.fetch_ohlcv(symbol, timeframe, since=since),
+                        columns=["timestamp", "open", "high", "low", "close", "volume"]
+                    ),
+                    interval_ms=self.exchange.parse_timeframe(timeframe) * 1000
+                )
+            else:
+                ohlcv_data = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                df = pd.DataFrame(
+                    data=ohlcv_data,
+                    columns=["timestamp", "open", "high", "low", "close", "volume"]
+                )
+
             df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
             df = df.set_index("timestamp").sort_index()
             
@@ -292,15 +477,18 @@ class HyperliquidClient:
         amount: float,
         reduce_only: bool = False,
         take_profit_price: Optional[float] = None,
-        stop_loss_price: Optional[float] = None
+        stop_loss_price: Optional[float] = None,
+        cloid: Optional[str] = None
     ) -> Dict[str, Any]:
-        """下市价单"""
+        """下市价单（cloid 默认自动生成，超时后使用同一个 cloid 重试）"""
         try:
             formatted_amount = self._amount_to_precision(symbol, amount)
-            price = float(self.markets[symbol]["info"]["midPx"])
+            price = self.get_current_price(symbol)
             formatted_price = self._price_to_precision(symbol, price)
+            cloid = cloid or new_cloid()
+            self.order_index.register(cloid, symbol, side, formatted_amount, formatted_price, order_type='market')
             
-            params = {"reduceOnly": reduce_only}
+            params = {"reduceOnly": reduce_only, "clientOrderId": cloid}
             
             if take_profit_price is not None:
                 formatted_tp_price = self._price_to_precision(symbol, take_profit_price)
@@ -310,14 +498,14 @@ class HyperliquidClient:
                 formatted_sl_price = self._price_to_precision(symbol, stop_loss_price)
                 params["stopLossPrice"] = formatted_sl_price
             
-            order = self.exchange.create_order(
+            order = self._submit_order(cloid, lambda: self.exchange.create_order(
                 symbol=symbol,
                 type="market",
                 side=side,
                 amount=formatted_amount,
                 price=formatted_price,
                 params=params
-            )
+            ))
             
             logger.info(f"市价单创建成功: {symbol} {side} {amount}")
             return order
@@ -331,23 +519,26 @@ class HyperliquidClient:
         side: str,
         amount: float,
         price: float,
-        reduce_only: bool = False
+        reduce_only: bool = False,
+        cloid: Optional[str] = None
     ) -> Dict[str, Any]:
-        """创建限价单"""
+        """创建限价单（cloid 默认自动生成，超时后使用同一个 cloid 重试）"""
         try:
             formatted_amount = self._amount_to_precision(symbol, amount)
             formatted_price = self._price_to_precision(symbol, price)
+            cloid = cloid or new_cloid()
+            self.order_index.register(cloid, symbol, side, formatted_amount, formatted_price)
             
-            params = {"reduceOnly": reduce_only}
+            params = {"reduceOnly": reduce_only, "clientOrderId": cloid}
             
-            order = self.exchange.create_order(
+            order = self._submit_order(cloid, lambda: self.exchange.create_order(
                 symbol=symbol,
                 type="limit",
                 side=side,
                 amount=formatted_amount,
                 price=formatted_price,
                 params=params
-            )
+            ))
             
             logger.info(f"限价单创建成功: {symbol} {side} {amount} @ {price}")
             return order
@@ -355,35 +546,273 @@ class HyperliquidClient:
             logger.error(f"创建限价单失败: {e}")
             raise
     
+    def place_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量下单（通过 create_orders 一次请求提交）
+
+        Args:
+            orders: 订单列表，每项包含 symbol、side、amount、type（'limit' 默认 / 'market'）、
+                price（限价单必填）、reduce_only（可选）、cloid（可选，默认自动生成）
+
+        Returns:
+            与 orders 一一对应的 CCXT 订单结构列表
+        """
+        if not orders:
+            return []
+        try:
+            requests = []
+            for order in orders:
+                symbol = order['symbol']
+                order_type = order.get('type', 'limit')
+                if order_type == 'market':
+                    # Hyperliquid 市价单需要参考价计算滑点价格
+                    price = self.get_current_price(symbol)
+                elif order_type == 'limit':
+                    if order.get('price') is None:
+                        raise ValueError(f"限价单必须提供价格: {order}")
+                    price = order['price']
+                else:
+                    raise ValueError(f"不支持的订单类型: {order_type}")
+
+                cloid = order.get('cloid') or new_cloid()
+                request = {
+                    'symbol': symbol,
+                    'type': order_type,
+                    'side': order['side'],
+                    'amount': self._amount_to_precision(symbol, order['amount']),
+                    'price': self._price_to_precision(symbol, price),
+                    'params': {'reduceOnly': bool(order.get('reduce_only', False)), 'clientOrderId': cloid},
+                }
+                self.order_index.register(cloid, symbol, order['side'], request['amount'], request['price'], order_type)
+                requests.append(request)
+
+            cloids = [request['params']['clientOrderId'] for request in requests]
+
+            def attempt():
+                for cloid in cloids:
+                    self.order_index.record_attempt(cloid)
+                return self.exchange.create_orders(requests)
+
+            result = submit_idempotent(attempt, retries=self.order_retries, description="批量下单")
+            for cloid, order in zip(cloids, result):
+                self._index_order(cloid, order)
+            logger.info(f"批量下单成功: {len(result)} 个订单")
+            return result
+        except Exception as e:
+            logger.error(f"批量下单失败: {e}")
+            raise Exception(f"Failed to place orders: {str(e)}")
+    
+    def modify_order(
+        self,
+        order_id: str,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float,
+        reduce_only: bool = False
+    ) -> Dict[str, Any]:
+        """修改挂单价格 / 数量（一次请求，不需要先撤单再下单；修改后的订单沿用原订单的 cloid）"""
+        try:
+            cloid = self._modify_cloid(order_id)
+            order = self.exchange.edit_order(
+                id=order_id,
+                symbol=symbol,
+                type="limit",
+                side=side,
+                amount=self._amount_to_precision(symbol, amount),
+                price=self._price_to_precision(symbol, price),
+                params={"reduceOnly": reduce_only, "clientOrderId": cloid}
+            )
+            self._index_modified(order_id, cloid, order, amount, price)
+            logger.info(f"订单修改成功: {order_id} -> {side} {amount} @ {price}")
+            return order
+        except Exception as e:
+            logger.error(f"修改订单失败: {e}")
+            raise Exception(f"Failed to modify order: {str(e)}")
+
+    def modify_orders(self, modifies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量修改挂单（通过 edit_orders 一次请求提交）
+
+        Args:
+            modifies: 修改列表，每项包含 order_id、symbol、side、amount、price，可选 reduce_only
+
+        Returns:
+            与 modifies 一一对应的 CCXT 订单结构列表（修改后的订单沿用原订单的 cloid）
+        """
+        if not modifies:
+            return []
+        try:
+            requests = [
+                {
+                    'id': modify['order_id'],
+                    'symbol': modify['symbol'],
+                    'type': 'limit',
+                    'side': modify['side'],
+                    'amount': self._amount_to_precision(modify['symbol'], modify['amount']),
+                    'price': self._price_to_precision(modify['symbol'], modify['price']),
+                    'params': {
+                        'reduceOnly': bool(modify.get('reduce_only', False)),
+                        'clientOrderId': self._modify_cloid(modify['order_id']),
+                    },
+                }
+                for modify in modifies
+            ]
+            result = self.exchange.edit_orders(requests)
+            for request, order in zip(requests, result):
+                self._index_modified(
+                    request['id'], request['params']['clientOrderId'], order, request['amount'], request['price']
+                )
+            logger.info(f"批量修改订单成功: {len(result)} 个订单")
+            return result
+        except Exception as e:
+            logger.error(f"批量修改订单失败: {e}")
+            raise Exception(f"Failed to modify orders: {str(e)}")
+    
+    def _modify_cloid(self, order_id: str) -> str:
+        """
+        改单使用的 cloid：沿用原订单的 cloid，原订单没有 cloid 时生成新的
+
+        CCXT 的 edit_orders 要求同一批改单要么都带 clientOrderId，要么都不带
+        """
+        if is_cloid(order_id):
+            return order_id
+        record = self.order_index.lookup(order_id)
+        if record is not None and is_cloid(record.get('cloid')):
+            return record['cloid']
+        return new_cloid()
+
+    def _index_modified(self, previous_id: str, cloid: str, order: Dict[str, Any], amount: float, price: float) -> None:
+        """改单成功后把订单表中的原订单更新为修改后的订单（原订单不在订单表中时新增）"""
+        if order.get('id') is None:
+            return
+        # 改单响应通常只有 id 和状态：数量、价格取请求值，其余缺失的字段保留原值
+        order = {'amount': amount, 'price': price, **{k: v for k, v in order.items() if v is not None}}
+        fields = {
+            name: order[name]
+            for name in ('amount', 'price', 'filled', 'average')
+            if order.get(name) is not None
+        }
+        record = self.order_index.update(
+            previous_id,
+            oid=order['id'],
+            status=order.get('status') or 'open',
+            **fields
+        )
+        if record is None:
+            if order.get('symbol') and order.get('side'):
+                self.order_index.upsert({**_order_from_ccxt(order), 'cloid': cloid})
+        elif not record.get('cloid'):
+            # 原订单没有 cloid，改单时生成了新的
+            record['cloid'] = cloid
+
     def cancel_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
-        """取消订单"""
+        """取消订单（order_id 可以是 oid 或 0x 开头的 cloid）"""
         try:
-            result = self.exchange.cancel_order(order_id, symbol)
+            params = {'clientOrderId': order_id} if is_cloid(order_id) else {}
+            result = self.exchange.cancel_order(order_id, symbol, params=params)
+            self.order_index.update(order_id, status='canceled')
             logger.info(f"订单取消成功: {order_id}")
             return result
         except Exception as e:
             logger.error(f"取消订单失败: {e}")
             raise
     
-    def get_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
-        """查询订单状态"""
+    def get_order(self, order_id: str, symbol: str, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        查询订单状态（order_id 可以是 oid 或 0x 开头的 cloid）
+
+        先从订单表中查找（数据最多落后 max_age 秒），订单表中没有、订单尚未确认或对账时状态未知
+        才调用 fetch_order。
+        """
         try:
-            order = self.exchange.fetch_order(order_id, symbol)
+            record = self.order_index.get_order(order_id, max_age=max_age)
+            if record is not None and record['status'] not in ('pending', 'unknown'):
+                return record
+
+            params = {'clientOrderId': order_id} if is_cloid(order_id) else {}
+            order = _order_from_ccxt(self.exchange.fetch_order(order_id, symbol, params=params))
+            if is_cloid(order_id):
+                order['cloid'] = order_id
             logger.info(f"查询订单成功: {order_id}")
-            return order
+            return self.order_index.upsert(order)
         except Exception as e:
             logger.error(f"查询订单失败: {e}")
             raise
+
+    def get_order_status(self, order_id: str, symbol: str, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """查询订单状态（同 get_order）"""
+        return self.get_order(order_id, symbol, max_age=max_age)
+
+    def get_order_by_cloid(self, cloid: str, symbol: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+        """
+        按客户端订单 ID 查询订单
+
+        优先读取订单表（O(1)，不发起请求）；订单表中没有该订单、状态未知或 refresh=True 时
+        通过 fetch_order 查询交易所并写回订单表。
+
+        Returns:
+            订单记录，包含 cloid、id、symbol、side、amount、price、status、filled、average
+        """
+        record = self.order_index.get(cloid)
+        if record is not None and not refresh and record['status'] != 'unknown':
+            return record
+
+        order = self.exchange.fetch_order(cloid, symbol or (record or {}).get('symbol'), params={'clientOrderId': cloid})
+        return self.order_index.upsert({**_order_from_ccxt(order), 'cloid': cloid})
+
+    def _submit_order(self, cloid: str, create) -> Dict[str, Any]:
+        """
+        提交带 clientOrderId 的订单，超时后使用同一个 cloid 重试（交易所不会重复下单）
+
+        重试因 cloid 重复被拒绝时，说明超时的那次提交已被接受，直接查询该 cloid 的订单。
+        """
+        def attempt():
+            attempts = self.order_index.record_attempt(cloid)
+            try:
+                return create()
+            except Exception as e:
+                if attempts > 1 and 'cloid' in str(e).lower():
+                    record = self.order_index.get(cloid)
+                    return self.exchange.fetch_order(cloid, record['symbol'], params={'clientOrderId': cloid})
+                raise
+
+        order = submit_idempotent(attempt, retries=self.order_retries)
+        self._index_order(cloid, order)
+        return order
+
+    def _index_order(self, order_id: str, order: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """用 CCXT 订单结构更新 cloid 索引（order_id 为 cloid 或 oid）"""
+        return self.order_index.update(
+            order_id,
+            oid=order.get('id'),
+            status=order.get('status'),
+            filled=order.get('filled') or 0.0,
+            average=order.get('average')
+        )
     
-    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
-        """获取未成交订单"""
+    def get_open_orders(self, symbol: Optional[str] = None, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """获取未成交订单（读取订单表，订单表超过 max_age 秒时先用 fetch_open_orders 对账）"""
         try:
-            orders = self.exchange.fetch_open_orders(symbol)
+            orders = self.order_index.open_orders(symbol, max_age=max_age)
             logger.info(f"获取未成交订单成功: {len(orders)} 个")
             return orders
         except Exception as e:
             logger.error(f"获取未成交订单失败: {e}")
             raise
+
+    def _fetch_open_orders(self) -> List[Dict[str, Any]]:
+        """从交易所拉取全部未成交订单（订单表对账使用）"""
+        return [_order_from_ccxt(order) for order in self.exchange.fetch_open_orders()]
+
+    def _fetch_order_status(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """查询订单表中一条记录的当前状态（对账时查询已从未成交订单中消失的挂单）"""
+        cloid = record.get('cloid')
+        if is_cloid(cloid):
+            order = self.exchange.fetch_order(cloid, record['symbol'], params={'clientOrderId': cloid})
+        else:
+            order = self.exchange.fetch_order(record['id'], record['symbol'])
+        return _order_from_ccxt(order)
     
     # ========== 杠杆和保证金 ==========
     
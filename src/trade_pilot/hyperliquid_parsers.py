@@ -0,0 +1,230 @@
+"""
+Hyperliquid /info 响应解析
+同步客户端（HyperliquidSDKClient）和异步客户端（AsyncHyperliquidSDKClient）共用的解析函数，
+输入为 /info 接口返回的原始 JSON，输出为客户端方法返回的字典 / DataFrame
+"""
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .order_tracker import order_from_hyperliquid
+
+
+def base_symbol(symbol: str) -> str:
+    """移除 /USDC:USDC 后缀，只保留基础符号"""
+    return symbol.split('/')[0] if '/' in symbol else symbol
+
+
+def markets_from_meta(meta: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """从 meta 中解析永续合约市场（资产编号即 universe 中的位置）"""
+    markets = {}
+    if not meta or 'universe' not in meta:
+        return markets
+
+    for index, asset in enumerate(meta['universe']):
+        symbol = asset['name']
+        sz_decimals = asset.get('szDecimals', 0)
+        markets[symbol] = {
+            'symbol': symbol,
+            'name': asset.get('name'),
+            'asset': index,
+            'szDecimals': sz_decimals,
+            # 永续合约价格最多 5 位有效数字，且小数位数不超过 6 - szDecimals
+            'pxDecimals': max(0, 6 - sz_decimals),
+            'maxLeverage': asset.get('maxLeverage'),
+            'onlyIsolated': asset.get('onlyIsolated', False),
+            'active': not asset.get('isDelisted', False),
+        }
+    return markets
+
+
+def parse_balance(user_state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """从用户状态中解析余额信息"""
+    balance_info = {
+        'free': {},
+        'used': {},
+        'total': {}
+    }
+    if not user_state:
+        return balance_info
+
+    # 从 marginSummary 获取余额
+    if 'marginSummary' in user_state:
+        margin = user_state['marginSummary']
+        total_value = float(margin.get('accountValue', 0))
+        balance_info['total']['USDC'] = total_value
+        balance_info['free']['USDC'] = total_value
+
+    return balance_info
+
+
+def parse_positions(
+    user_state: Optional[Dict[str, Any]],
+    symbols: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """从用户状态中解析持仓信息"""
+    if not user_state or 'assetPositions' not in user_state:
+        return []
+
+    positions = []
+    for pos in user_state['assetPositions']:
+        position_info = pos.get('position', {})
+
+        # 跳过没有持仓的
+        if float(position_info.get('szi', 0)) == 0:
+            continue
+
+        symbol = position_info.get('coin', '')
+        size = float(position_info.get('szi', 0))
+        entry_price = float(position_info.get('entryPx', 0))
+
+        positions.append({
+            'symbol': symbol,
+            'side': 'long' if size > 0 else 'short',
+            'size': abs(size),
+            'entry_price': entry_price,
+            'unrealized_pnl': float(position_info.get('unrealizedPnl', 0)),
+            'leverage': float(position_info.get('leverage', {}).get('value', 1)),
+        })
+
+    # 如果指定了 symbols，过滤结果
+    if symbols:
+        base_symbols = [base_symbol(s) for s in symbols]
+        positions = [p for p in positions if p['symbol'] in base_symbols]
+
+    return positions
+
+
+def parse_open_orders(
+    open_orders: Optional[List[Dict[str, Any]]],
+    symbol: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    解析 frontendOpenOrders 返回的未成交订单
+
+    Args:
+        open_orders: frontendOpenOrders 返回的订单列表（clearinghouseState 中没有挂单）
+        symbol: 交易对（可选），例如 "BTC" 或 "BTC/USDC:USDC"
+
+    Returns:
+        订单字典列表（格式见 order_from_hyperliquid）
+    """
+    coin = base_symbol(symbol) if symbol else None
+    return [
+        order_from_hyperliquid(order)
+        for order in open_orders or []
+        if coin is None or order.get('coin') == coin
+    ]
+
+
+def candles_to_dataframe(candles: Optional[List[Dict[str, Any]]], limit: int) -> pd.DataFrame:
+    """将 candles_snapshot 返回的 K 线转换为 DataFrame"""
+    if not candles:
+        return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+    # 转换为 DataFrame
+    df = pd.DataFrame(candles)
+
+    # 重命名列
+    df = df.rename(columns={
+        't': 'timestamp',
+        'o': 'open',
+        'h': 'high',
+        'l': 'low',
+        'c': 'close',
+        'v': 'volume'
+    })
+
+    # 转换数据类型
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # 限制返回数量
+    if len(df) > limit:
+        df = df.tail(limit)
+
+    return df.reset_index(drop=True)
+
+
+def parse_order_book(l2_data: Any, symbol: str, depth: int) -> Dict[str, Any]:
+    """将 l2_snapshot 返回的数据转换为订单簿字典"""
+    bids = []
+    asks = []
+
+    # l2_data['levels'] 是一个包含两个列表的列表
+    # levels[0] 是买盘（bids），levels[1] 是卖盘（asks）
+    if isinstance(l2_data, dict) and 'levels' in l2_data:
+        levels = l2_data['levels']
+
+        if isinstance(levels, list) and len(levels) >= 2:
+            # 处理买盘
+            if isinstance(levels[0], list):
+                for level in levels[0][:depth]:
+                    if isinstance(level, dict):
+                        bids.append({
+                            'price': float(level.get('px', 0)),
+                            'size': float(level.get('sz', 0)),
+                            'orders': level.get('n', 0)
+                        })
+
+            # 处理卖盘
+            if isinstance(levels[1], list):
+                for level in levels[1][:depth]:
+                    if isinstance(level, dict):
+                        asks.append({
+                            'price': float(level.get('px', 0)),
+                            'size': float(level.get('sz', 0)),
+                            'orders': level.get('n', 0)
+                        })
+
+    return {
+        'symbol': symbol,
+        'bids': bids,
+        'asks': asks,
+        'timestamp': l2_data.get('time', 0) if isinstance(l2_data, dict) else 0
+    }
+
+
+def optional_float(value: Any) -> Optional[float]:
+    """数值字段转换为 float（None 保持为 None）"""
+    return float(value) if value is not None else None
+
+
+def asset_ctxs_by_name(meta_and_ctxs: Any) -> Dict[str, Dict[str, Any]]:
+    """将 metaAndAssetCtxs 返回的 [meta, ctxs] 转换为 {币种: 资产上下文}（上下文中附带 maxLeverage）"""
+    meta, ctxs = meta_and_ctxs
+    return {
+        asset['name']: {**ctx, 'maxLeverage': asset.get('maxLeverage')}
+        for asset, ctx in zip(meta.get('universe', []), ctxs)
+    }
+
+
+def ticker_from_ctx(symbol: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    将永续合约资产上下文转换为行情字典
+
+    买一 / 卖一使用 impactPxs（按冲击成交额计算的买卖价，与 CCXT 一致），
+    24 小时涨跌幅相对 prevDayPx，成交额为 dayNtlVlm（USDC），持仓量为币的数量
+    """
+    mark = optional_float(ctx.get('markPx'))
+    mid = optional_float(ctx.get('midPx'))
+    last = mid if mid is not None else mark
+    impact = ctx.get('impactPxs') or [None, None]
+    prev = optional_float(ctx.get('prevDayPx'))
+    return {
+        'symbol': symbol,
+        'last': last,
+        'bid': optional_float(impact[0]),
+        'ask': optional_float(impact[1]),
+        'markPrice': mark,
+        'indexPrice': optional_float(ctx.get('oraclePx')),
+        'open': prev,
+        'percentage': (last / prev - 1) * 100 if last is not None and prev else None,
+        'volume': optional_float(ctx.get('dayBaseVlm')),
+        'quoteVolume': optional_float(ctx.get('dayNtlVlm')),
+        'openInterest': optional_float(ctx.get('openInterest')),
+        'fundingRate': optional_float(ctx.get('funding')),
+        'timestamp': None,
+        'datetime': None,
+    }
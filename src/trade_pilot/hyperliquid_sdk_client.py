@@ -8,12 +8,95 @@ Hyperliquid 官方 SDK 客户端封装
 """
 
 from typing import Optional, Dict, List, Any
+import functools
+import threading
+import time
 import pandas as pd
 import eth_account
 from eth_account.signers.local import LocalAccount
+from hyperliquid.api import API
 from hyperliquid.info import Info
 from hyperliquid.exchange import Exchange
 from hyperliquid.utils import constants
+from hyperliquid.utils.types import Cloid
+from .cache import TTLSnapshotCache
+from .candle_store import CandleStore
+from .backfill import OHLCVBackfiller, TIMEFRAME_MS, MAX_CANDLES_PER_REQUEST
+from .order_book import LocalOrderBook
+from .subscriptions import SubscriptionManager
+from .metadata_cache import MetadataCache
+from .rate_limiter import RequestScheduler, get_default_scheduler
+from .order_index import new_cloid, is_cloid, submit_idempotent
+from .order_tracker import OrderTracker, order_from_hyperliquid
+from .hyperliquid_parsers import (
+    asset_ctxs_by_name,
+    candles_to_dataframe,
+    markets_from_meta,
+    parse_balance,
+    parse_order_book,
+    parse_positions,
+    ticker_from_ctx,
+)
+
+# 尚未加载元数据时传给 Info / Exchange 的空元数据（避免构造时发起请求）
+_EMPTY_META = {'universe': []}
+_EMPTY_SPOT_META = {'universe': [], 'tokens': []}
+
+
+def _invalidates_account_state(method):
+    """交易类方法执行后（无论成功与否）使账户状态快照失效"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.user_state_cache.invalidate()
+    return wrapper
+
+
+def _requires_markets(method):
+    """延迟加载模式下，首次交易前加载市场元数据（下单需要资产编号）"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._ensure_markets()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _apply_order_statuses(results: List[Dict[str, Any]], response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """将批量下单 / 批量改单返回的 statuses 逐项写入结果（open / closed / rejected）"""
+    if response.get('status') != 'ok':
+        raise Exception(response.get('response'))
+
+    statuses = response['response']['data']['statuses']
+    for result, status in zip(results, statuses):
+        if 'resting' in status:
+            result['id'] = status['resting']['oid']
+            result['status'] = 'open'
+        elif 'filled' in status:
+            filled = status['filled']
+            result['id'] = filled['oid']
+            result['status'] = 'closed'
+            result['filled'] = float(filled['totalSz'])
+            result['average'] = float(filled['avgPx'])
+        else:
+            result['status'] = 'rejected'
+            result['error'] = status.get('error', str(status)) if isinstance(status, dict) else str(status)
+    return results
+
+
+def _to_oid(order_id: Any) -> Any:
+    """订单 ID 转换为 SDK 参数：0x 开头的 16 字节十六进制字符串视为 cloid，其余视为 oid"""
+    if isinstance(order_id, Cloid):
+        return order_id
+    if isinstance(order_id, str) and order_id.startswith('0x'):
+        return Cloid.from_str(order_id)
+    return int(order_id)
+
+
+def _is_duplicate_cloid(error: Optional[str]) -> bool:
+    """下单被拒绝的原因是否为 cloid 重复（超时重试时首次提交已被交易所接受）"""
+    return bool(error) and 'cloid' in error.lower()
 
 
 class HyperliquidSDKClient:
@@ -43,7 +126,14 @@ class HyperliquidSDKClient:
         
         # 只读模式
         client = HyperliquidSDKClient(read_only=True)
+
+    线程安全：行情、K 线、订单簿、账户状态和订单表的缓存都有锁保护，只读方法
+    （get_ticker、get_order_book、fetch_ohlcv、get_positions、get_open_orders 等）
+    可以在多个线程中并发调用（concurrent_reads=True）；下单、撤单等写操作应顺序调用
     """
+
+    # 只读方法可以并发调用（TradingAgent 会并发执行只读工具）
+    concurrent_reads: bool = True
     
     def __init__(
         self,
@@ -52,7 +142,19 @@ class HyperliquidSDKClient:
         vault_address: Optional[str] = None,
         testnet: bool = False,
         read_only: bool = False,
-        custom_endpoint: Optional[str] = None
+        custom_endpoint: Optional[str] = None,
+        mids_ttl: float = 0.25,
+        user_state_ttl: float = 1.0,
+        asset_ctxs_ttl: float = 1.0,
+        candle_store: Optional[CandleStore] = None,
+        order_book_ttl: float = 0.25,
+        use_websocket: bool = False,
+        metadata_cache: Optional[MetadataCache] = None,
+        lazy_markets: bool = False,
+        rate_limiter: Optional[RequestScheduler] = None,
+        order_retries: int = 2,
+        order_index: Optional[OrderTracker] = None,
+        order_state_ttl: float = 1.0
     ):
         """
         初始化 Hyperliquid 官方 SDK 客户端
@@ -64,12 +166,40 @@ class HyperliquidSDKClient:
             testnet: 是否使用测试网
             read_only: 是否只读模式（无需认证）
             custom_endpoint: 自定义 API endpoint
+            mids_ttl: 全市场中间价快照的有效期（秒，默认 0.25）
+            user_state_ttl: 账户状态快照的有效期（秒，默认 1.0，交易操作后自动失效）
+            asset_ctxs_ttl: 全市场资产上下文快照（买卖价、成交额、持仓量、资金费率）的有效期（秒，默认 1.0）
+            candle_store: K 线本地存储（可选，设置后 fetch_ohlcv 只增量拉取新 K 线）
+            order_book_ttl: 本地订单簿的有效期（秒，默认 0.25，过期后重新拉取 L2 快照）
+            use_websocket: 是否通过 websocket 推送维护中间价、订单簿和账户状态（默认 False）
+            metadata_cache: 市场元数据磁盘缓存（可选，设置后从缓存启动，过期时后台刷新）
+            lazy_markets: 是否延迟到首次访问交易对或首次交易时才加载市场元数据
+            rate_limiter: 请求调度器（默认使用进程内共享的调度器，所有客户端共用同一份请求额度）
+            order_retries: 下单请求超时后使用同一个 cloid 重试的次数（默认 2）
+            order_index: 订单状态跟踪器（可选，默认每个客户端单独创建）
+            order_state_ttl: 没有推送时订单表的有效期（秒，默认 1.0，过期后用未成交订单快照对账）
         """
         self.wallet_address = wallet_address
         self.private_key = private_key
         self.vault_address = vault_address
         self.testnet = testnet
         self.read_only = read_only
+        self.candle_store = candle_store
+        self.order_book_ttl = order_book_ttl
+        self.order_books: Dict[str, LocalOrderBook] = {}
+        self.ws: Optional[SubscriptionManager] = None
+        self.metadata_cache = metadata_cache
+        self.rate_limiter = rate_limiter or get_default_scheduler()
+        self.order_retries = order_retries
+        # 订单表（按 oid / cloid / 交易对索引，推送实时更新，没有推送时按有效期对账）
+        self.order_index = order_index if order_index is not None else OrderTracker(max_age=order_state_ttl)
+        if self.order_index.reconcile_fn is None and wallet_address:
+            self.order_index.reconcile_fn = self._fetch_open_orders
+        if self.order_index.status_fn is None and wallet_address:
+            self.order_index.status_fn = self._fetch_order_status
+        self.markets: Dict[str, Any] = {}
+        self._markets_loaded = False
+        self._markets_lock = threading.Lock()
         
         # 确定 API URL
         if custom_endpoint:
@@ -94,7 +224,18 @@ class HyperliquidSDKClient:
                 )
         
         # 初始化 Info 客户端（用于查询数据）
-        self.info = Info(self.api_url, skip_ws=True)
+        # 元数据由 _load_markets 统一加载（可走磁盘缓存），构造时不发起请求
+        self.info = Info(self.api_url, skip_ws=True, meta=_EMPTY_META, spot_meta=_EMPTY_SPOT_META)
+        self.info.post = self.rate_limiter.wrap_post(self.info.post)
+
+        # 全市场中间价快照（所有价格查询共享同一份 all_mids 数据）
+        self.mids_cache = TTLSnapshotCache(self.info.all_mids, ttl=mids_ttl)
+
+        # 全市场资产上下文快照（所有行情查询共享同一份 metaAndAssetCtxs 数据）
+        self.asset_ctxs_cache = TTLSnapshotCache(self._fetch_asset_ctxs, ttl=asset_ctxs_ttl)
+
+        # 账户状态快照（余额、持仓、未成交订单共享同一份 user_state 数据）
+        self.user_state_cache = TTLSnapshotCache(self._fetch_user_state, ttl=user_state_ttl)
 
         # 初始化 Exchange 客户端（用于交易）
         self.exchange = None
@@ -108,8 +249,12 @@ class HyperliquidSDKClient:
             self.exchange = Exchange(
                 self.account,
                 base_url=self.api_url,
-                account_address=wallet_address if vault_address else None
+                meta=_EMPTY_META,
+                account_address=wallet_address if vault_address else None,
+                spot_meta=_EMPTY_SPOT_META
             )
+            self.exchange.post = self.rate_limiter.wrap_post(self.exchange.post)
+            self.exchange.info.post = self.rate_limiter.wrap_post(self.exchange.info.post)
         
         # 设置认证方式标识
         if read_only:
@@ -120,27 +265,80 @@ class HyperliquidSDKClient:
             self.auth_method = "main_wallet"
         
         # 加载市场数据
-        self.markets = self._load_markets()
+        if not lazy_markets:
+            self._load_markets()
+
+        if use_websocket:
+            self.start_websocket()
     
     def _load_markets(self) -> Dict[str, Any]:
-        """加载市场数据"""
+        """加载市场数据（设置了 metadata_cache 时优先读取磁盘缓存）"""
         try:
-            meta = self.info.meta()
-            markets = {}
-            
-            if meta and 'universe' in meta:
-                for asset in meta['universe']:
-                    symbol = asset['name']
-                    markets[symbol] = {
-                        'symbol': symbol,
-                        'name': asset.get('name'),
-                        'szDecimals': asset.get('szDecimals', 0),
-                    }
-            
-            return markets
+            if self.metadata_cache is not None:
+                metadata = self.metadata_cache.get(
+                    f"sdk:{self.api_url}",
+                    self._fetch_metadata,
+                    on_update=self._apply_metadata
+                )
+            else:
+                metadata = self._fetch_metadata()
+            self._apply_metadata(metadata)
         except Exception as e:
             print(f"加载市场数据失败: {e}")
-            return {}
+        return self.markets
+
+    def _fetch_metadata(self) -> Dict[str, Any]:
+        """从交易所拉取永续和现货元数据"""
+        api = API(self.api_url)
+        api.post = self.rate_limiter.wrap_post(api.post)
+        return {
+            'meta': api.post("/info", {"type": "meta"}),
+            'spotMeta': api.post("/info", {"type": "spotMeta"}),
+        }
+
+    def _apply_metadata(self, metadata: Dict[str, Any]) -> None:
+        """用元数据更新市场列表和 Info / Exchange 的资产编号映射"""
+        mapping = Info(self.api_url, skip_ws=True, meta=metadata['meta'], spot_meta=metadata['spotMeta'])
+        infos = [self.info] + ([self.exchange.info] if self.exchange is not None else [])
+        for info in infos:
+            info.coin_to_asset.update(mapping.coin_to_asset)
+            info.name_to_coin.update(mapping.name_to_coin)
+            info.asset_to_sz_decimals.update(mapping.asset_to_sz_decimals)
+        self.markets = markets_from_meta(metadata['meta'])
+        self._markets_loaded = True
+
+    def _ensure_markets(self) -> None:
+        """市场元数据尚未加载时加载（延迟加载模式）"""
+        if self._markets_loaded:
+            return
+        with self._markets_lock:
+            if not self._markets_loaded:
+                self._load_markets()
+
+    def market(self, symbol: str) -> Dict[str, Any]:
+        """
+        获取单个交易对的元数据（asset、szDecimals、pxDecimals、maxLeverage 等）
+
+        Args:
+            symbol: 交易对符号，例如 "BTC" 或 "BTC/USDC:USDC"
+
+        Returns:
+            市场元数据字典
+        """
+        self._ensure_markets()
+        base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
+        market = self.markets.get(base_symbol)
+        if market is None:
+            raise ValueError(f"未找到交易对: {symbol}")
+        return market
+
+    def _fetch_asset_ctxs(self) -> Dict[str, Dict[str, Any]]:
+        """从交易所拉取全部永续合约的资产上下文，返回 {币种: 上下文}"""
+        return asset_ctxs_by_name(self.info.meta_and_asset_ctxs())
+
+    def _fetch_user_state(self) -> Dict[str, Any]:
+        """从交易所拉取账户状态"""
+        return self.info.user_state(self.wallet_address)
     
     def get_current_price(self, symbol: str) -> float:
         """
@@ -156,8 +354,8 @@ class HyperliquidSDKClient:
             # 移除 /USDC:USDC 后缀，只保留基础符号
             base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
             
-            # 获取所有价格
-            all_mids = self.info.all_mids()
+            # 从共享快照中获取所有价格
+            all_mids = self.mids_cache.get()
             
             if base_symbol in all_mids:
                 return float(all_mids[base_symbol])
@@ -168,7 +366,7 @@ class HyperliquidSDKClient:
     
     def get_ticker(self, symbol: str) -> Dict[str, Any]:
         """
-        获取行情数据
+        获取行情数据（来自全市场资产上下文快照）
         
         Args:
             symbol: 交易对符号
@@ -178,24 +376,33 @@ class HyperliquidSDKClient:
         """
         try:
             base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
-            
-            # 获取用户状态（包含持仓和余额信息）
-            if self.wallet_address:
-                user_state = self.info.user_state(self.wallet_address)
-            else:
-                user_state = None
-            
-            # 获取价格
-            price = self.get_current_price(base_symbol)
-            
-            return {
-                'symbol': symbol,
-                'last': price,
-                'bid': price,  # 官方 SDK 没有直接的 bid/ask，使用 mid price
-                'ask': price,
-                'timestamp': None,
-                'datetime': None,
-            }
+            ctx = self.asset_ctxs_cache.get().get(base_symbol)
+            if ctx is None:
+                raise ValueError(f"未找到交易对: {symbol}")
+            return ticker_from_ctx(symbol, ctx)
+        except Exception as e:
+            raise Exception(f"获取行情失败: {e}")
+
+    def get_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        一次请求获取多个交易对的行情
+
+        Args:
+            symbols: 交易对列表（None 表示全部永续合约）
+
+        Returns:
+            {symbol: 行情数据}，未找到的交易对不包含在结果中
+        """
+        try:
+            ctxs = self.asset_ctxs_cache.get()
+            if symbols is None:
+                symbols = list(ctxs)
+            tickers = {}
+            for symbol in symbols:
+                ctx = ctxs.get(symbol.split('/')[0] if '/' in symbol else symbol)
+                if ctx is not None:
+                    tickers[symbol] = ticker_from_ctx(symbol, ctx)
+            return tickers
         except Exception as e:
             raise Exception(f"获取行情失败: {e}")
     
@@ -213,26 +420,7 @@ class HyperliquidSDKClient:
             raise Exception("需要提供钱包地址")
         
         try:
-            user_state = self.info.user_state(self.wallet_address)
-            
-            if not user_state:
-                return {'free': {}, 'used': {}, 'total': {}}
-            
-            # 解析余额信息
-            balance_info = {
-                'free': {},
-                'used': {},
-                'total': {}
-            }
-            
-            # 从 marginSummary 获取余额
-            if 'marginSummary' in user_state:
-                margin = user_state['marginSummary']
-                total_value = float(margin.get('accountValue', 0))
-                balance_info['total']['USDC'] = total_value
-                balance_info['free']['USDC'] = total_value
-            
-            return balance_info
+            return parse_balance(self.user_state_cache.get())
         except Exception as e:
             raise Exception(f"获取余额失败: {e}")
     
@@ -253,38 +441,7 @@ class HyperliquidSDKClient:
             raise Exception("需要提供钱包地址")
         
         try:
-            user_state = self.info.user_state(self.wallet_address)
-            
-            if not user_state or 'assetPositions' not in user_state:
-                return []
-            
-            positions = []
-            for pos in user_state['assetPositions']:
-                position_info = pos.get('position', {})
-                
-                # 跳过没有持仓的
-                if float(position_info.get('szi', 0)) == 0:
-                    continue
-                
-                symbol = position_info.get('coin', '')
-                size = float(position_info.get('szi', 0))
-                entry_price = float(position_info.get('entryPx', 0))
-                
-                positions.append({
-                    'symbol': symbol,
-                    'side': 'long' if size > 0 else 'short',
-                    'size': abs(size),
-                    'entry_price': entry_price,
-                    'unrealized_pnl': float(position_info.get('unrealizedPnl', 0)),
-                    'leverage': float(position_info.get('leverage', {}).get('value', 1)),
-                })
-            
-            # 如果指定了 symbols，过滤结果
-            if symbols:
-                base_symbols = [s.split('/')[0] if '/' in s else s for s in symbols]
-                positions = [p for p in positions if p['symbol'] in base_symbols]
-            
-            return positions
+            return parse_positions(self.user_state_cache.get(), symbols)
         except Exception as e:
             raise Exception(f"获取持仓失败: {e}")
     
@@ -299,8 +456,8 @@ class HyperliquidSDKClient:
 
         Args:
             symbol: 交易对符号
-            timeframe: 时间周期 (1m, 5m, 15m, 1h, 4h, 1d)
-            limit: 返回的 K 线数量
+            timeframe: 时间周期 (1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 8h, 12h, 1d, 3d, 1w, 1M)
+            limit: 返回的 K 线数量（超过单次请求上限时自动分段拉取）
 
         Returns:
             包含 OHLCV 数据的 DataFrame
@@ -308,75 +465,113 @@ class HyperliquidSDKClient:
         try:
             base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
 
-            # 将时间周期转换为官方 SDK 格式
-            interval_map = {
-                '1m': '1m',
-                '5m': '5m',
-                '15m': '15m',
-                '1h': '1h',
-                '4h': '4h',
-                '1d': '1d',
-            }
-
-            interval = interval_map.get(timeframe, '1h')
+            interval = timeframe if timeframe in TIMEFRAME_MS else '1h'
+            interval_ms = TIMEFRAME_MS[interval]
+
+            # 使用本地存储时只拉取最后一根已存 K 线之后的数据
+            if self.candle_store is not None:
+                return self.candle_store.fetch(
+                    base_symbol,
+                    interval,
+                    limit,
+                    fetcher=lambda since: self._fetch_candle_range(base_symbol, interval, since),
+                    interval_ms=interval_ms
+                )
 
             # 计算时间范围（获取最近的数据）
-            import time
             end_time = int(time.time() * 1000)  # 当前时间（毫秒）
-            # 根据时间周期计算开始时间
-            interval_ms = {
-                '1m': 60 * 1000,
-                '5m': 5 * 60 * 1000,
-                '15m': 15 * 60 * 1000,
-                '1h': 60 * 60 * 1000,
-                '4h': 4 * 60 * 60 * 1000,
-                '1d': 24 * 60 * 60 * 1000,
-            }
-            start_time = end_time - (limit * interval_ms.get(timeframe, 60 * 60 * 1000))
-
-            # 获取 K 线数据
-            candles = self.info.candles_snapshot(
-                name=base_symbol,  # 参数名是 name 而不是 coin
-                interval=interval,
-                startTime=start_time,
-                endTime=end_time
-            )
-            
-            if not candles:
-                return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            
-            # 转换为 DataFrame
-            df = pd.DataFrame(candles)
-            
-            # 重命名列
-            df = df.rename(columns={
-                't': 'timestamp',
-                'o': 'open',
-                'h': 'high',
-                'l': 'low',
-                'c': 'close',
-                'v': 'volume'
-            })
-            
-            # 转换数据类型
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # 限制返回数量
-            if len(df) > limit:
-                df = df.tail(limit)
-            
-            return df.reset_index(drop=True)
+            start_time = end_time - limit * interval_ms
+
+            df = self._fetch_candle_range(base_symbol, interval, start_time, end_time)
+            return df.tail(limit).reset_index(drop=True)
         except Exception as e:
             raise Exception(f"获取 K 线数据失败: {e}")
 
-    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+    def backfill_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: Optional[int] = None,
+        max_workers: int = 4,
+        stream: bool = False
+    ) -> Any:
         """
-        获取未成交订单
+        回补长时间范围的 K 线（分段并发拉取、去重、检测缺口）
+
+        设置了 candle_store 时，每一段拉取完成后立即写入本地存储。
+
+        Args:
+            symbol: 交易对符号
+            timeframe: 时间周期
+            start_ms: 开始时间（毫秒）
+            end_ms: 结束时间（毫秒，默认当前时间）
+            max_workers: 最大并发请求数
+            stream: 为 True 时返回逐段产出 DataFrame 的迭代器
+
+        Returns:
+            stream=False: {'data', 'bars', 'gaps', 'requests'}
+            stream=True: DataFrame 迭代器
+        """
+        base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
+        backfiller = OHLCVBackfiller(
+            self._fetch_candle_chunk,
+            max_workers=max_workers,
+            store=self.candle_store
+        )
+        if stream:
+            return backfiller.iter_chunks(base_symbol, timeframe, start_ms, end_ms)
+
+        try:
+            return backfiller.backfill(base_symbol, timeframe, start_ms, end_ms)
+        except Exception as e:
+            raise Exception(f"回补 K 线数据失败: {e}")
+
+    def _fetch_candle_chunk(self, coin: str, interval: str, start_time: int, end_time: int) -> pd.DataFrame:
+        """拉取单次请求范围内的 K 线"""
+        candles = self._candles_snapshot(coin, interval, start_time, end_time)
+        return candles_to_dataframe(candles, MAX_CANDLES_PER_REQUEST)
+
+    def _fetch_candle_range(
+        self,
+        coin: str,
+        interval: str,
+        start_time: int,
+        end_time: Optional[int] = None
+    ) -> pd.DataFrame:
+        """拉取一段时间范围内的 K 线，超过单次请求上限时分段拉取"""
+        if end_time is None:
+            end_time = int(time.time() * 1000)
+
+        if (end_time - start_time) // TIMEFRAME_MS[interval] < MAX_CANDLES_PER_REQUEST:
+            return self._fetch_candle_chunk(coin, interval, start_time, end_time)
+
+        return OHLCVBackfiller(self._fetch_candle_chunk).backfill(coin, interval, start_time, end_time)['data']
+
+    def _candles_snapshot(
+        self,
+        coin: str,
+        interval: str,
+        start_time: int,
+        end_time: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """请求 K 线快照（end_time 默认为当前时间）"""
+        if end_time is None:
+            end_time = int(time.time() * 1000)
+        return self.info.candles_snapshot(
+            name=coin,  # 参数名是 name 而不是 coin
+            interval=interval,
+            startTime=start_time,
+            endTime=end_time
+        )
+
+    def get_open_orders(self, symbol: Optional[str] = None, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        获取未成交订单（读取订单表，数据最多落后 max_age 秒；推送连接正常时与推送同步）
 
         Args:
             symbol: 交易对符号（可选），例如 "BTC" 或 "BTC/USDC:USDC"
+            max_age: 可接受的最大数据年龄（秒），默认使用 order_state_ttl
 
         Returns:
             未成交订单列表
@@ -388,37 +583,141 @@ class HyperliquidSDKClient:
             raise Exception("需要提供钱包地址")
 
         try:
-            user_state = self.info.user_state(self.wallet_address)
-
-            if not user_state or 'openOrders' not in user_state:
-                return []
-
-            orders = []
-            for order in user_state['openOrders']:
-                order_symbol = order.get('coin', '')
-
-                # 如果指定了 symbol，过滤结果
-                if symbol:
-                    base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
-                    if order_symbol != base_symbol:
-                        continue
-
-                orders.append({
-                    'id': order.get('oid', ''),
-                    'symbol': order_symbol,
-                    'side': order.get('side', '').lower(),
-                    'type': order.get('orderType', ''),
-                    'price': float(order.get('limitPx', 0)),
-                    'amount': float(order.get('sz', 0)),
-                    'filled': float(order.get('sz', 0)) - float(order.get('szLeft', 0)),
-                    'remaining': float(order.get('szLeft', 0)),
-                    'timestamp': order.get('timestamp', 0),
-                })
-
-            return orders
+            base_symbol = None
+            if symbol:
+                base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
+            return self.order_index.open_orders(base_symbol, max_age=max_age)
         except Exception as e:
             raise Exception(f"获取未成交订单失败: {e}")
 
+    def _fetch_open_orders(self) -> List[Dict[str, Any]]:
+        """从交易所拉取全部未成交订单（订单表对账使用）"""
+        return [order_from_hyperliquid(order) for order in self.info.frontend_open_orders(self.wallet_address)]
+
+    def get_order_status(self, order_id: Any, symbol: Optional[str] = None, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        查询订单状态
+
+        从订单表中按 oid / cloid 查找（O(1)），订单表按 max_age 保证新鲜度；
+        订单表中没有的订单（例如已结束的历史订单）和对账时状态未知的订单
+        通过 orderStatus 查询一次并写入订单表。
+
+        Args:
+            order_id: 订单 ID（oid，或 0x 开头的 cloid）
+            symbol: 交易对符号（可选，仅为与其他客户端接口一致）
+            max_age: 可接受的最大数据年龄（秒），默认使用 order_state_ttl
+
+        Returns:
+            订单记录，包含 id、cloid、symbol、side、type、amount、price、filled、remaining、status、updated_at
+        """
+        if not self.wallet_address:
+            raise Exception("需要提供钱包地址")
+
+        try:
+            record = self.order_index.get_order(order_id, max_age=max_age)
+            if record is None or record['status'] == 'unknown':
+                record = self._query_order(order_id)
+            return record
+        except Exception as e:
+            raise Exception(f"查询订单失败: {e}")
+
+    def _query_order(self, order_id: Any) -> Dict[str, Any]:
+        """通过 orderStatus 查询订单（oid 或 cloid）并写入订单表"""
+        return self.order_index.upsert(self._fetch_order(order_id))
+
+    def _fetch_order_status(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """查询订单表中一条记录的当前状态（对账时查询已从未成交订单中消失的挂单）"""
+        return self._fetch_order(record['cloid'] if is_cloid(record.get('cloid')) else record['id'])
+
+    def _fetch_order(self, order_id: Any) -> Dict[str, Any]:
+        """通过 orderStatus 查询订单（oid 或 cloid），返回订单表格式的订单字典"""
+        if is_cloid(order_id):
+            response = self.info.query_order_by_cloid(self.wallet_address, Cloid.from_str(order_id))
+        else:
+            response = self.info.query_order_by_oid(self.wallet_address, int(order_id))
+        if response.get('status') != 'order':
+            raise Exception(f"未找到订单: {order_id}")
+
+        order = order_from_hyperliquid(response['order']['order'], response['order']['status'])
+        if is_cloid(order_id):
+            order['cloid'] = order_id
+        return order
+
+    def _submit_order(self, send, cloids: Any, description: str) -> Any:
+        """提交下单请求，超时后使用同一批 cloid 重试（交易所不会重复下单）"""
+        cloids = [cloids] if isinstance(cloids, str) else cloids
+
+        def attempt():
+            for cloid in cloids:
+                self.order_index.record_attempt(cloid)
+            return send()
+
+        return submit_idempotent(attempt, retries=self.order_retries, description=description)
+
+    def _index_order_response(self, cloid: str, response: Any) -> Dict[str, Any]:
+        """用单个订单的下单响应更新 cloid 索引，返回索引中的订单记录"""
+        result = {'cloid': cloid, 'id': None, 'status': 'rejected', 'filled': 0.0, 'average': None}
+        if isinstance(response, dict) and response.get('status') == 'ok':
+            _apply_order_statuses([result], response)
+        else:
+            result['error'] = str(response)
+        self._index_results([result])
+        return self.order_index.get(cloid) or result
+
+    def _index_results(self, results: List[Dict[str, Any]]) -> None:
+        """将下单结果写入 cloid 索引；重试后因 cloid 重复被拒绝时，改为查询该 cloid 的实际订单"""
+        for result in results:
+            cloid = result.get('cloid')
+            record = self.order_index.get(cloid) if cloid else None
+            if record is None:
+                continue
+
+            if (result['status'] == 'rejected' and record['attempts'] > 1
+                    and _is_duplicate_cloid(result.get('error'))):
+                # 超时的那次提交实际已被交易所接受
+                record = self.get_order_by_cloid(cloid, refresh=True)
+                result.pop('error', None)
+                result.update({key: record[key] for key in ('id', 'status', 'filled', 'average')})
+                continue
+
+            fields = {'error': result['error']} if 'error' in result else {}
+            self.order_index.resolve(
+                cloid,
+                oid=result['id'],
+                status=result['status'],
+                filled=result['filled'],
+                average=result['average'],
+                **fields
+            )
+
+    def get_order_by_cloid(self, cloid: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        按客户端订单 ID 查询订单
+
+        优先读取订单表（O(1)，不发起请求）；订单表中没有该订单、状态未知或 refresh=True 时
+        通过 orderStatus 查询交易所并写回订单表。
+
+        Args:
+            cloid: 客户端订单 ID（0x 开头的 32 位十六进制字符串）
+            refresh: 是否强制向交易所查询
+
+        Returns:
+            订单记录，包含 cloid、id、symbol、side、amount、price、status、filled、average
+        """
+        record = self.order_index.get(cloid)
+        if record is not None and not refresh and record['status'] != 'unknown':
+            return record
+
+        if not self.wallet_address:
+            raise Exception("需要提供钱包地址")
+
+        try:
+            return self._query_order(cloid)
+        except Exception as e:
+            raise Exception(f"查询订单失败: {e}")
+
+    @_requires_markets
+    @_invalidates_account_state
     def place_limit_order(
         self,
         symbol: str,
@@ -426,7 +725,8 @@ class HyperliquidSDKClient:
         amount: float,
         price: float,
         reduce_only: bool = False,
-        tif: str = 'Gtc'
+        tif: str = 'Gtc',
+        cloid: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         下限价单（便捷方法）
@@ -441,9 +741,10 @@ class HyperliquidSDKClient:
                  - Gtc: Good Till Cancel（一直有效直到取消）
                  - Ioc: Immediate or Cancel（立即成交或取消）
                  - Alo: Add Liquidity Only（只做 Maker）
+            cloid: 客户端订单 ID（可选，默认自动生成；超时重试时使用同一个 cloid）
 
         Returns:
-            订单结果
+            订单结果（包含 cloid、id、status）
         """
         if self.read_only:
             raise Exception("只读模式无法下单")
@@ -451,18 +752,22 @@ class HyperliquidSDKClient:
         try:
             base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
             is_buy = side.lower() == 'buy'
+            cloid = cloid or new_cloid()
+            self.order_index.register(cloid, base_symbol, side.lower(), amount, price)
 
             # OrderType 是一个字典，不是枚举
             order_type = {'limit': {'tif': tif}}
 
-            result = self.exchange.order(
+            result = self._submit_order(lambda: self.exchange.order(
                 name=base_symbol,
                 is_buy=is_buy,
                 sz=amount,
                 limit_px=price,
                 order_type=order_type,
-                reduce_only=reduce_only
-            )
+                reduce_only=reduce_only,
+                cloid=Cloid.from_str(cloid)
+            ), cloid, "限价单")
+            order = self._index_order_response(cloid, result)
 
             return {
                 'success': True,
@@ -470,17 +775,23 @@ class HyperliquidSDKClient:
                 'symbol': base_symbol,
                 'side': side,
                 'amount': amount,
-                'price': price
+                'price': price,
+                'cloid': cloid,
+                'id': order['id'],
+                'status': order['status']
             }
         except Exception as e:
             raise Exception(f"下限价单失败: {e}")
 
+    @_requires_markets
+    @_invalidates_account_state
     def place_market_order(
         self,
         symbol: str,
         side: str,
         amount: float,
-        slippage: float = 0.05
+        slippage: float = 0.05,
+        cloid: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         下市价单（便捷方法）
@@ -490,9 +801,10 @@ class HyperliquidSDKClient:
             side: 方向，"buy" 或 "sell"
             amount: 数量
             slippage: 滑点容忍度（默认 5%）
+            cloid: 客户端订单 ID（可选，默认自动生成；超时重试时使用同一个 cloid）
 
         Returns:
-            订单结果
+            订单结果（包含 cloid、id、status）
         """
         if self.read_only:
             raise Exception("只读模式无法下单")
@@ -500,17 +812,21 @@ class HyperliquidSDKClient:
         try:
             base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
             is_buy = side.lower() == 'buy'
+            cloid = cloid or new_cloid()
 
             # 获取当前价格作为参考
             current_price = self.get_current_price(base_symbol)
+            self.order_index.register(cloid, base_symbol, side.lower(), amount, current_price, order_type='market')
 
-            result = self.exchange.market_open(
+            result = self._submit_order(lambda: self.exchange.market_open(
                 name=base_symbol,
                 is_buy=is_buy,
                 sz=amount,
                 px=current_price,
-                slippage=slippage
-            )
+                slippage=slippage,
+                cloid=Cloid.from_str(cloid)
+            ), cloid, "市价单")
+            order = self._index_order_response(cloid, result)
 
             return {
                 'success': True,
@@ -518,18 +834,217 @@ class HyperliquidSDKClient:
                 'symbol': base_symbol,
                 'side': side,
                 'amount': amount,
-                'reference_price': current_price
+                'reference_price': current_price,
+                'cloid': cloid,
+                'id': order['id'],
+                'status': order['status']
             }
         except Exception as e:
             raise Exception(f"下市价单失败: {e}")
 
-    def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+    @_requires_markets
+    @_invalidates_account_state
+    def place_orders(
+        self,
+        orders: List[Dict[str, Any]],
+        slippage: float = 0.05,
+        grouping: str = 'na'
+    ) -> List[Dict[str, Any]]:
+        """
+        批量下单（一次签名、一次请求）
+
+        Args:
+            orders: 订单列表，每项包含:
+                - symbol: 交易对符号
+                - side: 'buy' 或 'sell'
+                - amount: 数量
+                - type: 'limit'（默认）或 'market'
+                - price: 限价（限价单必填）
+                - reduce_only: 是否只减仓（可选）
+                - tif: 'Gtc'（默认）、'Ioc' 或 'Alo'（可选，仅限价单）
+                - cloid: 客户端订单 ID（可选，默认自动生成）
+            slippage: 市价单滑点容忍度（默认 5%）
+            grouping: 订单分组，'na'（默认）、'normalTpsl' 或 'positionTpsl'
+
+        Returns:
+            与 orders 一一对应的结果列表，每项包含 id、cloid、symbol、side、type、amount、price、
+            status（'open' / 'closed' / 'rejected'）、filled、average，失败时包含 error
+        """
+        if self.read_only:
+            raise Exception("只读模式无法下单")
+        if not orders:
+            return []
+
+        try:
+            order_requests = []
+            results = []
+            for order in orders:
+                base_symbol = order['symbol'].split('/')[0] if '/' in order['symbol'] else order['symbol']
+                is_buy = order['side'].lower() == 'buy'
+                order_type = order.get('type', 'limit')
+
+                if order_type == 'market':
+                    # 市价单即按滑点价格下的 IOC 限价单
+                    price = self.exchange._slippage_price(
+                        base_symbol, is_buy, slippage, self.get_current_price(base_symbol)
+                    )
+                    tif = 'Ioc'
+                elif order_type == 'limit':
+                    if order.get('price') is None:
+                        raise ValueError(f"限价单必须提供价格: {order}")
+                    price = float(order['price'])
+                    tif = order.get('tif', 'Gtc')
+                else:
+                    raise ValueError(f"不支持的订单类型: {order_type}")
+
+                cloid = order.get('cloid') or new_cloid()
+                self.order_index.register(cloid, base_symbol, order['side'].lower(), float(order['amount']), price, order_type)
+                order_requests.append({
+                    'coin': base_symbol,
+                    'is_buy': is_buy,
+                    'sz': float(order['amount']),
+                    'limit_px': price,
+                    'order_type': {'limit': {'tif': tif}},
+                    'reduce_only': bool(order.get('reduce_only', False)),
+                    'cloid': Cloid.from_str(cloid),
+                })
+                results.append({
+                    'id': None,
+                    'cloid': cloid,
+                    'symbol': base_symbol,
+                    'side': order['side'].lower(),
+                    'type': order_type,
+                    'amount': float(order['amount']),
+                    'price': price,
+                    'status': None,
+                    'filled': 0.0,
+                    'average': None,
+                })
+
+            response = self._submit_order(
+                lambda: self.exchange.bulk_orders(order_requests, grouping=grouping),
+                [result['cloid'] for result in results],
+                "批量下单"
+            )
+            _apply_order_statuses(results, response)
+            self._index_results(results)
+            return results
+        except Exception as e:
+            raise Exception(f"批量下单失败: {e}")
+
+    def modify_order(
+        self,
+        symbol: str,
+        order_id: Any,
+        side: str,
+        amount: float,
+        price: float,
+        reduce_only: bool = False,
+        tif: str = 'Gtc'
+    ) -> Dict[str, Any]:
+        """
+        修改挂单（一次请求完成改价 / 改量，不需要先撤单再下单）
+
+        Args:
+            symbol: 交易对符号，例如 "BTC"
+            order_id: 订单 ID（oid，或 0x 开头的 cloid）
+            side: 方向，"buy" 或 "sell"
+            amount: 新数量
+            price: 新限价
+            reduce_only: 是否只减仓
+            tif: Time in Force，'Gtc'（默认）、'Ioc' 或 'Alo'
+
+        Returns:
+            修改结果，id 为修改后的订单 ID，previous_id 为原订单 ID
+        """
+        result = self.modify_orders([{
+            'order_id': order_id,
+            'symbol': symbol,
+            'side': side,
+            'amount': amount,
+            'price': price,
+            'reduce_only': reduce_only,
+            'tif': tif,
+        }])[0]
+        if result['status'] == 'rejected':
+            raise Exception(f"修改订单失败: {result.get('error')}")
+        return result
+
+    @_requires_markets
+    @_invalidates_account_state
+    def modify_orders(self, modifies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量修改挂单（batchModify，一次签名、一次请求）
+
+        Args:
+            modifies: 修改列表，每项包含 order_id、symbol、side、amount、price，
+                可选 reduce_only、tif
+
+        Returns:
+            与 modifies 一一对应的结果列表，字段同 place_orders，另含 previous_id
+        """
+        if self.read_only:
+            raise Exception("只读模式无法修改订单")
+        if not modifies:
+            return []
+
+        try:
+            modify_requests = []
+            results = []
+            for modify in modifies:
+                base_symbol = modify['symbol'].split('/')[0] if '/' in modify['symbol'] else modify['symbol']
+                order = {
+                    'coin': base_symbol,
+                    'is_buy': modify['side'].lower() == 'buy',
+                    'sz': float(modify['amount']),
+                    'limit_px': float(modify['price']),
+                    'order_type': {'limit': {'tif': modify.get('tif', 'Gtc')}},
+                    'reduce_only': bool(modify.get('reduce_only', False)),
+                }
+                # 修改后的订单沿用原订单的 cloid，之后仍可按 cloid 撤单和查询
+                record = self.order_index.lookup(modify['order_id'])
+                cloid = record['cloid'] if record is not None and is_cloid(record.get('cloid')) else None
+                if cloid:
+                    order['cloid'] = Cloid.from_str(cloid)
+                modify_requests.append({'oid': _to_oid(modify['order_id']), 'order': order})
+                results.append({
+                    'id': None,
+                    'cloid': cloid,
+                    'previous_id': modify['order_id'],
+                    'symbol': base_symbol,
+                    'side': modify['side'].lower(),
+                    'type': 'limit',
+                    'amount': float(modify['amount']),
+                    'price': float(modify['price']),
+                    'status': None,
+                    'filled': 0.0,
+                    'average': None,
+                })
+
+            response = self.exchange.bulk_modify_orders_new(modify_requests)
+            _apply_order_statuses(results, response)
+            for result in results:
+                if result['status'] != 'rejected':
+                    self.order_index.update(
+                        result['previous_id'],
+                        oid=result['id'],
+                        status=result['status'],
+                        amount=result['amount'],
+                        price=result['price']
+                    )
+            return results
+        except Exception as e:
+            raise Exception(f"批量修改订单失败: {e}")
+
+    @_requires_markets
+    @_invalidates_account_state
+    def cancel_order(self, symbol: str, order_id: Any) -> Dict[str, Any]:
         """
         取消订单（便捷方法）
 
         Args:
             symbol: 交易对符号，例如 "BTC"
-            order_id: 订单ID
+            order_id: 订单ID（oid，或 0x 开头的 cloid）
 
         Returns:
             取消结果
@@ -540,10 +1055,16 @@ class HyperliquidSDKClient:
         try:
             base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
 
-            result = self.exchange.cancel(
-                name=base_symbol,
-                oid=order_id
-            )
+            if is_cloid(order_id):
+                result = self.exchange.cancel_by_cloid(base_symbol, Cloid.from_str(order_id))
+            else:
+                result = self.exchange.cancel(
+                    name=base_symbol,
+                    oid=order_id
+                )
+
+            if result.get('status') == 'ok' and result['response']['data']['statuses'][0] == 'success':
+                self.order_index.update(order_id, status='canceled')
 
             return {
                 'success': True,
@@ -554,6 +1075,8 @@ class HyperliquidSDKClient:
         except Exception as e:
             raise Exception(f"取消订单失败: {e}")
 
+    @_requires_markets
+    @_invalidates_account_state
     def cancel_all_orders(self, symbol: Optional[str] = None) -> Dict[str, Any]:
         """
         取消所有订单
@@ -586,14 +1109,25 @@ class HyperliquidSDKClient:
 
             result = self.exchange.bulk_cancel(cancel_requests)
 
+            # 与单个撤单一致：撤单成功的订单立即在订单表中标记为 canceled
+            cancelled = 0
+            if result.get('status') == 'ok':
+                statuses = result['response']['data']['statuses']
+                for request, status in zip(cancel_requests, statuses):
+                    if status == 'success':
+                        self.order_index.update(request['oid'], status='canceled')
+                        cancelled += 1
+
             return {
                 'success': True,
                 'result': result,
-                'cancelled_count': len(cancel_requests)
+                'cancelled_count': cancelled
             }
         except Exception as e:
             raise Exception(f"取消所有订单失败: {e}")
 
+    @_requires_markets
+    @_invalidates_account_state
     def close_position(
         self,
         symbol: str,
@@ -637,6 +1171,8 @@ class HyperliquidSDKClient:
         except Exception as e:
             raise Exception(f"平仓失败: {e}")
 
+    @_requires_markets
+    @_invalidates_account_state
     def set_leverage(
         self,
         symbol: str,
@@ -690,8 +1226,7 @@ class HyperliquidSDKClient:
             raise Exception("需要提供钱包地址")
 
         try:
-            user_state = self.info.user_state(self.wallet_address)
-            return user_state
+            return self.user_state_cache.get()
         except Exception as e:
             raise Exception(f"获取用户状态失败: {e}")
 
@@ -708,17 +1243,15 @@ class HyperliquidSDKClient:
         try:
             base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
 
-            # 从 meta 中获取资金费率信息
-            meta = self.info.meta()
-
-            for universe_item in meta.get('universe', []):
-                if universe_item.get('name') == base_symbol:
-                    funding = universe_item.get('funding', '0')
-                    return {
-                        'symbol': base_symbol,
-                        'funding_rate': float(funding),
-                        'funding_rate_percent': float(funding) * 100
-                    }
+            # 资金费率在资产上下文中（meta 的 universe 不包含资金费率），按币种直接查找
+            ctx = self.asset_ctxs_cache.get().get(base_symbol)
+            if ctx is not None:
+                funding = float(ctx.get('funding', 0))
+                return {
+                    'symbol': base_symbol,
+                    'funding_rate': funding,
+                    'funding_rate_percent': funding * 100
+                }
 
             raise Exception(f"未找到 {base_symbol} 的资金费率信息")
         except Exception as e:
@@ -738,46 +1271,117 @@ class HyperliquidSDKClient:
         try:
             base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
 
-            l2_data = self.info.l2_snapshot(base_symbol)
-
-            bids = []
-            asks = []
-
-            # l2_data['levels'] 是一个包含两个列表的列表
-            # levels[0] 是买盘（bids），levels[1] 是卖盘（asks）
-            if isinstance(l2_data, dict) and 'levels' in l2_data:
-                levels = l2_data['levels']
-
-                if isinstance(levels, list) and len(levels) >= 2:
-                    # 处理买盘
-                    if isinstance(levels[0], list):
-                        for level in levels[0][:depth]:
-                            if isinstance(level, dict):
-                                bids.append({
-                                    'price': float(level.get('px', 0)),
-                                    'size': float(level.get('sz', 0)),
-                                    'orders': level.get('n', 0)
-                                })
-
-                    # 处理卖盘
-                    if isinstance(levels[1], list):
-                        for level in levels[1][:depth]:
-                            if isinstance(level, dict):
-                                asks.append({
-                                    'price': float(level.get('px', 0)),
-                                    'size': float(level.get('sz', 0)),
-                                    'orders': level.get('n', 0)
-                                })
-
-            return {
-                'symbol': base_symbol,
-                'bids': bids,
-                'asks': asks,
-                'timestamp': l2_data.get('time', 0) if isinstance(l2_data, dict) else 0
-            }
+            return self.get_local_order_book(base_symbol).to_dict(depth)
         except Exception as e:
             raise Exception(f"获取订单簿失败: {e}")
 
+    def get_local_order_book(self, symbol: str, max_age: Optional[float] = None) -> LocalOrderBook:
+        """
+        获取本地订单簿（超过有效期时用 L2 快照刷新）
+
+        返回的 LocalOrderBook 支持 spread()、vwap()、imbalance()、size_within() 等查询，
+        在有效期内重复读取不会产生网络请求。
+
+        Args:
+            symbol: 交易对符号，例如 "BTC"
+            max_age: 可接受的最大年龄（秒），默认使用 order_book_ttl
+
+        Returns:
+            本地订单簿
+        """
+        base_symbol = symbol.split('/')[0] if '/' in symbol else symbol
+        limit = self.order_book_ttl if max_age is None else max_age
+
+        book = self.order_books.get(base_symbol)
+        if book is None:
+            book = self.order_books.setdefault(base_symbol, LocalOrderBook(base_symbol))
+
+        age = book.age()
+        if age is None or age > limit:
+            book.apply_l2_snapshot(self.info.l2_snapshot(base_symbol))
+        return book
+
+    # ========== Websocket 推送 ==========
+
+    def start_websocket(self, **kwargs) -> SubscriptionManager:
+        """
+        建立 websocket 连接并订阅全市场中间价（有钱包地址时同时订阅账户事件）
+
+        推送到达后直接写入现有缓存：allMids 写入 mids_cache，userEvents 使账户状态快照失效，
+        orderUpdates / userFills 写入订单表。
+        连接中断或推送停止时缓存按原有效期过期，读取方法自动回退到 HTTP 请求；
+        订阅管理器在后台按指数退避重连并重新订阅。allMids 几乎每个区块都会推送，
+        默认超过 30 秒没有任何推送即视为连接失效并重连。
+
+        Args:
+            **kwargs: 传给 SubscriptionManager 的参数（capacity、max_pending、stale_timeout 等）
+
+        Returns:
+            订阅管理器
+        """
+        if self.ws is not None:
+            return self.ws
+
+        kwargs.setdefault('stale_timeout', 30.0)
+        self.ws = SubscriptionManager(self.api_url, **kwargs)
+        self.ws.subscribe({"type": "allMids"}, self._on_all_mids)
+        if self.wallet_address:
+            self.ws.subscribe({"type": "userEvents", "user": self.wallet_address}, self._on_user_event)
+            self.ws.subscribe({"type": "orderUpdates", "user": self.wallet_address}, self.order_index.on_order_updates)
+            self.ws.subscribe({"type": "userFills", "user": self.wallet_address}, self.order_index.on_user_fills)
+            ws = self.ws
+            self.order_index.attach_stream(lambda: ws.connected_since)
+        self.ws.start()
+        return self.ws
+
+    def stop_websocket(self) -> None:
+        """关闭 websocket 连接（读取方法回退到 HTTP 请求）"""
+        if self.ws is not None:
+            self.order_index.attach_stream(None)
+            self.ws.stop()
+            self.ws = None
+
+    def watch_symbol(
+        self,
+        symbol: str,
+        order_book: bool = True,
+        trades: bool = False,
+        timeframes: Optional[List[str]] = None
+    ) -> None:
+        """
+        订阅单个交易对的推送
+
+        Args:
+            symbol: 交易对符号，例如 "BTC"
+            order_book: 订阅 l2Book，推送写入本地订单簿
+            trades: 订阅逐笔成交（通过 self.ws.history() 读取）
+            timeframes: 订阅的 K 线周期，设置了 candle_store 时推送写入本地存储
+        """
+        if self.ws is None:
+            self.start_websocket()
+        coin = symbol.split('/')[0] if '/' in symbol else symbol
+
+        if order_book:
+            book = self.order_books.setdefault(coin, LocalOrderBook(coin))
+            self.ws.subscribe({"type": "l2Book", "coin": coin}, book.apply_l2_snapshot)
+        if trades:
+            self.ws.subscribe({"type": "trades", "coin": coin})
+        for timeframe in timeframes or []:
+            if timeframe not in TIMEFRAME_MS:
+                raise ValueError(f"不支持的时间周期: {timeframe}")
+            self.ws.subscribe({"type": "candle", "coin": coin, "interval": timeframe}, self._on_candle)
+
+    def _on_all_mids(self, data: Dict[str, Any]) -> None:
+        self.mids_cache.set(data['mids'])
+
+    def _on_user_event(self, data: Dict[str, Any]) -> None:
+        self.order_index.on_user_fills(data)
+        self.user_state_cache.invalidate()
+
+    def _on_candle(self, data: Dict[str, Any]) -> None:
+        if self.candle_store is not None:
+            self.candle_store.merge(data['s'], data['i'], candles_to_dataframe([data], 1))
+
     def __repr__(self) -> str:
         """字符串表示"""
         return (
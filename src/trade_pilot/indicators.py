@@ -0,0 +1,349 @@
+"""
+技术指标计算
+对 fetch_ohlcv 返回的 K 线一次性批量计算常用指标，并按 (交易对, 周期) 缓存递推状态，
+新增 K 线时只计算新增部分
+"""
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _timestamps(df: pd.DataFrame) -> np.ndarray:
+    """取出 K 线时间（兼容 timestamp 列和时间索引两种格式）"""
+    values = df['timestamp'] if 'timestamp' in df.columns else df.index
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('datetime64[ms]').astype('int64').to_numpy()
+    return values.astype('int64').to_numpy()
+
+
+class IndicatorEngine:
+    """
+    技术指标引擎
+
+    一次计算的指标: SMA、EMA（多个周期）、RSI、ATR、布林带、MACD
+    - RSI、ATR 使用 Wilder 平滑（alpha = 1/period）
+    - 首次计算为全量向量化计算（pandas/NumPy）
+    - 同一 (symbol, timeframe) 再次计算时，如果新数据从同一根 K 线开始、只是在末尾追加了 K 线
+      （或最后一根 K 线被更新），从缓存的递推状态出发只计算新增部分；开头的 K 线被丢弃时
+      （例如按 limit 滑动的窗口）EMA/RSI/ATR 的结果依赖起点，改为全量计算，
+      保证结果与对同一 DataFrame 全量计算一致
+
+    示例:
+        engine = IndicatorEngine()
+        result = engine.compute(df, symbol="BTC", timeframe="1h")
+        latest = engine.latest(df, symbol="BTC", timeframe="1h")
+    """
+
+    # 新增 K 线超过该数量时直接全量向量化计算
+    MAX_INCREMENTAL_BARS = 256
+
+    def __init__(
+        self,
+        sma_period: int = 20,
+        ema_periods: Tuple[int, ...] = (20, 50),
+        rsi_period: int = 14,
+        atr_period: int = 14,
+        bb_period: int = 20,
+        bb_std: float = 2.0,
+        macd_periods: Tuple[int, int, int] = (12, 26, 9),
+        max_cached_series: int = 256,
+        max_cached_bars: int = 5000
+    ):
+        """
+        初始化指标引擎
+
+        Args:
+            sma_period: SMA 周期
+            ema_periods: EMA 周期列表
+            rsi_period: RSI 周期
+            atr_period: ATR 周期
+            bb_period: 布林带周期
+            bb_std: 布林带标准差倍数
+            macd_periods: MACD 快线、慢线、信号线周期
+            max_cached_series: 最多缓存的 (symbol, timeframe) 数量
+            max_cached_bars: 每个序列最多缓存的指标行数
+        """
+        self.sma_period = sma_period
+        self.ema_periods = tuple(ema_periods)
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self.macd_periods = tuple(macd_periods)
+        self.max_cached_series = max_cached_series
+        self.max_cached_bars = max_cached_bars
+
+        self._cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.full_computations = 0
+        self.incremental_computations = 0
+
+    # ========== 公共接口 ==========
+
+    @property
+    def columns(self) -> list:
+        """输出的指标列名"""
+        return (
+            [f'sma_{self.sma_period}']
+            + [f'ema_{p}' for p in self.ema_periods]
+            + [f'rsi_{self.rsi_period}', f'atr_{self.atr_period}',
+               'bb_upper', 'bb_middle', 'bb_lower', 'macd', 'macd_signal', 'macd_hist']
+        )
+
+    def compute(
+        self,
+        df: pd.DataFrame,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        计算全部指标
+
+        Args:
+            df: K 线数据（需要 open/high/low/close 列，时间为 timestamp 列或索引）
+            symbol: 交易对符号（与 timeframe 一起作为缓存键，不提供则不缓存）
+            timeframe: 时间周期
+
+        Returns:
+            与 df 行对齐的指标 DataFrame
+        """
+        if df.empty:
+            return pd.DataFrame(columns=self.columns, index=df.index)
+
+        ts = _timestamps(df)
+        key = (symbol, timeframe) if symbol and timeframe else None
+
+        with self._lock:
+            entry = self._cache.get(key) if key else None
+            result = None
+            if entry is not None:
+                result = self._compute_incremental(entry, df, ts)
+            if result is None:
+                result, entry = self._compute_full(df, ts)
+                self.full_computations += 1
+            else:
+                self.incremental_computations += 1
+
+            if key:
+                self._cache[key] = entry
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_cached_series:
+                    self._cache.popitem(last=False)
+
+        result.index = df.index
+        return result
+
+    def latest(
+        self,
+        df: pd.DataFrame,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None
+    ) -> Dict[str, Optional[float]]:
+        """
+        计算指标并返回最后一根 K 线的指标值
+
+        Returns:
+            {'timestamp', 'close', 指标名: 值}，尚未有效的指标为 None
+        """
+        result = self.compute(df, symbol, timeframe)
+        if result.empty:
+            return {}
+
+        latest = {
+            'timestamp': int(_timestamps(df)[-1]),
+            'close': float(df['close'].iloc[-1]),
+        }
+        for col, value in result.iloc[-1].items():
+            latest[col] = None if pd.isna(value) else float(value)
+        return latest
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()
+
+    # ========== 全量计算 ==========
+
+    def _compute_full(self, df: pd.DataFrame, ts: np.ndarray) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        close = df['close'].astype(float).reset_index(drop=True)
+        high = df['high'].astype(float).reset_index(drop=True)
+        low = df['low'].astype(float).reset_index(drop=True)
+        fast, slow, signal = self.macd_periods
+
+        out = {}
+        raw = {}
+
+        out[f'sma_{self.sma_period}'] = close.rolling(self.sma_period).mean()
+
+        for p in self.ema_periods:
+            raw[f'ema_{p}'] = close.ewm(span=p, adjust=False).mean()
+            out[f'ema_{p}'] = raw[f'ema_{p}']
+
+        delta = close.diff()
+        raw['avg_up'] = delta.clip(lower=0).ewm(alpha=1 / self.rsi_period, adjust=False).mean()
+        raw['avg_down'] = (-delta).clip(lower=0).ewm(alpha=1 / self.rsi_period, adjust=False).mean()
+        rsi = 100 - 100 / (1 + raw['avg_up'] / raw['avg_down'])
+        rsi = rsi.where(raw['avg_down'] != 0, 100.0)
+        rsi.iloc[:self.rsi_period] = np.nan
+        out[f'rsi_{self.rsi_period}'] = rsi
+
+        prev_close = close.shift()
+        true_range = pd.concat(
+            [high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1
+        ).max(axis=1)
+        raw['atr'] = true_range.ewm(alpha=1 / self.atr_period, adjust=False).mean()
+        atr = raw['atr'].copy()
+        atr.iloc[:self.atr_period - 1] = np.nan
+        out[f'atr_{self.atr_period}'] = atr
+
+        middle = close.rolling(self.bb_period).mean()
+        std = close.rolling(self.bb_period).std(ddof=0)
+        out['bb_upper'] = middle + self.bb_std * std
+        out['bb_middle'] = middle
+        out['bb_lower'] = middle - self.bb_std * std
+
+        raw['macd_fast'] = close.ewm(span=fast, adjust=False).mean()
+        raw['macd_slow'] = close.ewm(span=slow, adjust=False).mean()
+        macd = raw['macd_fast'] - raw['macd_slow']
+        raw['macd_signal'] = macd.ewm(span=signal, adjust=False).mean()
+        out['macd'] = macd
+        out['macd_signal'] = raw['macd_signal']
+        out['macd_hist'] = macd - raw['macd_signal']
+
+        result = pd.DataFrame(out, columns=self.columns)
+
+        # 递推状态保存到倒数第二根 K 线（最后一根可能尚未收盘，下次重新计算）
+        n = len(close)
+        base = n - 2
+        entry = {
+            'result': pd.DataFrame(result.to_numpy(), index=ts, columns=self.columns),
+            'first_ts': int(ts[0]),
+            'base_ts': int(ts[base]) if base >= 0 else None,
+            'base_count': base + 1,
+            'state': {name: float(series.iloc[base]) for name, series in raw.items()} if base >= 0 else None,
+            'base_close': float(close.iloc[base]) if base >= 0 else None,
+            'closes': deque(close.iloc[max(0, base + 1 - self.window):base + 1].tolist(), maxlen=self.window),
+        }
+        return result, entry
+
+    @property
+    def window(self) -> int:
+        """滚动窗口类指标需要保留的历史收盘价数量"""
+        return max(self.sma_period, self.bb_period)
+
+    # ========== 增量计算 ==========
+
+    def _compute_incremental(
+        self,
+        entry: Dict[str, Any],
+        df: pd.DataFrame,
+        ts: np.ndarray
+    ) -> Optional[pd.DataFrame]:
+        """
+        从缓存状态递推新增 K 线；无法增量时返回 None
+
+        只有 df 严格是缓存序列的延伸时才能增量：第一根 K 线相同，且递推基准 K 线之前的
+        K 线数量不变（EMA 等递推指标的值取决于序列起点）
+        """
+        base_ts = entry['base_ts']
+        if base_ts is None or entry['state'] is None or ts[0] != entry['first_ts']:
+            return None
+
+        pos = int(np.searchsorted(ts, base_ts))
+        if pos + 1 != entry['base_count'] or pos >= len(ts) or ts[pos] != base_ts:
+            return None
+        if float(df['close'].iloc[pos]) != entry['base_close']:
+            return None
+        new_count = len(ts) - pos - 1
+        if new_count < 1 or new_count > self.MAX_INCREMENTAL_BARS:
+            return None
+
+        cached = entry['result']
+        head_ts = ts[:pos + 1]
+        if not np.isin(head_ts, cached.index.to_numpy()).all():
+            return None
+
+        state = dict(entry['state'])
+        prev_close = entry['base_close']
+        closes = deque(entry['closes'], maxlen=self.window)
+        count = entry['base_count']
+        fast, slow, signal = self.macd_periods
+
+        close_arr = df['close'].to_numpy(dtype=float)[pos + 1:]
+        high_arr = df['high'].to_numpy(dtype=float)[pos + 1:]
+        low_arr = df['low'].to_numpy(dtype=float)[pos + 1:]
+
+        rows = []
+        states = []
+        for c, h, l in zip(close_arr, high_arr, low_arr):
+            count += 1
+            row = {}
+
+            for p in self.ema_periods:
+                name = f'ema_{p}'
+                state[name] += 2 / (p + 1) * (c - state[name])
+                row[name] = state[name]
+
+            delta = c - prev_close
+            state['avg_up'] += (max(delta, 0.0) - state['avg_up']) / self.rsi_period
+            state['avg_down'] += (max(-delta, 0.0) - state['avg_down']) / self.rsi_period
+            if count <= self.rsi_period:
+                row[f'rsi_{self.rsi_period}'] = math.nan
+            elif state['avg_down'] == 0:
+                row[f'rsi_{self.rsi_period}'] = 100.0
+            else:
+                row[f'rsi_{self.rsi_period}'] = 100 - 100 / (1 + state['avg_up'] / state['avg_down'])
+
+            true_range = max(h - l, abs(h - prev_close), abs(l - prev_close))
+            state['atr'] += (true_range - state['atr']) / self.atr_period
+            row[f'atr_{self.atr_period}'] = state['atr'] if count >= self.atr_period else math.nan
+
+            closes.append(c)
+            window = np.fromiter(closes, dtype=float)
+            sma_values = window[-self.sma_period:]
+            row[f'sma_{self.sma_period}'] = sma_values.mean() if len(sma_values) == self.sma_period else math.nan
+            bb_values = window[-self.bb_period:]
+            if len(bb_values) == self.bb_period:
+                middle = bb_values.mean()
+                std = bb_values.std()
+                row['bb_upper'] = middle + self.bb_std * std
+                row['bb_middle'] = middle
+                row['bb_lower'] = middle - self.bb_std * std
+            else:
+                row['bb_upper'] = row['bb_middle'] = row['bb_lower'] = math.nan
+
+            state['macd_fast'] += 2 / (fast + 1) * (c - state['macd_fast'])
+            state['macd_slow'] += 2 / (slow + 1) * (c - state['macd_slow'])
+            macd = state['macd_fast'] - state['macd_slow']
+            state['macd_signal'] += 2 / (signal + 1) * (macd - state['macd_signal'])
+            row['macd'] = macd
+            row['macd_signal'] = state['macd_signal']
+            row['macd_hist'] = macd - state['macd_signal']
+
+            rows.append(row)
+            states.append((dict(state), c, list(closes)))
+            prev_close = c
+
+        new_rows = pd.DataFrame(rows, index=ts[pos + 1:], columns=self.columns)
+        history = cached.loc[cached.index <= base_ts]
+        combined = pd.concat([history, new_rows])
+        if len(combined) > self.max_cached_bars:
+            combined = combined.iloc[-self.max_cached_bars:]
+
+        # 更新缓存：递推状态推进到新的倒数第二根 K 线
+        if new_count >= 2:
+            base_state, base_close, base_closes = states[-2]
+            entry['base_ts'] = int(ts[-2])
+            entry['base_count'] = count - 1
+            entry['state'] = base_state
+            entry['base_close'] = base_close
+            entry['closes'] = deque(base_closes, maxlen=self.window)
+        entry['result'] = combined
+
+        return combined.loc[ts].reset_index(drop=True)
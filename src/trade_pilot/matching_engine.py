@@ -0,0 +1,515 @@
+"""
+撮合引擎
+内存中的按交易对买卖盘，价格优先、时间优先撮合；
+参考价两侧提供有限深度的外部流动性，维护持仓、已实现 / 未实现盈亏和手续费
+"""
+import heapq
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# 数量比较容差
+EPSILON = 1e-12
+
+
+class _Entry:
+    """订单在价格档位队列中的条目（撤单时只标记失效，撮合时跳过）"""
+    __slots__ = ('order', 'active')
+
+    def __init__(self, order: Dict[str, Any]):
+        self.order = order
+        self.active = True
+
+
+class OrderBook:
+    """
+    单个交易对的买卖盘
+
+    - 每个价格档位一个 FIFO 队列，档位价格用堆维护，最优价查询为 O(1)（摊还）
+    - 撤单 O(1)：条目标记失效，在撮合或查询最优价时惰性清理
+    - 订单为字典，需包含 id、side、price、remaining，撮合时原地更新 remaining
+    - notional 为簿内挂单（不含 reduceOnly 订单）的剩余名义金额，供保证金账本使用
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._levels: Dict[str, Dict[float, Deque[_Entry]]] = {'buy': {}, 'sell': {}}
+        self._sizes: Dict[str, Dict[float, float]] = {'buy': {}, 'sell': {}}
+        # 买盘堆中保存负价格，两个堆的堆顶都是最优价
+        self._heaps: Dict[str, List[float]] = {'buy': [], 'sell': []}
+        self._entries: Dict[Any, _Entry] = {}
+        self.notional = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, order_id: Any) -> bool:
+        return order_id in self._entries
+
+    def add(self, order: Dict[str, Any]) -> None:
+        """挂单（排在同价位已有订单之后）"""
+        side, price = order['side'], order['price']
+        levels, sizes = self._levels[side], self._sizes[side]
+        level = levels.get(price)
+        if level is None:
+            level = levels[price] = deque()
+            sizes[price] = order['remaining']
+            heapq.heappush(self._heaps[side], -price if side == 'buy' else price)
+        else:
+            sizes[price] += order['remaining']
+        entry = _Entry(order)
+        level.append(entry)
+        self._entries[order['id']] = entry
+        if not order.get('reduceOnly'):
+            self.notional += order['remaining'] * price
+
+    def remove(self, order_id: Any) -> Optional[Dict[str, Any]]:
+        """撤单，返回被撤销的订单（不在簿中时返回 None）"""
+        entry = self._entries.pop(order_id, None)
+        if entry is None:
+            return None
+        entry.active = False
+        order = entry.order
+        self._sizes[order['side']][order['price']] -= order['remaining']
+        self._release(order, order['remaining'])
+        return order
+
+    def _release(self, order: Dict[str, Any], qty: float) -> None:
+        """从挂单名义金额中扣除 qty（簿为空时清零，避免浮点误差累积）"""
+        if not self._entries:
+            self.notional = 0.0
+        elif not order.get('reduceOnly'):
+            self.notional -= qty * order['price']
+
+    def best_price(self, side: str) -> Optional[float]:
+        """某一侧的最优价格（买盘最高价 / 卖盘最低价），该侧为空时返回 None"""
+        heap, levels = self._heaps[side], self._levels[side]
+        while heap:
+            price = -heap[0] if side == 'buy' else heap[0]
+            level = levels[price]
+            while level and not level[0].active:
+                level.popleft()
+            if level:
+                return price
+            # 档位已空，移除档位和堆顶
+            del levels[price]
+            del self._sizes[side][price]
+            heapq.heappop(heap)
+        return None
+
+    def match(
+        self,
+        side: str,
+        amount: float,
+        limit_price: Optional[float],
+        on_fill: Callable[[Dict[str, Any], float, float], None]
+    ) -> float:
+        """
+        用 side 方向的吃单撮合对手盘（价格优先、时间优先，成交价为挂单价格）
+
+        Args:
+            side: 吃单方向
+            amount: 吃单数量
+            limit_price: 吃单限价（None 表示不限价）
+            on_fill: 每笔成交的回调 (挂单, 数量, 价格)
+
+        Returns:
+            未成交的剩余数量
+        """
+        maker_side = 'sell' if side == 'buy' else 'buy'
+        levels, sizes = self._levels[maker_side], self._sizes[maker_side]
+        while amount > EPSILON:
+            price = self.best_price(maker_side)
+            if price is None or (limit_price is not None and (
+                    price > limit_price if side == 'buy' else price < limit_price)):
+                break
+            level = levels[price]
+            while level and amount > EPSILON:
+                entry = level[0]
+                if not entry.active:
+                    level.popleft()
+                    continue
+                maker = entry.order
+                qty = min(amount, maker['remaining'])
+                maker['remaining'] -= qty
+                sizes[price] -= qty
+                amount -= qty
+                if maker['remaining'] <= EPSILON:
+                    maker['remaining'] = 0.0
+                    entry.active = False
+                    level.popleft()
+                    del self._entries[maker['id']]
+                self._release(maker, qty)
+                on_fill(maker, qty, price)
+        return max(amount, 0.0)
+
+    def remove_crossing(self, side: str, limit_price: float) -> List[Dict[str, Any]]:
+        """
+        移除 side 方向的吃单在 limit_price 以内会吃到的全部对手盘挂单（不成交）
+
+        Returns:
+            被移除的挂单（按价格优先、时间优先）
+        """
+        maker_side = 'sell' if side == 'buy' else 'buy'
+        removed = []
+        while True:
+            price = self.best_price(maker_side)
+            if price is None or (price > limit_price if side == 'buy' else price < limit_price):
+                return removed
+            for entry in self._levels[maker_side][price]:
+                if entry.active:
+                    removed.append(self.remove(entry.order['id']))
+            # 档位已空，由 best_price 清理
+
+    def depth(self, levels: int = 20) -> Dict[str, List[List[float]]]:
+        """前 levels 档的聚合深度 {'bids': [[价格, 数量], ...], 'asks': [...]}"""
+        result = {}
+        for side, key in (('buy', 'bids'), ('sell', 'asks')):
+            sizes = self._sizes[side]
+            prices = sorted((p for p, size in sizes.items() if size > EPSILON), reverse=side == 'buy')
+            result[key] = [[p, sizes[p]] for p in prices[:levels]]
+        return result
+
+
+class MatchingEngine:
+    """
+    多交易对撮合引擎（单账户）
+
+    - 自成交保护（与 Hyperliquid 一致，撤销挂单方）：簿内订单都属于同一账户，吃单不与簿内订单成交，
+      吃单按价格优先会吃到的簿内挂单被撤销，吃单继续吃外部流动性；self_trade_prevention=False 时
+      同一账户的订单之间按价格优先、时间优先互相撮合
+    - 参考价两侧各有一档外部流动性（参考价 ± half_spread，数量为 liquidity / 参考价），
+      吃单先吃簿内更优的价格，再吃外部报价，超出外部深度的部分继续吃簿内订单或挂单 / 撤销，
+      因此大单会部分成交
+    - update_price() 更新参考价后，被新报价穿过的挂单按挂单价成交（每次更新最多 liquidity 的名义金额）
+    - set_book() 用外部 L2 订单簿代替参考价两侧的单档报价：吃单逐档吃外部深度（滑点来自真实盘口），
+      被吃掉的数量从快照中扣除，直到下一次 set_book()
+    - 每笔成交更新持仓（净持仓、开仓均价）、已实现盈亏和手续费
+    - 簿内挂单结束（全部成交或撤销）时调用 on_close(order)，供外部维护挂单索引
+
+    示例:
+        engine = MatchingEngine()
+        engine.update_price("BTC", 60000)
+        order = engine.submit({"id": 1, "symbol": "BTC", "side": "buy", "type": "limit",
+                               "amount": 0.5, "price": 59990})
+        engine.update_price("BTC", 59900)   # 挂单被穿过，成交
+        engine.positions["BTC"]
+    """
+
+    def __init__(
+        self,
+        half_spread: float = 0.0001,
+        liquidity: float = 100_000.0,
+        market_slippage: float = 0.05,
+        maker_fee: float = 0.0001,
+        taker_fee: float = 0.00035,
+        max_fills: int = 10_000,
+        self_trade_prevention: bool = True
+    ):
+        """
+        初始化撮合引擎
+
+        Args:
+            half_spread: 外部报价相对参考价的半价差（默认 0.01%）
+            liquidity: 外部报价每档的名义金额（默认 10 万）
+            market_slippage: 市价单的最大滑点（市价单按该滑点价格以 IOC 限价单撮合）
+            maker_fee: 挂单手续费率
+            taker_fee: 吃单手续费率
+            max_fills: 保留的最近成交记录数量
+            self_trade_prevention: 吃单撤销会与之成交的簿内挂单，而不是与之成交
+        """
+        self.half_spread = half_spread
+        self.liquidity = liquidity
+        self.market_slippage = market_slippage
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.self_trade_prevention = self_trade_prevention
+
+        self.books: Dict[str, OrderBook] = {}
+        self.prices: Dict[str, float] = {}
+        # 外部订单簿快照 {symbol: {'buy': [[价格, 数量], ...], 'sell': [...]}}，按最优价在前排列
+        self.external_books: Dict[str, Dict[str, List[List[float]]]] = {}
+        self.positions: Dict[str, Dict[str, float]] = {}
+        self.fills: Deque[Dict[str, Any]] = deque(maxlen=max_fills)
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.volume = 0.0       # 累计成交名义金额
+        self.fill_count = 0     # 累计成交笔数
+        # 时钟（秒），回测时替换为 K 线时间
+        self.clock: Callable[[], float] = time.time
+        # 簿内挂单结束时的回调
+        self.on_close: Optional[Callable[[Dict[str, Any]], None]] = None
+
+    def book(self, symbol: str) -> OrderBook:
+        """交易对的订单簿（不存在时创建）"""
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        return book
+
+    def quote(self, symbol: str) -> Optional[Dict[str, float]]:
+        """外部报价 {'bid', 'ask', 'size'}，没有参考价时返回 None"""
+        price = self.prices.get(symbol)
+        if price is None:
+            return None
+        return {
+            'bid': price * (1 - self.half_spread),
+            'ask': price * (1 + self.half_spread),
+            'size': self.liquidity / price,
+        }
+
+    # ========== 下单 / 撤单 ==========
+
+    def submit(self, order: Dict[str, Any], post_only: bool = False, ioc: bool = False) -> Dict[str, Any]:
+        """
+        提交订单并撮合
+
+        Args:
+            order: 订单字典，包含 id、symbol、side、type（'limit' / 'market'）、amount，限价单包含 price
+            post_only: 只做 Maker，会立即成交时拒绝
+            ioc: 未成交部分立即撤销（市价单总是 IOC）
+
+        Returns:
+            原地更新后的订单（filled、remaining、average、fee、status）
+        """
+        symbol, side = order['symbol'], order['side']
+        # 不能写成 get() or book()：OrderBook 定义了 __len__，空簿的真值为 False
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.book(symbol)
+        reference = self.prices.get(symbol)
+        is_buy = side == 'buy'
+
+        if 'filled' not in order:
+            order['filled'] = 0.0
+            order['average'] = None
+            order['fee'] = 0.0
+        remaining = order['remaining'] = order['amount'] - order['filled']
+
+        if order['type'] == 'market':
+            if reference is None:
+                return self._reject(order, "没有参考价，无法下市价单")
+            limit = reference * (1 + self.market_slippage) if is_buy else reference * (1 - self.market_slippage)
+            ioc = True
+        else:
+            limit = order['price']
+
+        # 外部流动性：买单吃外部卖盘，卖单吃外部买盘
+        maker_side = 'sell' if is_buy else 'buy'
+        external_book = self.external_books.get(symbol)
+        if external_book is not None:
+            levels = external_book[maker_side]
+            external = next((level[0] for level in levels if level[1] > EPSILON), None)
+        elif reference is not None:
+            external = reference * (1 + self.half_spread) if is_buy else reference * (1 - self.half_spread)
+            levels = None   # 参考价两侧的单档报价，确定要撮合时再创建
+        else:
+            levels = []
+            external = None
+
+        # 簿内对手盘最优价：没有被穿过的簿内挂单时跳过簿内撮合
+        best = book.best_price(maker_side)
+        if not ioc:
+            if is_buy:
+                crosses = (best is not None and best <= limit) or (external is not None and external <= limit)
+            else:
+                crosses = (best is not None and best >= limit) or (external is not None and external >= limit)
+            if crosses and post_only:
+                return self._reject(order, "只做 Maker 的订单会立即成交")
+            if not crosses:
+                # 不会立即成交的限价单直接挂单（下单热路径上最常见的情况，跳过逐档撮合）
+                order['status'] = 'open'
+                book.add(order)
+                return order
+
+        if levels is None:
+            levels = [[external, self.liquidity / reference]]
+        for level in levels:
+            price, size = level
+            if size <= EPSILON:
+                continue
+            if price > limit if is_buy else price < limit:
+                break
+            # 先吃簿内比该档更优的订单，再吃该档外部深度
+            if best is not None and (best <= price if is_buy else best >= price):
+                remaining = self._take_book(book, order, remaining, price)
+                best = book.best_price(maker_side)
+            qty = min(remaining, size)
+            if qty > EPSILON:
+                self._fill(order, qty, price, self.taker_fee)
+                level[1] = size - qty
+                remaining -= qty
+            if remaining <= EPSILON:
+                break
+        if remaining > EPSILON and best is not None and (best <= limit if is_buy else best >= limit):
+            remaining = self._take_book(book, order, remaining, limit)
+        order['remaining'] = remaining
+
+        if remaining <= EPSILON:
+            order['remaining'] = 0.0
+            order['status'] = 'closed'
+        elif ioc:
+            order['status'] = 'canceled'
+        else:
+            order['status'] = 'open'
+            book.add(order)
+        return order
+
+    def _take_book(self, book: OrderBook, order: Dict[str, Any], amount: float, price: float) -> float:
+        """吃单吃簿内 price 以内的挂单，返回剩余数量（自成交保护时撤销这些挂单，剩余数量不变）"""
+        if self.self_trade_prevention:
+            for maker in book.remove_crossing(order['side'], price):
+                maker['status'] = 'canceled'
+                if self.on_close is not None:
+                    self.on_close(maker)
+            return amount
+
+        def on_fill(maker, qty, fill_price):
+            self._fill(maker, qty, fill_price, self.maker_fee)
+            self._fill(order, qty, fill_price, self.taker_fee)
+
+        return book.match(order['side'], amount, price, on_fill)
+
+    def cancel(self, symbol: str, order_id: Any) -> Optional[Dict[str, Any]]:
+        """撤单，返回被撤销的订单（订单不在簿中时返回 None）"""
+        book = self.books.get(symbol)
+        order = book.remove(order_id) if book is not None else None
+        if order is not None:
+            order['status'] = 'canceled'
+            if self.on_close is not None:
+                self.on_close(order)
+        return order
+
+    def update_price(self, symbol: str, price: float) -> List[Dict[str, Any]]:
+        """
+        更新参考价（并丢弃该交易对的外部订单簿），被新外部报价穿过的挂单按挂单价成交
+
+        Returns:
+            本次成交的挂单列表
+        """
+        self.prices[symbol] = price
+        self.external_books.pop(symbol, None)
+        book = self.books.get(symbol)
+        if book is None or not len(book):
+            return []
+
+        quote = self.quote(symbol)
+        return self._cross(book, [[quote['bid'], quote['size']]], [[quote['ask'], quote['size']]])
+
+    def set_book(self, symbol: str, bids: List[List[float]], asks: List[List[float]]) -> List[Dict[str, Any]]:
+        """
+        设置外部订单簿快照（参考价更新为中间价），被外部盘口穿过的挂单按挂单价成交
+
+        Args:
+            symbol: 交易对
+            bids: 买盘 [[价格, 数量], ...]，最优价在前
+            asks: 卖盘 [[价格, 数量], ...]，最优价在前
+
+        Returns:
+            本次成交的挂单列表
+        """
+        bids = [[float(price), float(size)] for price, size in bids]
+        asks = [[float(price), float(size)] for price, size in asks]
+        self.external_books[symbol] = {'buy': bids, 'sell': asks}
+        if bids and asks:
+            self.prices[symbol] = (bids[0][0] + asks[0][0]) / 2
+        elif bids or asks:
+            self.prices[symbol] = (bids or asks)[0][0]
+
+        book = self.books.get(symbol)
+        if book is None or not len(book):
+            return []
+        return self._cross(book, bids, asks)
+
+    def _cross(self, book: OrderBook, bids: List[List[float]], asks: List[List[float]]) -> List[Dict[str, Any]]:
+        """外部买卖盘逐档吃掉被穿过的挂单（外部卖盘吃价格不低于其报价的买单，外部买盘反之），扣减外部深度"""
+        touched = []
+
+        def on_fill(maker, qty, fill_price):
+            self._fill(maker, qty, fill_price, self.maker_fee)
+            touched.append(maker)
+
+        for taker_side, levels in (('sell', asks), ('buy', bids)):
+            for level in levels:
+                if level[1] <= EPSILON:
+                    continue
+                remaining = book.match(taker_side, level[1], level[0], on_fill)
+                if remaining > level[1] - EPSILON:
+                    # 该档没有吃到任何挂单，更差的档位也不会
+                    break
+                level[1] = remaining
+        return touched
+
+    # ========== 成交 / 持仓 ==========
+
+    def _reject(self, order: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        order['status'] = 'rejected'
+        order['error'] = reason
+        return order
+
+    def _fill(self, order: Dict[str, Any], qty: float, price: float, fee_rate: float) -> None:
+        """记录一笔成交：更新订单成交量 / 均价，更新持仓和盈亏"""
+        notional = qty * price
+        previous = order['filled']
+        filled = previous + qty
+        order['average'] = notional / filled if not previous else (order['average'] * previous + notional) / filled
+        order['filled'] = filled
+        fee = notional * fee_rate
+        order['fee'] += fee
+        if order.get('status') == 'open' and order['remaining'] <= EPSILON:
+            # 挂单全部成交
+            order['status'] = 'closed'
+            if self.on_close is not None:
+                self.on_close(order)
+
+        self.fees += fee
+        self.volume += notional
+        self.fill_count += 1
+        symbol, side = order['symbol'], order['side']
+        pnl = self._apply_position(symbol, qty if side == 'buy' else -qty, price)
+        self.fills.append({
+            'order_id': order['id'],
+            'symbol': symbol,
+            'side': side,
+            'amount': qty,
+            'price': price,
+            'fee': fee,
+            'realized_pnl': pnl,
+            'timestamp': int(self.clock() * 1000),
+        })
+
+    def _apply_position(self, symbol: str, signed_qty: float, price: float) -> float:
+        """按成交更新净持仓和开仓均价，返回本次已实现盈亏"""
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = {'size': 0.0, 'entry_price': 0.0, 'realized_pnl': 0.0}
+
+        size = position['size']
+        new_size = size + signed_qty
+        pnl = 0.0
+        if size == 0 or (size > 0) == (signed_qty > 0):
+            # 开仓 / 加仓（同方向，加权均价可以直接用带符号的数量计算）
+            position['entry_price'] = (size * position['entry_price'] + signed_qty * price) / new_size
+        else:
+            # 减仓 / 平仓 / 反手
+            closed = min(abs(signed_qty), abs(size))
+            pnl = closed * (price - position['entry_price']) * (1 if size > 0 else -1)
+            position['realized_pnl'] += pnl
+            self.realized_pnl += pnl
+            if abs(new_size) <= EPSILON:
+                new_size = 0.0
+                position['entry_price'] = 0.0
+            elif (new_size > 0) != (size > 0):
+                position['entry_price'] = price
+        position['size'] = new_size
+        return pnl
+
+    def unrealized_pnl(self, symbol: Optional[str] = None) -> float:
+        """按参考价计算的未实现盈亏（不指定交易对时为全部持仓之和）"""
+        symbols = [symbol] if symbol is not None else list(self.positions)
+        total = 0.0
+        for s in symbols:
+            position = self.positions.get(s)
+            if position and position['size'] and s in self.prices:
+                total += position['size'] * (self.prices[s] - position['entry_price'])
+        return total
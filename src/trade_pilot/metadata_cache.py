@@ -0,0 +1,228 @@
+"""
+市场元数据缓存
+将交易对列表、szDecimals、价格精度、资产编号等元数据保存到磁盘，
+客户端启动时直接读取缓存，过期后在后台线程中重新拉取
+"""
+import json
+import os
+import re
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 缓存格式版本，数据结构变化时递增，旧版本缓存会被忽略
+METADATA_CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = "~/.cache/trade_pilot/metadata"
+
+
+class MetadataCache:
+    """
+    磁盘元数据缓存
+
+    - 每个键一个 JSON 文件，包含格式版本、写入时间和数据
+    - get() 在缓存未过期时直接返回；已过期时先返回旧数据，同时在后台重新拉取
+      （同一个键只有一个后台刷新），刷新完成后调用 on_update 回调
+    - 没有缓存（或版本不匹配）时同步拉取并写入
+    - 写入使用临时文件 + 原子替换，多个进程同时启动时不会读到半个文件
+
+    示例:
+        cache = MetadataCache(ttl=3600)
+        meta = cache.get("sdk:https://api.hyperliquid.xyz", loader=fetch_meta, on_update=apply_meta)
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = DEFAULT_CACHE_DIR,
+        ttl: float = 3600.0,
+        version: int = METADATA_CACHE_VERSION
+    ):
+        """
+        初始化元数据缓存
+
+        Args:
+            directory: 缓存目录（None 表示只保存在内存中）
+            ttl: 缓存有效期（秒，默认 1 小时）
+            version: 缓存格式版本
+        """
+        self.directory = os.path.expanduser(directory) if directory else None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self.ttl = ttl
+        self.version = version
+
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._refreshing: Dict[str, threading.Thread] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _path(self, key: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        safe_key = re.sub(r'[^A-Za-z0-9_.-]', '_', key)
+        return os.path.join(self.directory, f"{safe_key}.json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，不存在、损坏或版本不匹配时返回 None"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            return entry
+
+        path = self._path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取元数据缓存失败 {path}: {e}")
+            return None
+
+        if entry.get('version') != self.version or entry.get('key') != key:
+            return None
+        self._memory[key] = entry
+        return entry
+
+    def save(self, key: str, data: Any) -> None:
+        """写入缓存"""
+        entry = {
+            'version': self.version,
+            'key': key,
+            'saved_at': time.time(),
+            'data': data,
+        }
+        with self._lock:
+            self._memory[key] = entry
+
+        path = self._path(key)
+        if not path:
+            return
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"写入元数据缓存失败 {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def age(self, key: str) -> Optional[float]:
+        """缓存年龄（秒），没有缓存时返回 None"""
+        with self._lock:
+            entry = self._read(key)
+        if entry is None:
+            return None
+        return max(0.0, time.time() - entry['saved_at'])
+
+    def get(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        on_update: Optional[Callable[[Any], None]] = None,
+        revalidate: bool = True
+    ) -> Any:
+        """
+        获取元数据
+
+        Args:
+            key: 缓存键（建议包含 endpoint，避免主网和测试网混用）
+            loader: 从交易所拉取元数据的函数
+            on_update: 后台刷新完成后的回调，参数为新数据
+            revalidate: 缓存过期时是否在后台刷新（False 表示同步刷新）
+
+        Returns:
+            元数据
+        """
+        with self._lock:
+            entry = self._read(key)
+
+        if entry is None:
+            self.misses += 1
+            data = loader()
+            self.save(key, data)
+            return data
+
+        if time.time() - entry['saved_at'] <= self.ttl:
+            self.hits += 1
+            return entry['data']
+
+        if not revalidate:
+            self.misses += 1
+            try:
+                data = loader()
+            except Exception as e:
+                logger.warning(f"刷新元数据失败，使用过期缓存 {key}: {e}")
+                return entry['data']
+            self.save(key, data)
+            return data
+
+        self.stale_hits += 1
+        self.refresh_async(key, loader, on_update)
+        return entry['data']
+
+    def refresh_async(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        on_update: Optional[Callable[[Any], None]] = None
+    ) -> threading.Thread:
+        """
+        在后台线程中重新拉取并写入缓存（同一个键同时只有一个刷新线程）
+
+        Returns:
+            刷新线程
+        """
+        with self._lock:
+            thread = self._refreshing.get(key)
+            if thread is not None and thread.is_alive():
+                return thread
+            thread = threading.Thread(
+                target=self._refresh, args=(key, loader, on_update),
+                name=f"metadata-refresh-{key}", daemon=True
+            )
+            self._refreshing[key] = thread
+        thread.start()
+        return thread
+
+    def _refresh(self, key: str, loader: Callable[[], Any], on_update: Optional[Callable[[Any], None]]) -> None:
+        try:
+            data = loader()
+        except Exception as e:
+            logger.warning(f"后台刷新元数据失败 {key}: {e}")
+            return
+        self.save(key, data)
+        self.refreshes += 1
+        if on_update is not None:
+            try:
+                on_update(data)
+            except Exception as e:
+                logger.error(f"应用元数据更新失败 {key}: {e}")
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """删除缓存（不指定 key 时删除全部）"""
+        with self._lock:
+            keys = [key] if key is not None else list(self._memory)
+            if key is None and self.directory:
+                keys += [name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json')]
+            for k in set(keys):
+                self._memory.pop(k, None)
+                path = self._path(k)
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    def stats(self) -> Dict[str, int]:
+        """命中 / 过期命中 / 未命中 / 后台刷新次数"""
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+        }
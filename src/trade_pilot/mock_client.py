@@ -2,22 +2,43 @@
 Mock Hyperliquid 客户端
 用于测试和开发，不需要真实的 API 密钥
 """
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
 import logging
-import random
-from datetime import datetime
+
+from .matching_engine import EPSILON, MatchingEngine
+from .order_store import OrderStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from .synthetic_market import SyntheticMarket
 
 logger = logging.getLogger(__name__)
 
 
 class MockHyperliquidClient:
-    """Mock Hyperliquid 交易客户端"""
+    """
+    Mock Hyperliquid 交易客户端
+
+    不是线程安全的：查询行情（get_ticker、get_order_book 等）会把合成行情同步到撮合引擎，
+    可能使挂单成交，因此所有方法都只能在同一线程中顺序调用（concurrent_reads=False）
+
+    增加敞口的订单按杠杆占用保证金，可用保证金（权益减去持仓和挂单占用）不足时拒绝
+    """
+
+    # 只读方法不能并发调用（TradingAgent 会按顺序执行只读工具）
+    concurrent_reads: bool = False
     
     def __init__(
         self,
         api_key: Optional[str] = None,
         api_secret: Optional[str] = None,
-        testnet: bool = True
+        testnet: bool = True,
+        initial_balance: float = 10000.0,
+        engine: Optional[MatchingEngine] = None,
+        order_history: int = 10000,
+        market: Optional["SyntheticMarket"] = None,
+        seed: Optional[int] = None,
+        prices: Optional[Dict[str, float]] = None
     ):
         """
         初始化 Mock 客户端
@@ -26,143 +47,300 @@ class MockHyperliquidClient:
             api_key: API 密钥（Mock 模式下不需要）
             api_secret: API 密钥（Mock 模式下不需要）
             testnet: 是否使用测试网
+            initial_balance: 初始 USDT 余额
+            engine: 撮合引擎（可选，用于自定义价差、外部流动性和手续费）
+            order_history: 保留的已结束订单数量（更早的订单无法再查询）
+            market: 合成行情（可选，用于自定义交易对、波动率、回放速度；默认首次查询行情时创建）
+            seed: 默认合成行情的随机种子（相同种子得到相同的行情）
+            prices: 初始参考价 {symbol: price}（默认 BTC / ETH / SOL 三个交易对）
         """
         self.testnet = testnet
-        self.orders = {}  # 存储订单
-        self.positions = {}  # 存储持仓
+        self.initial_balance = initial_balance
+        # 订单存储：挂单按交易对 / 方向索引，已结束的订单进入有界历史
+        self.orders = OrderStore(history_size=order_history)
         self.order_counter = 1000
+
+        # 撮合引擎：按价格优先、时间优先撮合，维护持仓和盈亏；挂单结束时归档
+        self.engine = engine or MatchingEngine()
+        self.engine.on_close = self.orders.close
         
-        # Mock 价格数据
-        self.prices = {
-            'BTC/USDT:USDT': 45000.0,
-            'ETH/USDT:USDT': 2300.0,
-            'SOL/USDT:USDT': 100.0,
-        }
+        # Mock 价格数据（即撮合引擎的参考价，通过 set_price 更新以触发挂单成交）
+        if prices is None:
+            prices = {
+                'BTC/USDT:USDT': 45000.0,
+                'ETH/USDT:USDT': 2300.0,
+                'SOL/USDT:USDT': 100.0,
+            }
+        for symbol, price in prices.items():
+            self.engine.prices.setdefault(symbol, price)
+        self.prices = self.engine.prices
+        self.leverage: Dict[str, int] = {}  # 交易对 -> 杠杆倍数（未设置时为 default_leverage）
+        self.default_leverage = 1
+
+        # 合成行情：行情 / 订单簿 / K 线的数据源，推进时把最新价格写入撮合引擎
+        self.seed = seed
+        self._market = market
+        self._market_tick: Optional[int] = None
+        self._market_synced: Dict[str, int] = {}
+        if market is not None:
+            self._sync_market(*market.symbols)
         
         logger.info(f"Mock Hyperliquid 客户端初始化完成 (testnet={testnet})")
     
+    @property
+    def market(self) -> "SyntheticMarket":
+        """合成行情（未指定时按当前交易对和参考价创建，预热 100 小时的历史，手动推进）"""
+        if self._market is None:
+            # numpy 只在需要行情数据时导入，保持 Mock 客户端轻量
+            from .synthetic_market import SyntheticMarket
+
+            # 5 秒一个 tick，预热 72000 个 tick（100 小时），可提供 100 根 1h K 线
+            self._market = SyntheticMarket(
+                list(self.prices), prices=dict(self.prices), seed=self.seed,
+                tick_seconds=5.0, warmup=72_000
+            )
+            self._sync_market(*self._market.symbols)
+        return self._market
+
+    def advance_market(self, ticks: int = 1) -> int:
+        """
+        推进合成行情（Mock），被新价格穿过的挂单按挂单价成交
+
+        Returns:
+            当前 tick
+        """
+        tick = self.market.advance(ticks)
+        self._sync_market()
+        return tick
+
+    def _sync_market(self, *symbols: str) -> None:
+        """
+        把合成行情的当前价格写入撮合引擎
+
+        行情推进后同步有挂单或持仓的交易对；symbols 中的交易对在每个 tick 首次使用时同步，
+        因此 set_price() 设置的价格保持到行情下一次推进
+        """
+        market = self._market
+        if market is None:
+            return
+        tick = market.sync()
+        if tick != self._market_tick:
+            self._market_tick = tick
+            self._market_synced.clear()
+            symbols = (*self.engine.books, *self.engine.positions, *symbols)
+        for symbol in symbols:
+            if symbol in market and self._market_synced.get(symbol) != tick:
+                self._market_synced[symbol] = tick
+                self.engine.update_price(symbol, market.price(symbol))
+
+    def _margin(self) -> Dict[str, float]:
+        """权益、持仓保证金和挂单保证金"""
+        equity, position_margin, order_margin = self._margin_totals()
+        return {'equity': equity, 'position_margin': position_margin, 'order_margin': order_margin}
+
+    def _margin_totals(self) -> Tuple[float, float, float]:
+        """
+        (权益, 持仓保证金, 挂单保证金)
+
+        每次下单都会调用：按交易对遍历一次持仓和订单簿，挂单名义金额由订单簿增量维护，不遍历挂单
+        """
+        engine, prices = self.engine, self.prices
+        leverage, default_leverage = self.leverage, self.default_leverage
+        equity = self.initial_balance + engine.realized_pnl - engine.fees
+        position_margin = order_margin = 0.0
+        for symbol, position in engine.positions.items():
+            size = position['size']
+            if size:
+                price = prices.get(symbol)
+                if price is None:
+                    price = position['entry_price']
+                else:
+                    equity += size * (price - position['entry_price'])
+                position_margin += (size if size > 0 else -size) * price / leverage.get(symbol, default_leverage)
+        for symbol, book in engine.books.items():
+            if book.notional:
+                order_margin += book.notional / leverage.get(symbol, default_leverage)
+        return equity, position_margin, order_margin
+
     def get_balance(self) -> Dict[str, Any]:
-        """获取账户余额（Mock）"""
+        """获取账户余额（Mock，权益 = 初始余额 + 已实现 / 未实现盈亏 - 手续费，占用 = 持仓和挂单保证金）"""
+        self._sync_market()
+        margin = self._margin()
+        used = margin['position_margin'] + margin['order_margin']
         balance = {
-            'total': {
-                'USDT': 10000.0,
-                'BTC': 0.5,
-                'ETH': 2.0,
-            },
-            'free': {
-                'USDT': 8000.0,
-                'BTC': 0.3,
-                'ETH': 1.5,
-            },
-            'used': {
-                'USDT': 2000.0,
-                'BTC': 0.2,
-                'ETH': 0.5,
-            }
+            'total': {'USDT': margin['equity']},
+            'free': {'USDT': margin['equity'] - used},
+            'used': {'USDT': used},
         }
         logger.info(f"获取余额成功 (Mock): {balance.get('total', {})}")
         return balance
     
     def get_positions(self) -> List[Dict[str, Any]]:
-        """获取当前持仓（Mock）"""
-        positions = [
-            {
-                'symbol': 'BTC/USDT:USDT',
-                'side': 'long',
-                'contracts': 0.1,
-                'entryPrice': 44000.0,
-                'markPrice': 45000.0,
-                'unrealizedPnl': 100.0,
-                'leverage': 5,
-            },
-            {
-                'symbol': 'ETH/USDT:USDT',
-                'side': 'short',
-                'contracts': 1.0,
-                'entryPrice': 2400.0,
-                'markPrice': 2300.0,
-                'unrealizedPnl': 100.0,
-                'leverage': 3,
-            }
-        ]
+        """获取当前持仓（Mock，按参考价计算未实现盈亏）"""
+        self._sync_market()
+        positions = []
+        for symbol, position in self.engine.positions.items():
+            size = position['size']
+            if size == 0:
+                continue
+            mark_price = self.prices.get(symbol, position['entry_price'])
+            unrealized = self.engine.unrealized_pnl(symbol)
+            positions.append({
+                'symbol': symbol,
+                'side': 'long' if size > 0 else 'short',
+                'contracts': abs(size),
+                'entryPrice': position['entry_price'],
+                'markPrice': mark_price,
+                'unrealizedPnl': unrealized,
+                'realizedPnl': position['realized_pnl'],
+                'percentage': unrealized / (abs(size) * position['entry_price']) * 100 * self._leverage(symbol),
+                'leverage': self._leverage(symbol),
+            })
         logger.info(f"获取持仓成功 (Mock): {len(positions)} 个持仓")
         return positions
+
+    def set_price(self, symbol: str, price: float) -> List[Dict[str, Any]]:
+        """
+        更新参考价（Mock），被新价格穿过的挂单按挂单价成交
+
+        使用合成行情时，该价格保持到行情下一次推进
+
+        Returns:
+            本次成交的挂单列表
+        """
+        return self.engine.update_price(symbol, price)
     
     def get_ticker(self, symbol: str) -> Dict[str, Any]:
-        """获取交易对行情（Mock）"""
-        base_price = self.prices.get(symbol, 1000.0)
-        # 添加随机波动
-        price = base_price * (1 + random.uniform(-0.01, 0.01))
-        
-        ticker = {
-            'symbol': symbol,
-            'last': price,
-            'bid': price * 0.9999,
-            'ask': price * 1.0001,
-            'high': price * 1.02,
-            'low': price * 0.98,
-            'volume': random.uniform(1000, 10000),
-            'timestamp': datetime.now().timestamp() * 1000,
-        }
+        """获取交易对行情（Mock，来自合成行情）"""
+        self._sync_market(symbol)
+        ticker = self.market.ticker(symbol)
         logger.info(f"获取 {symbol} 行情成功 (Mock): {ticker.get('last')}")
         return ticker
     
+    def get_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取行情（Mock，来自合成行情的同一个 tick）
+
+        Args:
+            symbols: 交易对列表（None 表示合成行情的全部交易对）
+
+        Returns:
+            {symbol: 行情数据}，未知交易对不包含在结果中
+        """
+        market = self.market
+        if symbols is None:
+            symbols = list(market.symbols)
+        symbols = [symbol for symbol in symbols if symbol in market]
+        self._sync_market(*symbols)
+        tickers = {symbol: market.ticker(symbol) for symbol in symbols}
+        logger.info(f"批量获取行情成功 (Mock): {len(tickers)} 个交易对")
+        return tickers
+    
     def get_orderbook(self, symbol: str, limit: int = 20) -> Dict[str, Any]:
-        """获取订单簿（Mock）"""
-        base_price = self.prices.get(symbol, 1000.0)
-        
-        # 生成买单
-        bids = []
-        for i in range(limit):
-            price = base_price * (1 - 0.0001 * (i + 1))
-            amount = random.uniform(0.1, 2.0)
-            bids.append([price, amount])
-        
-        # 生成卖单
-        asks = []
-        for i in range(limit):
-            price = base_price * (1 + 0.0001 * (i + 1))
-            amount = random.uniform(0.1, 2.0)
-            asks.append([price, amount])
-        
-        orderbook = {
-            'symbol': symbol,
-            'bids': bids,
-            'asks': asks,
-            'timestamp': datetime.now().timestamp() * 1000,
-        }
+        """获取订单簿（Mock，来自合成行情，与 get_ticker 的价格一致）"""
+        orderbook = self.market.orderbook(symbol, limit)
         logger.info(f"获取 {symbol} 订单簿成功 (Mock)")
         return orderbook
     
-    def create_market_order(
+    def fetch_ohlcv(self, symbol: str, timeframe: str = "1h", limit: int = 100) -> "pd.DataFrame":
+        """获取 K 线数据（Mock，来自合成行情，最多为预热历史加已回放的范围）"""
+        # pandas 只在需要 K 线时导入，保持 Mock 客户端轻量
+        import pandas as pd
+
+        rows = self.market.candles(symbol, timeframe, limit)
+        df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        df["timestamp"] = pd.to_datetime(df["timestamp"].astype("int64"), unit="ms")
+        logger.info(f"获取 {symbol} K 线成功 (Mock): {len(df)} 根")
+        return df.set_index("timestamp")
+
+    def _new_order(
         self,
         symbol: str,
+        order_type: str,
         side: str,
         amount: float,
-        reduce_only: bool = False
+        price: Optional[float],
+        reduce_only: bool,
+        post_only: bool,
+        cloid: Optional[str]
     ) -> Dict[str, Any]:
-        """创建市价单（Mock）"""
+        """创建订单记录（只减仓订单的数量不超过反方向持仓；增加敞口的部分所需保证金超过可用保证金时拒绝）"""
         order_id = f"mock_order_{self.order_counter}"
         self.order_counter += 1
-        
-        price = self.prices.get(symbol, 1000.0)
-        
+
+        if reduce_only:
+            size = self.engine.positions.get(symbol, {}).get('size', 0.0)
+            closable = abs(size) if (size > 0) == (side == 'sell') else 0.0
+            amount = min(amount, closable)
+
         order = {
             'id': order_id,
             'symbol': symbol,
-            'type': 'market',
+            'type': order_type,
             'side': side,
             'amount': amount,
             'price': price,
-            'status': 'closed',
-            'filled': amount,
-            'remaining': 0,
-            'timestamp': datetime.now().timestamp() * 1000,
+            'average': None,
+            'status': None,
+            'filled': 0.0,
+            'remaining': amount,
+            'fee': 0.0,
+            'timestamp': self.engine.clock() * 1000,
             'reduceOnly': reduce_only,
+            'postOnly': post_only,
+            'cloid': cloid,
         }
-        
-        self.orders[order_id] = order
-        logger.info(f"创建市价单成功 (Mock): {order_id} - {side} {amount} {symbol}")
+        if amount <= 0:
+            order['status'] = 'rejected'
+            order['error'] = '只减仓订单没有可减少的持仓' if reduce_only else '数量必须大于 0'
+        elif not reduce_only:
+            self._check_margin(order)
+        return order
+
+    def _check_margin(self, order: Dict[str, Any]) -> None:
+        """增加敞口的部分按下单价（市价单按参考价）和杠杆计算所需保证金，超过可用保证金时拒绝订单"""
+        symbol, amount, price = order['symbol'], order['amount'], order['price']
+        if price is None:
+            price = self.prices.get(symbol)
+            if price is None:
+                return
+        position = self.engine.positions.get(symbol)
+        if position is not None and position['size']:
+            size = position['size']
+            if (size > 0) == (order['side'] == 'sell'):
+                # 反方向订单先平仓，平仓部分不需要保证金
+                amount -= min(amount, abs(size))
+                if amount <= EPSILON:
+                    return
+        required = amount * price / self.leverage.get(symbol, self.default_leverage)
+
+        equity, position_margin, order_margin = self._margin_totals()
+        free = equity - position_margin - order_margin
+        if required > free:
+            order['status'] = 'rejected'
+            order['error'] = f"保证金不足: 需要 {required:.2f}, 可用 {free:.2f}"
+
+    def create_market_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        reduce_only: bool = False,
+        cloid: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """创建市价单（Mock，吃簿内挂单和外部报价，超出深度的部分撤销；重复的 cloid 返回已有订单）"""
+        if cloid and cloid in self.orders:
+            return self.orders.get(cloid)
+
+        self._sync_market(symbol)
+        order = self._new_order(symbol, 'market', side, amount, None, reduce_only, False, cloid)
+        if order['status'] != 'rejected':
+            self.engine.submit(order)
+            order['price'] = order['average']
+        self.orders.add(order)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("创建市价单 (Mock): %s - %s %s %s, 成交 %s, 状态 %s",
+                        order['id'], side, amount, symbol, order['filled'], order['status'])
         return order
     
     def create_limit_order(
@@ -172,74 +350,160 @@ class MockHyperliquidClient:
         amount: float,
         price: float,
         reduce_only: bool = False,
-        post_only: bool = False
+        post_only: bool = False,
+        cloid: Optional[str] = None
     ) -> Dict[str, Any]:
-        """创建限价单（Mock）"""
-        order_id = f"mock_order_{self.order_counter}"
-        self.order_counter += 1
-        
-        order = {
-            'id': order_id,
-            'symbol': symbol,
-            'type': 'limit',
-            'side': side,
-            'amount': amount,
-            'price': price,
-            'status': 'open',
-            'filled': 0,
-            'remaining': amount,
-            'timestamp': datetime.now().timestamp() * 1000,
-            'reduceOnly': reduce_only,
-            'postOnly': post_only,
-        }
-        
-        self.orders[order_id] = order
-        logger.info(f"创建限价单成功 (Mock): {order_id} - {side} {amount} {symbol} @ {price}")
+        """创建限价单（Mock，可立即成交的部分立即成交，其余挂单；重复的 cloid 返回已有订单）"""
+        if cloid and cloid in self.orders:
+            return self.orders.get(cloid)
+
+        self._sync_market(symbol)
+        order = self._new_order(symbol, 'limit', side, amount, price, reduce_only, post_only, cloid)
+        if order['status'] != 'rejected':
+            self.engine.submit(order, post_only)
+        self.orders.add(order)
+        # 高频调用路径：关闭 INFO 日志时不构造日志参数，也不产生格式化开销
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("创建限价单 (Mock): %s - %s %s %s @ %s, 成交 %s, 状态 %s",
+                        order['id'], side, amount, symbol, price, order['filled'], order['status'])
         return order
     
+    def place_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量下单（Mock），单个订单失败时该项返回 rejected，不影响其他订单"""
+        results = []
+        for order in orders:
+            try:
+                order_type = order.get('type', 'limit')
+                if order_type == 'market':
+                    result = self.create_market_order(
+                        order['symbol'], order['side'], order['amount'],
+                        reduce_only=order.get('reduce_only', False),
+                        cloid=order.get('cloid')
+                    )
+                elif order_type == 'limit':
+                    if order.get('price') is None:
+                        raise ValueError("限价单必须提供价格")
+                    result = self.create_limit_order(
+                        order['symbol'], order['side'], order['amount'], order['price'],
+                        reduce_only=order.get('reduce_only', False),
+                        cloid=order.get('cloid')
+                    )
+                else:
+                    raise ValueError(f"不支持的订单类型: {order_type}")
+            except Exception as e:
+                result = {
+                    'id': None,
+                    'symbol': order.get('symbol'),
+                    'side': order.get('side'),
+                    'type': order.get('type', 'limit'),
+                    'amount': order.get('amount'),
+                    'price': order.get('price'),
+                    'status': 'rejected',
+                    'error': str(e),
+                }
+            results.append(result)
+        logger.info(f"批量下单完成 (Mock): {len(results)} 个订单")
+        return results
+    
     def cancel_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
-        """取消订单（Mock）"""
-        if order_id in self.orders:
-            self.orders[order_id]['status'] = 'canceled'
-            logger.info(f"取消订单成功 (Mock): {order_id}")
+        """取消订单（Mock，order_id 可以是 cloid）"""
+        order = self.orders.get(order_id)
+        if order is not None:
+            order_id = order['id']
+            if self.engine.cancel(order['symbol'], order_id) is None:
+                logger.warning("订单已结束 (Mock): %s - %s", order_id, order['status'])
+                return {'id': order_id, 'status': order['status'], 'error': 'Order not open'}
+            logger.info("取消订单成功 (Mock): %s", order_id)
             return {'id': order_id, 'status': 'canceled'}
         else:
             logger.warning(f"订单不存在 (Mock): {order_id}")
             return {'error': 'Order not found'}
     
+    def modify_order(
+        self,
+        order_id: str,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float,
+        reduce_only: bool = False
+    ) -> Dict[str, Any]:
+        """修改挂单（Mock，order_id 可以是 cloid）"""
+        order = self.orders.get_open(order_id)
+        if order is None:
+            logger.warning(f"订单不存在或已完成 (Mock): {order_id}")
+            return {'id': order_id, 'status': 'rejected', 'error': 'Order not found or not open'}
+        if amount <= order['filled'] + EPSILON:
+            # 新数量不超过已成交数量时没有可挂的剩余部分，拒绝改单，原挂单保持不变
+            logger.warning("改单数量不大于已成交数量 (Mock): %s - %s <= %s", order['id'], amount, order['filled'])
+            return {'id': order['id'], 'status': 'rejected', 'error': 'New amount must exceed filled amount'}
+
+        # 改单后重新排队（失去原有的时间优先级），可立即成交的部分立即成交；
+        # 直接从簿中移除而不经过 engine.cancel，避免订单被当作已撤销归档
+        order_id = order['id']
+        self.engine.book(order['symbol']).remove(order_id)
+        self.orders.discard(order)
+        order.update({
+            'side': side,
+            'amount': amount,
+            'price': price,
+            'reduceOnly': reduce_only,
+            'timestamp': self.engine.clock() * 1000,
+        })
+        self.engine.submit(order)
+        self.orders.add(order)
+        logger.info(f"修改订单成功 (Mock): {order_id} - {side} {amount} {symbol} @ {price}")
+        return order
+
+    def modify_orders(self, modifies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量修改挂单（Mock）"""
+        return [
+            self.modify_order(
+                m['order_id'], m['symbol'], m['side'], m['amount'], m['price'],
+                reduce_only=m.get('reduce_only', False)
+            )
+            for m in modifies
+        ]
+    
     def cancel_all_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
         """取消所有订单（Mock）"""
         results = []
-        for order_id, order in self.orders.items():
-            if symbol is None or order['symbol'] == symbol:
-                if order['status'] == 'open':
-                    order['status'] = 'canceled'
-                    results.append({'id': order_id, 'status': 'canceled'})
-        
+        for order in self.orders.open_orders(symbol):
+            self.engine.cancel(order['symbol'], order['id'])
+            results.append({'id': order['id'], 'status': 'canceled'})
+
         logger.info(f"取消所有订单成功 (Mock): {symbol or '所有交易对'}, {len(results)} 个订单")
         return results
     
     def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
-        """获取未成交订单（Mock）"""
-        orders = []
-        for order in self.orders.values():
-            if order['status'] == 'open':
-                if symbol is None or order['symbol'] == symbol:
-                    orders.append(order)
-        
+        """获取未成交订单（Mock，只遍历挂单索引）"""
+        orders = self.orders.open_orders(symbol)
+
         logger.info(f"获取未成交订单成功 (Mock): {len(orders)} 个订单")
         return orders
     
     def get_order_status(self, order_id: str, symbol: str) -> Dict[str, Any]:
-        """查询订单状态（Mock）"""
-        if order_id in self.orders:
-            order = self.orders[order_id]
-            logger.info(f"查询订单状态成功 (Mock): {order_id} - {order.get('status')}")
+        """查询订单状态（Mock，order_id 可以是 cloid）"""
+        order = self.orders.get(order_id)
+        if order is not None:
+            logger.info(f"查询订单状态成功 (Mock): {order['id']} - {order.get('status')}")
             return order
         else:
             logger.warning(f"订单不存在 (Mock): {order_id}")
             return {'error': 'Order not found'}
     
+    def _leverage(self, symbol: str) -> int:
+        """交易对的杠杆倍数（未设置时为默认杠杆）"""
+        return self.leverage.get(symbol, self.default_leverage)
+
+    def set_leverage(self, symbol: str, leverage: int) -> bool:
+        """设置杠杆倍数（Mock，只影响保证金占用）"""
+        if leverage < 1:
+            raise ValueError("杠杆倍数必须大于等于 1")
+        self.leverage[symbol] = leverage
+        logger.info(f"设置杠杆成功 (Mock): {symbol} - {leverage}x")
+        return True
+
     def close_position(self, symbol: str) -> Dict[str, Any]:
         """平仓（Mock）"""
         positions = self.get_positions()
@@ -0,0 +1,315 @@
+"""
+本地订单簿
+以有序价格/数量数组保存单个交易对的 L2 订单簿，支持快照覆盖和逐档增量更新，
+深度、VWAP、价差、买卖盘不平衡等查询都在内存中完成
+"""
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+BID = 'bid'
+ASK = 'ask'
+
+
+def _levels_to_arrays(levels: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    将档位列表转换为 (价格, 数量, 订单数) 数组
+
+    支持 Hyperliquid 的 {'px', 'sz', 'n'} 字典格式和 [price, size] 列表格式
+    """
+    levels = list(levels)
+    if not levels:
+        empty = np.empty(0, dtype=float)
+        return empty, empty.copy(), np.empty(0, dtype=np.int64)
+    if isinstance(levels[0], dict):
+        prices = np.array([level['px'] for level in levels], dtype=float)
+        sizes = np.array([level['sz'] for level in levels], dtype=float)
+        counts = np.array([level.get('n', 0) for level in levels], dtype=np.int64)
+    else:
+        arr = np.asarray(levels, dtype=float)
+        prices, sizes = arr[:, 0], arr[:, 1]
+        counts = np.zeros(len(arr), dtype=np.int64)
+    return prices, sizes, counts
+
+
+class LocalOrderBook:
+    """
+    单个交易对的本地订单簿
+
+    买卖盘都按价格升序保存在 NumPy 数组中（最优买价在买盘末尾，最优卖价在卖盘开头），
+    并缓存累计数量，深度和 VWAP 查询为 O(log n)。
+
+    示例:
+        book = LocalOrderBook("BTC")
+        book.apply_snapshot(l2_data['levels'][0], l2_data['levels'][1], l2_data['time'])
+        book.spread(), book.vwap('buy', 1.5), book.imbalance(5)
+    """
+
+    def __init__(self, symbol: str):
+        """
+        初始化本地订单簿
+
+        Args:
+            symbol: 交易对符号
+        """
+        self.symbol = symbol
+        self._lock = threading.RLock()
+        self._prices = {BID: np.empty(0), ASK: np.empty(0)}
+        self._sizes = {BID: np.empty(0), ASK: np.empty(0)}
+        self._counts = {BID: np.empty(0, dtype=np.int64), ASK: np.empty(0, dtype=np.int64)}
+        self._cum = {BID: None, ASK: None}
+
+        self.timestamp = 0
+        self.updated_at: Optional[float] = None
+        self.update_count = 0
+
+    # ========== 更新 ==========
+
+    def apply_snapshot(
+        self,
+        bids: Iterable[Any],
+        asks: Iterable[Any],
+        timestamp: Optional[int] = None
+    ) -> None:
+        """
+        用完整快照覆盖订单簿
+
+        Args:
+            bids: 买盘档位（任意顺序）
+            asks: 卖盘档位（任意顺序）
+            timestamp: 交易所时间戳（毫秒）
+        """
+        bid_px, bid_sz, bid_n = _levels_to_arrays(bids)
+        ask_px, ask_sz, ask_n = _levels_to_arrays(asks)
+        bid_order = np.argsort(bid_px, kind='stable')
+        ask_order = np.argsort(ask_px, kind='stable')
+
+        with self._lock:
+            self._prices[BID], self._sizes[BID], self._counts[BID] = (
+                bid_px[bid_order], bid_sz[bid_order], bid_n[bid_order])
+            self._prices[ASK], self._sizes[ASK], self._counts[ASK] = (
+                ask_px[ask_order], ask_sz[ask_order], ask_n[ask_order])
+            self._touch(timestamp)
+
+    def apply_l2_snapshot(self, l2_data: Dict[str, Any]) -> None:
+        """应用 Hyperliquid l2Book 快照（REST l2_snapshot 或 websocket l2Book 推送）"""
+        levels = l2_data.get('levels') or [[], []]
+        self.apply_snapshot(levels[0], levels[1], l2_data.get('time'))
+
+    def apply_update(
+        self,
+        side: str,
+        price: float,
+        size: float,
+        orders: int = 0,
+        timestamp: Optional[int] = None
+    ) -> None:
+        """
+        单档增量更新
+
+        Args:
+            side: 'bid' 或 'ask'
+            price: 价格
+            size: 该价位的新数量，0 表示删除该档
+            orders: 该价位订单数
+            timestamp: 交易所时间戳（毫秒）
+        """
+        side = self._side(side)
+        with self._lock:
+            prices = self._prices[side]
+            i = int(np.searchsorted(prices, price))
+            exists = i < len(prices) and prices[i] == price
+
+            if size <= 0:
+                if exists:
+                    self._prices[side] = np.delete(prices, i)
+                    self._sizes[side] = np.delete(self._sizes[side], i)
+                    self._counts[side] = np.delete(self._counts[side], i)
+            elif exists:
+                self._sizes[side][i] = size
+                self._counts[side][i] = orders
+            else:
+                self._prices[side] = np.insert(prices, i, price)
+                self._sizes[side] = np.insert(self._sizes[side], i, size)
+                self._counts[side] = np.insert(self._counts[side], i, orders)
+            self._touch(timestamp)
+
+    def _touch(self, timestamp: Optional[int]) -> None:
+        self._cum = {BID: None, ASK: None}
+        if timestamp is not None:
+            self.timestamp = timestamp
+        self.updated_at = time.monotonic()
+        self.update_count += 1
+
+    @staticmethod
+    def _side(side: str) -> str:
+        side = side.lower()
+        if side in (BID, 'bids', 'buy'):
+            return BID
+        if side in (ASK, 'asks', 'sell'):
+            return ASK
+        raise ValueError(f"无效的方向: {side}")
+
+    def _cumulative(self, side: str) -> np.ndarray:
+        """从最优价开始的累计数量（买盘从高到低，卖盘从低到高）"""
+        cum = self._cum[side]
+        if cum is None:
+            sizes = self._sizes[side]
+            cum = np.cumsum(sizes[::-1] if side == BID else sizes)
+            self._cum[side] = cum
+        return cum
+
+    def _best_first(self, side: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """按从最优价开始的顺序返回 (价格, 数量, 订单数)"""
+        if side == BID:
+            return self._prices[BID][::-1], self._sizes[BID][::-1], self._counts[BID][::-1]
+        return self._prices[ASK], self._sizes[ASK], self._counts[ASK]
+
+    # ========== 查询 ==========
+
+    def age(self) -> Optional[float]:
+        """距离上次更新的时间（秒），从未更新时返回 None"""
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    def best_bid(self) -> Optional[float]:
+        """最优买价"""
+        prices = self._prices[BID]
+        return float(prices[-1]) if len(prices) else None
+
+    def best_ask(self) -> Optional[float]:
+        """最优卖价"""
+        prices = self._prices[ASK]
+        return float(prices[0]) if len(prices) else None
+
+    def mid(self) -> Optional[float]:
+        """中间价"""
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self) -> Optional[float]:
+        """买卖价差"""
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def spread_bps(self) -> Optional[float]:
+        """买卖价差（基点，相对中间价）"""
+        spread, mid = self.spread(), self.mid()
+        if spread is None or not mid:
+            return None
+        return spread / mid * 10000
+
+    def depth(self, side: str, levels: int = 10) -> List[Tuple[float, float]]:
+        """
+        前 N 档深度
+
+        Args:
+            side: 'bid' 或 'ask'
+            levels: 档位数
+
+        Returns:
+            [(价格, 数量), ...]，从最优价开始
+        """
+        side = self._side(side)
+        with self._lock:
+            prices, sizes, _ = self._best_first(side)
+            return list(zip(prices[:levels].tolist(), sizes[:levels].tolist()))
+
+    def size_within(self, side: str, price: float) -> float:
+        """
+        从最优价到指定价格（含）之间的累计数量
+
+        Args:
+            side: 'bid'（统计价格 >= price 的买单）或 'ask'（统计价格 <= price 的卖单）
+            price: 边界价格
+        """
+        side = self._side(side)
+        with self._lock:
+            prices = self._prices[side]
+            cum = self._cumulative(side)
+            if side == BID:
+                count = len(prices) - int(np.searchsorted(prices, price, side='left'))
+            else:
+                count = int(np.searchsorted(prices, price, side='right'))
+            return float(cum[count - 1]) if count > 0 else 0.0
+
+    def vwap(self, side: str, size: float) -> Optional[float]:
+        """
+        吃掉指定数量时的成交均价
+
+        Args:
+            side: 'buy'（吃卖盘）或 'sell'（吃买盘）
+            size: 成交数量
+
+        Returns:
+            成交均价，盘口数量不足时返回 None
+        """
+        if size <= 0:
+            return None
+        taker_side = self._side(side)
+        book_side = ASK if taker_side == BID else BID
+        with self._lock:
+            prices, sizes, _ = self._best_first(book_side)
+            cum = self._cumulative(book_side)
+            if not len(cum) or cum[-1] < size:
+                return None
+
+            # 找到成交会触及的最后一档
+            last = int(np.searchsorted(cum, size, side='left'))
+            filled_before = cum[last - 1] if last > 0 else 0.0
+            notional = float(np.dot(prices[:last], sizes[:last])) + (size - filled_before) * prices[last]
+            return notional / size
+
+    def imbalance(self, levels: int = 5) -> Optional[float]:
+        """
+        前 N 档买卖盘不平衡度
+
+        Returns:
+            (买盘数量 - 卖盘数量) / (买盘数量 + 卖盘数量)，范围 [-1, 1]
+        """
+        if levels < 1:
+            raise ValueError(f"档位数必须大于 0: {levels}")
+        with self._lock:
+            bid_cum = self._cumulative(BID)
+            ask_cum = self._cumulative(ASK)
+            bid_size = float(bid_cum[min(levels, len(bid_cum)) - 1]) if len(bid_cum) else 0.0
+            ask_size = float(ask_cum[min(levels, len(ask_cum)) - 1]) if len(ask_cum) else 0.0
+        total = bid_size + ask_size
+        if total == 0:
+            return None
+        return (bid_size - ask_size) / total
+
+    def to_dict(self, depth: int = 10) -> Dict[str, Any]:
+        """
+        转换为 get_order_book 的返回格式
+
+        Args:
+            depth: 每侧档位数
+        """
+        with self._lock:
+            sides = {}
+            for side in (BID, ASK):
+                prices, sizes, counts = self._best_first(side)
+                sides[side] = [
+                    {'price': p, 'size': s, 'orders': n}
+                    for p, s, n in zip(prices[:depth].tolist(), sizes[:depth].tolist(), counts[:depth].tolist())
+                ]
+            return {
+                'symbol': self.symbol,
+                'bids': sides[BID],
+                'asks': sides[ASK],
+                'timestamp': self.timestamp
+            }
+
+    def __repr__(self) -> str:
+        return (
+            f"LocalOrderBook(symbol={self.symbol}, bid={self.best_bid()}, ask={self.best_ask()}, "
+            f"levels={len(self._prices[BID])}/{len(self._prices[ASK])})"
+        )
@@ -0,0 +1,259 @@
+"""
+客户端订单 ID（cloid）索引
+下单前生成 cloid 并登记，按 cloid / oid 在 O(1) 时间内查找订单状态和成交，
+超时重试时复用同一个 cloid，交易所不会重复下单
+"""
+import re
+import secrets
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_CLOID_RE = re.compile(r'^0x[0-9a-fA-F]{32}$')
+
+# 不会再变化的订单状态
+TERMINAL_STATUSES = {'closed', 'canceled', 'rejected'}
+
+
+def new_cloid() -> str:
+    """生成新的客户端订单 ID（0x 开头的 16 字节十六进制字符串）"""
+    return '0x' + secrets.token_hex(16)
+
+
+def is_cloid(value: Any) -> bool:
+    """判断是否为 cloid 格式的字符串"""
+    return isinstance(value, str) and bool(_CLOID_RE.match(value))
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """
+    判断是否为请求超时 / 连接中断（请求可能已经到达交易所，结果未知）
+
+    兼容 requests（SDK）和 CCXT 的异常类型
+    """
+    names = {cls.__name__ for cls in type(error).__mro__}
+    return bool(names & {'Timeout', 'ConnectionError', 'RequestTimeout', 'NetworkError', 'TimeoutError'})
+
+
+def submit_idempotent(
+    send: Callable[[], Any],
+    retries: int = 2,
+    retry_delay: float = 0.2,
+    description: str = "订单"
+) -> Any:
+    """
+    提交带 cloid 的请求，超时后用同一个 cloid 重试
+
+    同一个 cloid 的订单交易所只会接受一次，因此超时重试不需要先查询订单状态。
+
+    Args:
+        send: 发送请求的函数（每次调用必须使用同一个 cloid）
+        retries: 最大重试次数
+        retry_delay: 首次重试前的等待时间（秒），之后每次翻倍
+        description: 日志中的请求描述
+    """
+    for attempt in range(retries + 1):
+        try:
+            return send()
+        except Exception as e:
+            if attempt >= retries or not is_timeout_error(e):
+                raise
+            logger.warning(f"{description}提交超时，使用相同 cloid 重试 ({attempt + 1}/{retries}): {e}")
+            time.sleep(retry_delay * (2 ** attempt))
+
+
+class OrderIndex:
+    """
+    cloid -> 订单 的本地索引
+
+    - 下单前 register() 登记，收到响应后 resolve() 写入 oid 和状态
+    - 按 cloid 或 oid 查询均为 O(1)
+    - apply_fill() 按成交中的 cloid / oid 累加成交数量和均价
+    - 超过 max_orders 时优先淘汰最早结束的订单（已结束订单单独按结束顺序保存，淘汰为 O(1)）
+
+    示例:
+        index = OrderIndex()
+        cloid = new_cloid()
+        index.register(cloid, symbol="BTC", side="buy", amount=0.1, price=60000)
+        index.resolve(cloid, oid=123, status="open")
+        index.get(cloid)
+    """
+
+    def __init__(self, max_orders: int = 10000):
+        """
+        初始化订单索引
+
+        Args:
+            max_orders: 最多保留的订单数量
+        """
+        self.max_orders = max_orders
+        self._orders: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._oid_to_cloid: Dict[Any, str] = {}
+        self._terminal: "OrderedDict[str, None]" = OrderedDict()  # 已结束订单的 cloid，按结束顺序
+        self._lock = threading.RLock()
+
+    def register(
+        self,
+        cloid: str,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: Optional[float] = None,
+        order_type: str = 'limit',
+        **extra: Any
+    ) -> Dict[str, Any]:
+        """
+        登记即将提交的订单（重复登记同一个 cloid 时返回已有记录）
+
+        Returns:
+            订单记录
+        """
+        with self._lock:
+            record = self._orders.get(cloid)
+            if record is not None:
+                return record
+
+            record = {
+                'cloid': cloid,
+                'id': None,
+                'symbol': symbol,
+                'side': side,
+                'type': order_type,
+                'amount': amount,
+                'price': price,
+                'status': 'pending',
+                'filled': 0.0,
+                'average': None,
+                'attempts': 0,
+                'timestamp': int(time.time() * 1000),
+                **extra,
+            }
+            self._orders[cloid] = record
+            self._evict()
+            return record
+
+    def record_attempt(self, cloid: str) -> int:
+        """记录一次提交，返回该 cloid 的累计提交次数（未登记时返回 0）"""
+        with self._lock:
+            record = self._orders.get(cloid)
+            if record is None:
+                return 0
+            record['attempts'] += 1
+            return record['attempts']
+
+    def resolve(self, cloid: str, oid: Any = None, status: Optional[str] = None, **fields: Any) -> Optional[Dict[str, Any]]:
+        """
+        更新订单的 oid、状态和其他字段
+
+        Returns:
+            更新后的订单记录，cloid 未登记时返回 None
+        """
+        with self._lock:
+            record = self._orders.get(cloid)
+            if record is None:
+                return None
+            if oid is not None:
+                if record['id'] is not None and record['id'] != oid:
+                    self._oid_to_cloid.pop(record['id'], None)
+                record['id'] = oid
+                self._oid_to_cloid[oid] = cloid
+            if status is not None:
+                self._set_status(cloid, record, status)
+            record.update(fields)
+            return record
+
+    def get(self, cloid: str) -> Optional[Dict[str, Any]]:
+        """按 cloid 查找订单"""
+        return self._orders.get(cloid)
+
+    def get_by_oid(self, oid: Any) -> Optional[Dict[str, Any]]:
+        """按交易所订单 ID 查找订单"""
+        cloid = self._oid_to_cloid.get(oid)
+        return self._orders.get(cloid) if cloid is not None else None
+
+    def lookup(self, order_id: Any) -> Optional[Dict[str, Any]]:
+        """按 cloid 或 oid 查找订单"""
+        if is_cloid(order_id):
+            return self.get(order_id)
+        record = self.get_by_oid(order_id)
+        if record is None and isinstance(order_id, str) and order_id.isdigit():
+            record = self.get_by_oid(int(order_id))
+        return record
+
+    def update(self, order_id: Any, oid: Any = None, status: Optional[str] = None, **fields: Any) -> Optional[Dict[str, Any]]:
+        """
+        按 cloid 或 oid 更新订单（参数同 resolve）
+
+        Returns:
+            更新后的订单记录，订单不在索引中时返回 None
+        """
+        with self._lock:
+            key = order_id if is_cloid(order_id) else self._oid_to_cloid.get(order_id)
+            if key is None and isinstance(order_id, str) and order_id.isdigit():
+                key = self._oid_to_cloid.get(int(order_id))
+            if key is None:
+                return None
+            return self.resolve(key, oid=oid, status=status, **fields)
+
+    def cloid_for(self, oid: Any) -> Optional[str]:
+        """oid 对应的 cloid"""
+        record = self.get_by_oid(oid)
+        return record['cloid'] if record is not None else None
+
+    def apply_fill(self, fill: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        记录一笔成交（Hyperliquid userFills 格式：oid、cloid、sz、px）
+
+        Returns:
+            更新后的订单记录，订单不在索引中时返回 None
+        """
+        with self._lock:
+            cloid = fill.get('cloid') or self._oid_to_cloid.get(fill.get('oid'))
+            record = self._orders.get(cloid) if cloid else None
+            if record is None:
+                return None
+
+            size, price = float(fill['sz']), float(fill['px'])
+            filled = record['filled'] + size
+            previous_notional = record['filled'] * (record['average'] or 0.0)
+            record['average'] = (previous_notional + size * price) / filled
+            record['filled'] = filled
+            if fill.get('oid') is not None and record['id'] is None:
+                record['id'] = fill['oid']
+                self._oid_to_cloid[fill['oid']] = cloid
+            if record['amount'] and filled >= float(record['amount']) - 1e-12:
+                self._set_status(cloid, record, 'closed')
+            return record
+
+    def _set_status(self, cloid: str, record: Dict[str, Any], status: str) -> None:
+        """更新状态，并维护已结束订单的淘汰顺序"""
+        record['status'] = status
+        if status in TERMINAL_STATUSES:
+            self._terminal.setdefault(cloid, None)
+        else:
+            self._terminal.pop(cloid, None)
+
+    def _evict(self) -> None:
+        # 先淘汰最早结束的订单，没有已结束订单时按登记顺序淘汰
+        while len(self._orders) > self.max_orders:
+            if self._terminal:
+                cloid = next(iter(self._terminal))
+            else:
+                cloid = next(iter(self._orders))
+            self._remove(cloid)
+
+    def _remove(self, cloid: str) -> None:
+        record = self._orders.pop(cloid)
+        self._terminal.pop(cloid, None)
+        if record['id'] is not None:
+            self._oid_to_cloid.pop(record['id'], None)
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, cloid: str) -> bool:
+        return cloid in self._orders
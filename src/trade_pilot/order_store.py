@@ -0,0 +1,182 @@
+"""
+Mock 订单存储
+未成交订单按交易对、方向建立索引，已结束的订单压缩为 __slots__ 记录放入有界历史，
+查询未成交订单的开销只与当前挂单数量有关，与会话运行时长无关
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class ArchivedOrder:
+    """已结束订单的紧凑记录（不再变化，按需还原为订单字典）"""
+    __slots__ = (
+        'id', 'cloid', 'symbol', 'type', 'side', 'amount', 'price', 'average',
+        'status', 'filled', 'fee', 'timestamp', 'reduce_only', 'post_only', 'error',
+    )
+
+    def __init__(self, order: Dict[str, Any]):
+        # Mock 订单字典总是包含这些字段，直接取值（归档在下单热路径上）
+        self.id = order['id']
+        self.cloid = order['cloid']
+        self.symbol = order['symbol']
+        self.type = order['type']
+        self.side = order['side']
+        self.amount = order['amount']
+        self.price = order['price']
+        self.average = order['average']
+        self.status = order['status']
+        self.filled = order['filled']
+        self.fee = order['fee']
+        self.timestamp = order['timestamp']
+        self.reduce_only = order['reduceOnly']
+        self.post_only = order['postOnly']
+        self.error = order.get('error')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """还原为与未成交订单相同结构的订单字典"""
+        order = {
+            'id': self.id,
+            'symbol': self.symbol,
+            'type': self.type,
+            'side': self.side,
+            'amount': self.amount,
+            'price': self.price,
+            'average': self.average,
+            'status': self.status,
+            'filled': self.filled,
+            'remaining': 0.0 if self.status == 'closed' else max(0.0, self.amount - self.filled),
+            'fee': self.fee,
+            'timestamp': self.timestamp,
+            'reduceOnly': self.reduce_only,
+            'postOnly': self.post_only,
+            'cloid': self.cloid,
+        }
+        if self.error is not None:
+            order['error'] = self.error
+        return order
+
+
+class OrderStore:
+    """
+    Mock 客户端的订单存储
+
+    - 未成交订单保存原始字典（撮合引擎原地更新），按 id、交易对、方向索引
+    - 订单结束（全部成交、撤销、拒绝）后从挂单索引移除，压缩为 ArchivedOrder
+      放入最多 history_size 条的历史，超出时淘汰最早结束的订单及其 cloid
+    - open_orders(symbol, side) 为 O(k)，k 为符合条件的挂单数量
+
+    示例:
+        store = OrderStore(history_size=10000)
+        store.add(order)               # 按状态进入挂单索引或历史
+        store.open_orders("BTC/USDT:USDT", side="buy")
+        store.close(order)             # 订单结束时归档
+        store.get("mock_order_1000")   # 按 id 或 cloid 查询
+    """
+
+    def __init__(self, history_size: int = 10000):
+        """
+        初始化订单存储
+
+        Args:
+            history_size: 保留的已结束订单数量
+        """
+        self.history_size = history_size
+        self._open: Dict[str, Any] = {}
+        self._by_symbol: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self._history: "OrderedDict[str, ArchivedOrder]" = OrderedDict()
+        self._cloids: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._open) + len(self._history)
+
+    def __contains__(self, order_id: str) -> bool:
+        return self.resolve_id(order_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._open)
+        yield from list(self._history)
+
+    def resolve_id(self, order_id: str) -> Optional[str]:
+        """订单 id 或 cloid 转换为订单 id，未知订单返回 None"""
+        if order_id in self._open or order_id in self._history:
+            return order_id
+        return self._cloids.get(order_id)
+
+    def add(self, order: Dict[str, Any]) -> None:
+        """保存新订单：未成交订单进入挂单索引，其他订单直接归档"""
+        if order.get('cloid'):
+            self._cloids[order['cloid']] = order['id']
+        if order['status'] == 'open':
+            self._open[order['id']] = order
+            sides = self._by_symbol.get(order['symbol'])
+            if sides is None:
+                sides = self._by_symbol[order['symbol']] = {'buy': {}, 'sell': {}}
+            sides[order['side']][order['id']] = order
+        else:
+            self._archive(order)
+
+    def discard(self, order: Dict[str, Any]) -> None:
+        """从挂单索引中移除订单但不归档（改单前调用，改单后重新 add）"""
+        if self._open.pop(order['id'], None) is not None:
+            self._by_symbol[order['symbol']][order['side']].pop(order['id'], None)
+
+    def close(self, order: Dict[str, Any]) -> None:
+        """订单结束：移出挂单索引并归档（可重复调用）"""
+        self.discard(order)
+        self._archive(order)
+
+    def _archive(self, order: Dict[str, Any]) -> None:
+        history, order_id = self._history, order['id']
+        if order_id in history:
+            # 重复归档（close 可重复调用）时移到最新位置
+            history.move_to_end(order_id)
+        history[order_id] = ArchivedOrder(order)
+        while len(history) > self.history_size:
+            _, evicted = history.popitem(last=False)
+            if evicted.cloid and self._cloids.get(evicted.cloid) == evicted.id:
+                del self._cloids[evicted.cloid]
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """
+        按 id 或 cloid 查询订单
+
+        Returns:
+            未成交订单返回原始字典，已结束订单返回还原的字典，未知订单返回 None
+        """
+        order_id = self.resolve_id(order_id)
+        if order_id is None:
+            return None
+        order = self._open.get(order_id)
+        if order is not None:
+            return order
+        return self._history[order_id].to_dict()
+
+    def get_open(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """按 id 或 cloid 查询未成交订单，订单不存在或已结束时返回 None"""
+        order_id = self.resolve_id(order_id)
+        return self._open.get(order_id) if order_id is not None else None
+
+    def open_orders(self, symbol: Optional[str] = None, side: Optional[str] = None) -> List[Dict[str, Any]]:
+        """未成交订单（可按交易对、方向筛选）"""
+        if symbol is None:
+            if side is None:
+                return list(self._open.values())
+            return [
+                order
+                for sides in self._by_symbol.values()
+                for order in sides[side].values()
+            ]
+        sides = self._by_symbol.get(symbol)
+        if sides is None:
+            return []
+        if side is not None:
+            return list(sides[side].values())
+        return [*sides['buy'].values(), *sides['sell'].values()]
+
+    def stats(self) -> Dict[str, int]:
+        """挂单数量、历史订单数量、cloid 数量"""
+        return {
+            'open_orders': len(self._open),
+            'history': len(self._history),
+            'cloids': len(self._cloids),
+        }
@@ -0,0 +1,353 @@
+"""
+订单状态跟踪器
+由 orderUpdates / userFills 推送维护内存中的订单表，按 oid、cloid、交易对索引，
+推送不可用时按有效期用 REST 未成交订单快照对账
+"""
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from .order_index import OrderIndex
+
+logger = logging.getLogger(__name__)
+
+
+def order_status_from_hyperliquid(status: str) -> str:
+    """Hyperliquid 订单状态（open、filled、canceled、marginCanceled ...）转换为 open / closed / canceled / rejected"""
+    if status in ('open', 'triggered'):
+        return 'open'
+    if status == 'filled':
+        return 'closed'
+    if status.lower().endswith('rejected'):
+        return 'rejected'
+    return 'canceled'
+
+
+def order_from_hyperliquid(order: Dict[str, Any], status: str = 'open') -> Dict[str, Any]:
+    """将 Hyperliquid 的订单结构（orderUpdates、frontendOpenOrders、orderStatus）转换为跟踪器使用的订单字典"""
+    amount = float(order.get('origSz', order['sz']))
+    return {
+        'id': order['oid'],
+        'cloid': order.get('cloid'),
+        'symbol': order['coin'],
+        'side': 'buy' if order['side'] == 'B' else 'sell',
+        'type': 'limit',
+        'amount': amount,
+        'price': float(order['limitPx']),
+        'filled': amount - float(order['sz']),
+        'status': order_status_from_hyperliquid(status),
+        'timestamp': order.get('timestamp'),
+    }
+
+
+class OrderTracker(OrderIndex):
+    """
+    订单状态跟踪器（在 cloid 索引的基础上增加按交易对的挂单索引和对账）
+
+    - on_order_updates() / on_user_fills() 处理 websocket 推送，按 oid / cloid 更新订单
+    - reconcile() 用 REST 未成交订单快照对账：补充未知的挂单；快照中已消失的挂单
+      已全部成交时标记为 closed，否则用 status 函数逐个查询最终状态（没有推送时成交不会
+      记录到订单表，不能按成交数量推断为 canceled），无法查询时标记为 unknown，读取时回退到 REST
+    - open_orders() 和 get_order() 直接读取内存中的订单表，读取前调用 ensure_fresh()：
+        * 推送连接正常、且最后一次对账的快照在当前连接建立之后拉取时，订单表由推送实时维护，
+          每 stream_resync 秒对账一次作为兜底
+        * 推送断开（连接状态检查函数返回 None），或重连后尚未对账（断线期间的推送已丢失）时，
+          订单表最后一次对账超过 max_age 秒则先对账再返回
+      因此返回的数据最多落后 max_age 秒（推送模式下与推送同步）
+    - 成交按 tid 去重，同一笔成交同时出现在 userEvents 和 userFills 中时只计一次
+
+    示例:
+        tracker = OrderTracker(reconcile=fetch_open_orders, status=fetch_order, max_age=1.0)
+        tracker.open_orders("BTC")
+        tracker.get_order(123456)
+        tracker.freshness()
+    """
+
+    def __init__(
+        self,
+        reconcile: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        status: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        max_age: float = 1.0,
+        stream_resync: float = 60.0,
+        max_orders: int = 10000
+    ):
+        """
+        初始化订单跟踪器
+
+        Args:
+            reconcile: 返回当前全部未成交订单的函数（订单字典格式见 order_from_hyperliquid）
+            status: 按订单记录查询单个订单当前状态的函数（返回格式同上，查询失败时抛出异常）
+            max_age: 没有推送时订单表的最大可接受年龄（秒）
+            stream_resync: 推送连接正常时的兜底对账间隔（秒）
+            max_orders: 最多保留的订单数量
+        """
+        super().__init__(max_orders=max_orders)
+        self.reconcile_fn = reconcile
+        self.status_fn = status
+        self.max_age = max_age
+        self.stream_resync = stream_resync
+
+        self._live: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._fill_totals: Dict[str, List[float]] = {}
+        self._seen_fills: "OrderedDict[Any, None]" = OrderedDict()
+        self._stream_since: Optional[Callable[[], Optional[float]]] = None
+        self._synced_at: Optional[float] = None
+        # 最后一次对账的快照开始拉取的时间（monotonic）
+        self._snapshot_at: Optional[float] = None
+        self._event_at: Optional[float] = None
+        self._reconcile_lock = threading.Lock()
+
+        self.reconciliations = 0
+        self.events = 0
+
+    # ========== 订单表维护 ==========
+
+    def _key_for(self, order: Dict[str, Any]) -> str:
+        """订单在表中的键：优先使用 cloid，没有 cloid 的订单使用 oid"""
+        if order.get('cloid'):
+            return order['cloid']
+        existing = self._oid_to_cloid.get(order['id'])
+        return existing if existing is not None else f"oid:{order['id']}"
+
+    def upsert(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        插入或更新订单（订单字典包含 id、cloid、symbol、side、amount、price、filled、status）
+
+        Returns:
+            更新后的订单记录
+        """
+        with self._lock:
+            key = self._key_for(order)
+            if key not in self._orders:
+                self.register(
+                    key, order['symbol'], order['side'], order['amount'],
+                    order.get('price'), order.get('type', 'limit')
+                )
+                self._orders[key]['cloid'] = order.get('cloid')
+
+            record = self._orders[key]
+            fields = {
+                name: order[name]
+                for name in ('amount', 'price', 'timestamp')
+                if order.get(name) is not None
+            }
+            # 成交数量取推送 / 快照与成交记录中较大的一方，避免重复累加
+            if order.get('filled') is not None:
+                fields['filled'] = max(record['filled'], float(order['filled']))
+            return self.resolve(key, oid=order['id'], status=order.get('status'), **fields)
+
+    def resolve(self, cloid: str, oid: Any = None, status: Optional[str] = None, **fields: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = super().resolve(cloid, oid=oid, status=status, **fields)
+            if record is not None:
+                self._refresh_record(cloid, record)
+            return record
+
+    def _refresh_record(self, key: str, record: Dict[str, Any]) -> None:
+        """更新 remaining / updated_at，并维护按交易对的挂单索引"""
+        amount = float(record['amount'] or 0)
+        record['remaining'] = max(0.0, amount - record['filled'])
+        record['updated_at'] = int(time.time() * 1000)
+
+        live = self._live.setdefault(record['symbol'], {})
+        if record['status'] == 'open':
+            live[key] = record
+        else:
+            live.pop(key, None)
+
+    def apply_fill(self, fill: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """记录一笔成交（按 tid 去重），更新成交数量、均价，全部成交时标记为 closed"""
+        with self._lock:
+            tid = fill.get('tid')
+            if tid is not None:
+                if tid in self._seen_fills:
+                    return None
+                self._seen_fills[tid] = None
+                while len(self._seen_fills) > self.max_orders:
+                    self._seen_fills.popitem(last=False)
+
+            key = fill.get('cloid') or self._oid_to_cloid.get(fill.get('oid'))
+            record = self._orders.get(key) if key else None
+            if record is None:
+                return None
+
+            totals = self._fill_totals.setdefault(key, [0.0, 0.0])
+            totals[0] += float(fill['sz'])
+            totals[1] += float(fill['sz']) * float(fill['px'])
+
+            filled = max(record['filled'], totals[0])
+            status = 'closed' if record['amount'] and filled >= float(record['amount']) - 1e-12 else None
+            return self.resolve(key, oid=fill.get('oid'), status=status, filled=filled, average=totals[1] / totals[0])
+
+    def _remove(self, cloid: str) -> None:
+        record = self._orders[cloid]
+        self._live.get(record['symbol'], {}).pop(cloid, None)
+        self._fill_totals.pop(cloid, None)
+        super()._remove(cloid)
+
+    # ========== 推送 ==========
+
+    def attach_stream(self, connected_since: Optional[Callable[[], Optional[float]]]) -> None:
+        """
+        设置推送连接状态的检查函数
+
+        Args:
+            connected_since: 返回当前连接建立的时间（time.monotonic()），连接断开时返回 None
+                （例如 SubscriptionManager.connected_since）；None 表示没有推送，读取时按 max_age 对账
+        """
+        self._stream_since = connected_since
+
+    def streaming(self) -> bool:
+        """订单表是否由推送维护：连接正常，且最后一次对账的快照在当前连接建立之后拉取"""
+        if self._stream_since is None:
+            return False
+        since = self._stream_since()
+        snapshot_at = self._snapshot_at
+        return since is not None and snapshot_at is not None and snapshot_at >= since
+
+    def on_order_updates(self, updates: List[Dict[str, Any]]) -> None:
+        """处理 orderUpdates 推送"""
+        for update in updates:
+            self.upsert(order_from_hyperliquid(update['order'], update['status']))
+        self._event_at = time.monotonic()
+        self.events += 1
+
+    def on_user_fills(self, data: Dict[str, Any]) -> None:
+        """处理 userFills / userEvents 推送中的成交（跳过订阅时的历史成交快照）"""
+        if data.get('isSnapshot'):
+            return
+        for fill in data.get('fills', []):
+            self.apply_fill(fill)
+        self._event_at = time.monotonic()
+        self.events += 1
+
+    # ========== 对账 ==========
+
+    def reconcile(self, open_orders: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        用未成交订单快照对账
+
+        Args:
+            open_orders: 当前全部未成交订单（默认调用 reconcile 函数拉取）
+        """
+        started = int(time.time() * 1000)
+        snapshot_at = time.monotonic()
+        if open_orders is None:
+            if self.reconcile_fn is None:
+                raise ValueError("没有设置对账函数")
+            open_orders = self.reconcile_fn()
+
+        with self._lock:
+            seen = set()
+            for order in open_orders:
+                record = self.upsert({**order, 'status': 'open'})
+                seen.add(self._key_for(record))
+
+            # 快照中已消失、且快照请求发出后没有更新过的挂单
+            vanished = []
+            for live in list(self._live.values()):
+                for key, record in list(live.items()):
+                    if key in seen or record['updated_at'] > started:
+                        continue
+                    if record['filled'] >= float(record['amount'] or 0) - 1e-12:
+                        self.resolve(key, status='closed')
+                    else:
+                        # 查询完成前读取该订单的调用方回退到 REST
+                        vanished.append((key, dict(self.resolve(key, status='unknown'))))
+
+            self._synced_at = time.monotonic()
+            self._snapshot_at = snapshot_at
+            self.reconciliations += 1
+
+        # 已消失的挂单可能已成交也可能已撤销，逐个查询最终状态（在锁外发起请求）
+        for key, record in vanished:
+            self._resolve_vanished(key, record)
+
+    def _resolve_vanished(self, key: str, record: Dict[str, Any]) -> None:
+        """查询快照中已消失的挂单的最终状态，无法查询时保持 unknown"""
+        if self.status_fn is None:
+            return
+        try:
+            order = self.status_fn(record)
+        except Exception as e:
+            logger.warning(f"查询已消失挂单的状态失败 ({record.get('id')}): {e}")
+            return
+        # 使用订单表中的 cloid，保证写回同一条记录
+        self.upsert({**order, 'cloid': record.get('cloid')})
+
+    def age(self) -> Optional[float]:
+        """距最后一次对账的时间（秒），从未对账时返回 None"""
+        return None if self._synced_at is None else time.monotonic() - self._synced_at
+
+    def ensure_fresh(self, max_age: Optional[float] = None) -> None:
+        """
+        保证订单表不超过 max_age 秒（推送维护订单表时为 stream_resync 秒，见 streaming()），否则先对账
+
+        没有设置对账函数时只使用推送数据。
+        """
+        if self.reconcile_fn is None:
+            return
+        limit = self.max_age if max_age is None else max_age
+        if self.streaming():
+            limit = max(limit, self.stream_resync)
+
+        age = self.age()
+        if age is not None and age <= limit:
+            return
+        with self._reconcile_lock:
+            age = self.age()
+            if age is None or age > limit:
+                self.reconcile()
+
+    # ========== 查询 ==========
+
+    def open_orders(self, symbol: Optional[str] = None, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        未成交订单
+
+        Args:
+            symbol: 交易对（可选）
+            max_age: 可接受的最大数据年龄（秒），默认使用 max_age
+        """
+        self.ensure_fresh(max_age)
+        with self._lock:
+            if symbol is not None:
+                return list(self._live.get(symbol, {}).values())
+            return [record for live in self._live.values() for record in live.values()]
+
+    def get_order(self, order_id: Any, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        按 oid 或 cloid 查询订单
+
+        Args:
+            order_id: oid 或 cloid
+            max_age: 可接受的最大数据年龄（秒），默认使用 max_age
+
+        Returns:
+            订单记录，订单表中没有时返回 None
+        """
+        self.ensure_fresh(max_age)
+        return self.lookup(order_id)
+
+    def freshness(self) -> Dict[str, Any]:
+        """数据来源（stream / rest）、距最后一次对账和最后一次推送的时间（秒）"""
+        now = time.monotonic()
+        return {
+            'source': 'stream' if self.streaming() else 'rest',
+            'synced_age': None if self._synced_at is None else now - self._synced_at,
+            'event_age': None if self._event_at is None else now - self._event_at,
+            'max_age': self.stream_resync if self.streaming() else self.max_age,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """订单数、挂单数、对账次数、推送次数"""
+        with self._lock:
+            return {
+                'orders': len(self._orders),
+                'open_orders': sum(len(live) for live in self._live.values()),
+                'reconciliations': self.reconciliations,
+                'events': self.events,
+                **self.freshness(),
+            }
@@ -0,0 +1,214 @@
+"""
+模拟盘客户端
+行情、订单簿、K 线来自真实（或录制的）行情源，订单在本地撮合引擎中成交：
+吃单逐档吃真实盘口深度，按 Hyperliquid 费率收取手续费，维护持仓和保证金账本，
+不会向交易所发送任何订单
+"""
+import time
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .matching_engine import MatchingEngine
+from .mock_client import MockHyperliquidClient
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _book_levels(levels: List[Any]) -> List[List[float]]:
+    """
+    订单簿档位转换为 [[价格, 数量], ...]
+
+    支持 get_order_book 的 {'price', 'size'}、Hyperliquid L2 的 {'px', 'sz'} 和 [price, size] 格式
+    """
+    result = []
+    for level in levels:
+        if isinstance(level, dict):
+            price = level['price'] if 'price' in level else level['px']
+            size = level['size'] if 'size' in level else level['sz']
+        else:
+            price, size = level[0], level[1]
+        result.append([float(price), float(size)])
+    return result
+
+
+class PaperTradingClient(MockHyperliquidClient):
+    """
+    模拟盘交易客户端（与 MockHyperliquidClient / HyperliquidClient 的方法一致，可直接用于 create_trading_tools）
+
+    - data_client 提供行情：get_ticker、fetch_ohlcv，以及 get_order_book(symbol, depth)
+      或 get_orderbook(symbol, limit)；可以是只读的 HyperliquidSDKClient，也可以是回放录制数据的对象
+    - 下单、查询前按 book_ttl 刷新相关交易对的订单簿：外部盘口穿过的挂单按挂单价成交，
+      吃单逐档吃盘口深度（被吃掉的数量在下一次刷新前不会重复使用）
+    - 保证金账本：按杠杆计算持仓和挂单占用的保证金，增加敞口的订单在可用保证金不足时拒绝
+
+    示例:
+        data = HyperliquidSDKClient(read_only=True)
+        client = PaperTradingClient(data, initial_balance=10000, leverage=5)
+        client.create_market_order("BTC/USDC:USDC", "buy", 0.01)
+        client.get_positions()
+        tools = create_trading_tools(client)
+    """
+
+    def __init__(
+        self,
+        data_client: Any,
+        initial_balance: float = 10000.0,
+        leverage: int = 1,
+        maker_fee: float = 0.00015,
+        taker_fee: float = 0.00045,
+        book_depth: int = 20,
+        book_ttl: float = 0.5,
+        engine: Optional[MatchingEngine] = None,
+        order_history: int = 10000
+    ):
+        """
+        初始化模拟盘客户端
+
+        Args:
+            data_client: 行情数据源（真实客户端或录制数据回放）
+            initial_balance: 初始 USDT 余额
+            leverage: 默认杠杆倍数（可用 set_leverage 按交易对设置）
+            maker_fee: 挂单手续费率（默认 Hyperliquid 基础费率 0.015%）
+            taker_fee: 吃单手续费率（默认 Hyperliquid 基础费率 0.045%）
+            book_depth: 拉取的订单簿档位数
+            book_ttl: 订单簿最大可接受年龄（秒）
+            engine: 撮合引擎（可选，默认按 maker_fee / taker_fee 创建）
+            order_history: 保留的已结束订单数量
+        """
+        super().__init__(
+            initial_balance=initial_balance,
+            engine=engine or MatchingEngine(maker_fee=maker_fee, taker_fee=taker_fee),
+            order_history=order_history,
+            prices={}
+        )
+        self.data_client = data_client
+        self.default_leverage = leverage
+        self.book_depth = book_depth
+        self.book_ttl = book_ttl
+
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._book_times: Dict[str, float] = {}
+        self.book_refreshes = 0
+
+        logger.info(f"模拟盘客户端初始化完成 (数据源={type(data_client).__name__})")
+
+    # ========== 行情 ==========
+
+    def _refresh_book(self, symbol: str) -> Dict[str, Any]:
+        """从数据源拉取订单簿并写入撮合引擎"""
+        source = self.data_client
+        if hasattr(source, 'get_order_book'):
+            raw = source.get_order_book(symbol, self.book_depth)
+        else:
+            raw = source.get_orderbook(symbol, self.book_depth)
+
+        snapshot = {
+            'symbol': symbol,
+            'bids': _book_levels(raw['bids']),
+            'asks': _book_levels(raw['asks']),
+            'timestamp': raw.get('timestamp'),
+        }
+        self._snapshots[symbol] = snapshot
+        self._book_times[symbol] = time.monotonic()
+        self.book_refreshes += 1
+
+        touched = self.engine.set_book(symbol, snapshot['bids'], snapshot['asks'])
+        if touched:
+            logger.info("外部盘口成交挂单 (Paper): %s, %s 个订单", symbol, len(touched))
+        return snapshot
+
+    def _sync_market(self, *symbols: str) -> None:
+        """刷新过期的订单簿：指定的交易对，以及有挂单或持仓的交易对"""
+        active = [symbol for symbol, book in self.engine.books.items() if len(book)]
+        active += [symbol for symbol, position in self.engine.positions.items() if position['size']]
+        now = time.monotonic()
+        for symbol in dict.fromkeys((*symbols, *active)):
+            refreshed = self._book_times.get(symbol)
+            if refreshed is None or now - refreshed > self.book_ttl:
+                self._refresh_book(symbol)
+
+    def get_current_price(self, symbol: str) -> float:
+        """获取当前中间价（来自订单簿）"""
+        try:
+            self._sync_market(symbol)
+            return self.prices[symbol]
+        except Exception as e:
+            raise Exception(f"获取价格失败: {e}")
+
+    def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        """获取行情（数据源的行情，买一 / 卖一来自订单簿）"""
+        try:
+            ticker = dict(self.data_client.get_ticker(symbol))
+            self._sync_market(symbol)
+            snapshot = self._snapshots[symbol]
+            if snapshot['bids']:
+                ticker['bid'] = snapshot['bids'][0][0]
+            if snapshot['asks']:
+                ticker['ask'] = snapshot['asks'][0][0]
+            return ticker
+        except Exception as e:
+            raise Exception(f"获取行情失败: {e}")
+
+    def get_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取行情（数据源的批量行情，未过期的本地订单簿快照覆盖买一 / 卖一）
+
+        数据源没有 get_tickers 时逐个调用 get_ticker；不会为批量行情额外拉取订单簿
+        """
+        try:
+            source = self.data_client
+            if hasattr(source, 'get_tickers'):
+                tickers = {symbol: dict(ticker) for symbol, ticker in source.get_tickers(symbols).items()}
+            else:
+                tickers = {symbol: dict(source.get_ticker(symbol)) for symbol in symbols or []}
+            now = time.monotonic()
+            for symbol, ticker in tickers.items():
+                refreshed = self._book_times.get(symbol)
+                if refreshed is None or now - refreshed > self.book_ttl:
+                    continue
+                snapshot = self._snapshots[symbol]
+                if snapshot['bids']:
+                    ticker['bid'] = snapshot['bids'][0][0]
+                if snapshot['asks']:
+                    ticker['ask'] = snapshot['asks'][0][0]
+            return tickers
+        except Exception as e:
+            raise Exception(f"获取行情失败: {e}")
+
+    def get_orderbook(self, symbol: str, limit: int = 20) -> Dict[str, Any]:
+        """获取订单簿（数据源的最新快照，不扣除本地吃掉的数量）"""
+        try:
+            self._sync_market(symbol)
+            snapshot = self._snapshots[symbol]
+            return {**snapshot, 'bids': snapshot['bids'][:limit], 'asks': snapshot['asks'][:limit]}
+        except Exception as e:
+            raise Exception(f"获取订单簿失败: {e}")
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = "1h", limit: int = 100) -> "pd.DataFrame":
+        """获取 K 线数据（直接来自数据源）"""
+        return self.data_client.fetch_ohlcv(symbol, timeframe, limit=limit)
+
+    # ========== 订单查询 ==========
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """获取未成交订单（先按最新盘口撮合）"""
+        self._sync_market()
+        return super().get_open_orders(symbol)
+
+    def get_order_status(self, order_id: str, symbol: str) -> Dict[str, Any]:
+        """查询订单状态（先按最新盘口撮合）"""
+        self._sync_market()
+        return super().get_order_status(order_id, symbol)
+
+    def stats(self) -> Dict[str, Any]:
+        """订单簿刷新次数、成交笔数、挂单和历史订单数量"""
+        return {
+            'book_refreshes': self.book_refreshes,
+            'fills': len(self.engine.fills),
+            'fees': self.engine.fees,
+            'realized_pnl': self.engine.realized_pnl,
+            **self.orders.stats(),
+        }
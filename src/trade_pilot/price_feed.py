@@ -0,0 +1,136 @@
+"""
+实时价格表
+批量拉取（或由推送数据写入）全市场中间价，按交易对保存价格和更新时间
+"""
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PriceFeed:
+    """
+    全市场中间价表
+
+    - 内部是 {symbol: (price, updated_at)} 的字典，读取为 O(1) 查表
+    - 价格超过 max_age 时触发一次批量刷新，并发调用方共享同一次刷新
+    - 可选后台线程按 poll_interval 周期性批量刷新
+    - 推送数据（例如 websocket）可以通过 update() 直接写入
+
+    示例:
+        feed = PriceFeed(fetch_all_mids, max_age=1.0)
+        price = feed.get("BTC/USDC:USDC")
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[], Dict[str, float]],
+        max_age: float = 1.0,
+        poll_interval: Optional[float] = None
+    ):
+        """
+        初始化价格表
+
+        Args:
+            fetcher: 批量获取价格的函数，返回 {symbol: price}
+            max_age: 价格最大可接受年龄（秒）
+            poll_interval: 后台轮询间隔（秒），None 表示不启动后台线程
+        """
+        self._fetcher = fetcher
+        self.max_age = max_age
+        self.poll_interval = poll_interval
+        self._prices: Dict[str, Tuple[float, float]] = {}
+        self._refresh_lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.refresh_count = 0
+
+    def update(self, prices: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        """
+        批量写入价格
+
+        Args:
+            prices: {symbol: price}
+            timestamp: 价格时间（time.monotonic() 时钟），默认当前时间
+        """
+        ts = time.monotonic() if timestamp is None else timestamp
+        table = self._prices
+        for symbol, price in prices.items():
+            table[symbol] = (float(price), ts)
+
+    def refresh(self) -> None:
+        """批量刷新全部价格（并发调用只会触发一次拉取）"""
+        requested_at = time.monotonic()
+        with self._refresh_lock:
+            # 等锁期间已有其他线程完成刷新，直接复用
+            if self._last_refresh >= requested_at:
+                return
+            prices = self._fetcher()
+            now = time.monotonic()
+            self.update(prices, now)
+            self._last_refresh = now
+            self.refresh_count += 1
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> float:
+        """
+        获取价格
+
+        Args:
+            symbol: 交易对符号
+            max_age: 本次读取可接受的最大年龄（秒），默认使用 max_age
+
+        Returns:
+            中间价
+        """
+        limit = self.max_age if max_age is None else max_age
+        entry = self._prices.get(symbol)
+        if entry is None or time.monotonic() - entry[1] > limit:
+            self.refresh()
+            entry = self._prices.get(symbol)
+            if entry is None:
+                raise KeyError(f"价格表中没有 {symbol}")
+        return entry[0]
+
+    def age(self, symbol: str) -> Optional[float]:
+        """指定交易对价格的年龄（秒），没有价格时返回 None"""
+        entry = self._prices.get(symbol)
+        if entry is None:
+            return None
+        return time.monotonic() - entry[1]
+
+    def snapshot(self) -> Dict[str, float]:
+        """当前价格表的副本 {symbol: price}"""
+        return {symbol: entry[0] for symbol, entry in list(self._prices.items())}
+
+    # ========== 后台轮询 ==========
+
+    def start(self) -> None:
+        """启动后台轮询线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if not self.poll_interval:
+            raise ValueError("启动后台轮询需要设置 poll_interval")
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._poll_loop, name="price-feed", daemon=True)
+        self._thread.start()
+        logger.info(f"价格轮询已启动 (间隔 {self.poll_interval}s)")
+
+    def stop(self) -> None:
+        """停止后台轮询线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _poll_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"价格轮询失败: {e}")
+            self._stop_event.wait(self.poll_interval)
@@ -0,0 +1,269 @@
+"""
+请求调度器
+进程内共享的令牌桶限流器，按 Hyperliquid 的请求权重计费，交易请求优先于行情查询
+"""
+import heapq
+import itertools
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 请求通道，数值越小优先级越高
+TRADING = 'trading'          # /exchange：下单、撤单、改单、调整杠杆
+ACCOUNT = 'account'          # 账户相关的 /info 查询
+MARKET_DATA = 'market_data'  # 行情、元数据等 /info 查询
+
+LANE_PRIORITY = {TRADING: 0, ACCOUNT: 1, MARKET_DATA: 2}
+
+# Hyperliquid REST 限额：每个 IP 每分钟 1200 权重
+DEFAULT_CAPACITY = 1200
+DEFAULT_REFILL_PER_SECOND = 1200 / 60
+
+# 权重为 2 的轻量 /info 请求，其余 /info 请求权重为 20（userRole 为 60）
+_LIGHT_INFO_TYPES = {
+    'l2Book', 'allMids', 'clearinghouseState', 'orderStatus',
+    'spotClearinghouseState', 'exchangeStatus',
+}
+_HEAVY_INFO_TYPES = {'userRole': 60}
+
+
+def request_weight(path: str, payload: Optional[Dict[str, Any]] = None) -> int:
+    """
+    计算单个请求的权重
+
+    - /exchange：1 + floor(批量长度 / 40)
+    - /info：l2Book、allMids、clearinghouseState 等为 2，userRole 为 60，其余为 20
+
+    Args:
+        path: 请求路径，'/info' 或 '/exchange'（不带斜杠也可以）
+        payload: 请求体
+    """
+    payload = payload or {}
+    if path.strip('/') == 'exchange':
+        action = payload.get('action') or {}
+        batch = action.get('orders') or action.get('cancels') or action.get('modifies') or []
+        return 1 + len(batch) // 40
+
+    info_type = payload.get('type')
+    if info_type in _LIGHT_INFO_TYPES:
+        return 2
+    return _HEAVY_INFO_TYPES.get(info_type, 20)
+
+
+def request_lane(path: str, payload: Optional[Dict[str, Any]] = None) -> str:
+    """请求所属的通道：/exchange 为 trading，带 user 参数的 /info 为 account，其余为 market_data"""
+    payload = payload or {}
+    if path.strip('/') == 'exchange':
+        return TRADING
+    if 'user' in payload:
+        return ACCOUNT
+    return MARKET_DATA
+
+
+class RequestScheduler:
+    """
+    带优先级通道的令牌桶调度器
+
+    - 令牌按 refill_per_second 持续补充，上限为 capacity；每个请求消耗与其权重相同的令牌
+    - 等待中的请求按 (通道优先级, 到达顺序) 排队，只有队首可以取令牌，
+      交易请求到达后会排到所有行情查询之前
+    - 非交易请求不能把令牌用到 reserve 以下，保证行情轮询耗尽额度时仍能立即下单 / 撤单
+    - 收到 429 时调用 backoff() 清空令牌，所有共享该调度器的客户端一起退让
+    - stats() 提供各通道的排队数量、请求数、权重和等待时间
+
+    示例:
+        scheduler = get_default_scheduler()
+        scheduler.acquire(weight=2, lane=MARKET_DATA)
+        scheduler.stats()
+    """
+
+    def __init__(
+        self,
+        capacity: float = DEFAULT_CAPACITY,
+        refill_per_second: float = DEFAULT_REFILL_PER_SECOND,
+        reserve: float = 60
+    ):
+        """
+        初始化调度器
+
+        Args:
+            capacity: 令牌桶容量（权重）
+            refill_per_second: 每秒补充的令牌数
+            reserve: 为交易请求保留的令牌数
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.reserve = min(reserve, capacity)
+
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+        self._metrics = {
+            lane: {
+                'queued': 0,
+                'requests': 0,
+                'weight': 0,
+                'total_wait': 0.0,
+                'max_wait': 0.0,
+                'timeouts': 0,
+            }
+            for lane in LANE_PRIORITY
+        }
+        self.backoffs = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    def acquire(self, weight: float = 1, lane: str = MARKET_DATA, timeout: Optional[float] = None) -> float:
+        """
+        获取令牌（阻塞直到令牌足够且轮到本请求）
+
+        Args:
+            weight: 请求权重
+            lane: 通道（TRADING / ACCOUNT / MARKET_DATA）
+            timeout: 最长等待时间（秒），超时抛出 TimeoutError
+
+        Returns:
+            实际等待时间（秒）
+        """
+        if lane not in LANE_PRIORITY:
+            raise ValueError(f"未知的请求通道: {lane}")
+        weight = min(weight, self.capacity)
+        floor = 0 if lane == TRADING else self.reserve
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        metrics = self._metrics[lane]
+
+        with self._cond:
+            entry = (LANE_PRIORITY[lane], next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            metrics['queued'] += 1
+            try:
+                while True:
+                    self._refill()
+                    is_head = self._waiters[0] == entry
+                    if is_head and self._tokens - weight >= floor:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= weight
+                        break
+
+                    # 队首按令牌缺口计算等待时间，其余请求等待队首变化的通知
+                    wait = (weight + floor - self._tokens) / self.refill_per_second if is_head else None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._waiters.remove(entry)
+                            heapq.heapify(self._waiters)
+                            metrics['timeouts'] += 1
+                            raise TimeoutError(f"等待请求额度超时（通道 {lane}，权重 {weight}）")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                metrics['queued'] -= 1
+                # 队首已变化，唤醒其余等待者重新检查
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            metrics['requests'] += 1
+            metrics['weight'] += weight
+            metrics['total_wait'] += waited
+            metrics['max_wait'] = max(metrics['max_wait'], waited)
+        return waited
+
+    def backoff(self, seconds: float = 1.0) -> None:
+        """收到 429 后清空令牌，之后 seconds 秒内不发出新请求"""
+        with self._cond:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.refill_per_second
+            self.backoffs += 1
+            self._cond.notify_all()
+        logger.warning(f"触发交易所限流，暂停请求 {seconds:.1f} 秒")
+
+    def available(self) -> float:
+        """当前可用令牌数"""
+        with self._cond:
+            self._refill()
+            return self._tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """可用令牌、退让次数，以及各通道的排队数量、请求数、权重、平均 / 最大等待时间（秒）"""
+        with self._cond:
+            self._refill()
+            return {
+                'tokens': self._tokens,
+                'backoffs': self.backoffs,
+                'lanes': {
+                    lane: {
+                        **m,
+                        'avg_wait': m['total_wait'] / m['requests'] if m['requests'] else 0.0,
+                    }
+                    for lane, m in self._metrics.items()
+                },
+            }
+
+    # ========== 客户端接入 ==========
+
+    def wrap_post(self, post: Callable[[str, Any], Any]) -> Callable[[str, Any], Any]:
+        """
+        包装 hyperliquid SDK 的 API.post(url_path, payload)，请求前按权重获取令牌
+
+        示例:
+            info.post = scheduler.wrap_post(info.post)
+        """
+        def limited_post(url_path: str, payload: Any = None) -> Any:
+            self.acquire(request_weight(url_path, payload), request_lane(url_path, payload))
+            try:
+                return post(url_path, payload)
+            except Exception as e:
+                if getattr(e, 'status_code', None) == 429:
+                    self.backoff()
+                raise
+        limited_post.__wrapped__ = post
+        return limited_post
+
+    def wrap_ccxt_request(self, request: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        包装 CCXT 交易所实例的 request(path, api, method, params, ...)
+
+        示例:
+            exchange.request = scheduler.wrap_ccxt_request(exchange.request)
+        """
+        def limited_request(path, api='public', method='GET', params=None, *args, **kwargs):
+            payload = params if isinstance(params, dict) else {}
+            self.acquire(request_weight(path, payload), request_lane(path, payload))
+            try:
+                return request(path, api, method, params if params is not None else {}, *args, **kwargs)
+            except Exception as e:
+                if type(e).__name__ in ('RateLimitExceeded', 'DDoSProtection'):
+                    self.backoff()
+                raise
+        limited_request.__wrapped__ = request
+        return limited_request
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    """进程内共享的默认调度器（首次调用时创建）"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
+
+
+def set_default_scheduler(scheduler: RequestScheduler) -> None:
+    """替换进程内共享的默认调度器（例如使用子账户独立额度或测试时）"""
+    global _default_scheduler
+    with _default_lock:
+        _default_scheduler = scheduler
@@ -0,0 +1,159 @@
+"""
+全市场筛选器
+一次批量行情请求（get_tickers，Hyperliquid 为一次 metaAndAssetCtxs）得到全部交易对，
+转换为列式 DataFrame 后用 NumPy 一次完成过滤、排序和排名
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cache import TTLSnapshotCache
+
+# Hyperliquid 资金费每小时结算一次
+FUNDING_PERIODS_PER_YEAR = 24 * 365
+
+# 行情字段 -> 筛选表的列
+_TICKER_FIELDS = {
+    'last': 'last',
+    'bid': 'bid',
+    'ask': 'ask',
+    'change_24h_pct': 'percentage',
+    'volume_24h': 'quoteVolume',
+    'open_interest': 'openInterest',
+    'funding_rate': 'fundingRate',
+}
+
+# 筛选表的全部列（symbol 为索引）
+SCREENER_COLUMNS = [
+    'last', 'bid', 'ask', 'spread_bps', 'change_24h_pct', 'volume_24h',
+    'open_interest', 'open_interest_usd', 'funding_rate', 'funding_apr_pct',
+]
+
+Bounds = Tuple[Optional[float], Optional[float]]
+
+
+def _column(tickers: Sequence[Dict[str, Any]], field: str) -> np.ndarray:
+    """取出一个行情字段为 float 数组（缺失值为 NaN）"""
+    values = (ticker.get(field) for ticker in tickers)
+    return np.array([math.nan if value is None else value for value in values], dtype=float)
+
+
+def tickers_to_frame(tickers: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """
+    批量行情转换为列式筛选表
+
+    Args:
+        tickers: get_tickers 返回的 {symbol: 行情数据}
+
+    Returns:
+        以 symbol 为索引、列为 SCREENER_COLUMNS 的 DataFrame（缺失值为 NaN）
+    """
+    rows = list(tickers.values())
+    data = {column: _column(rows, field) for column, field in _TICKER_FIELDS.items()}
+
+    bid, ask = data['bid'], data['ask']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        data['spread_bps'] = (ask - bid) / ((ask + bid) / 2) * 1e4
+    data['open_interest_usd'] = data['open_interest'] * data['last']
+    data['funding_apr_pct'] = data['funding_rate'] * FUNDING_PERIODS_PER_YEAR * 100
+
+    frame = pd.DataFrame(data, index=pd.Index(list(tickers), name='symbol'))
+    return frame[SCREENER_COLUMNS]
+
+
+class MarketScreener:
+    """
+    全市场筛选器
+
+    - 全市场筛选表来自一次 get_tickers(None) 调用，在 ttl 秒内的重复筛选共享同一份快照
+    - screen() 对整个筛选表做一次向量化过滤（区间条件），按指定列排序取前 limit 个，
+      rank 为在所有满足条件的交易对中的名次
+    - 客户端可以是 HyperliquidSDKClient、HyperliquidClient、Mock / 模拟盘 / 回测客户端
+
+    示例:
+        screener = MarketScreener(client)
+        screener.screen(sort_by="funding_rate", limit=10)                       # 资金费率最高的 10 个
+        screener.screen(sort_by="change_24h_pct", descending=False,
+                        filters={"volume_24h": (1e7, None)})                    # 成交额 > 1000 万中跌幅最大的
+    """
+
+    def __init__(self, client: Any, ttl: float = 5.0):
+        """
+        初始化筛选器
+
+        Args:
+            client: 提供 get_tickers(symbols) 的客户端
+            ttl: 全市场快照的有效期（秒，默认 5）
+        """
+        self.client = client
+        self.snapshot = TTLSnapshotCache(self._load, ttl=ttl)
+
+    def _load(self) -> pd.DataFrame:
+        return tickers_to_frame(self.client.get_tickers(None))
+
+    def frame(self, max_age: Optional[float] = None) -> pd.DataFrame:
+        """
+        全市场筛选表
+
+        Args:
+            max_age: 可接受的最大快照年龄（秒，默认使用 ttl）
+        """
+        try:
+            return self.snapshot.get(max_age)
+        except Exception as e:
+            raise Exception(f"获取全市场行情失败: {e}")
+
+    def screen(
+        self,
+        sort_by: str = 'volume_24h',
+        descending: bool = True,
+        limit: Optional[int] = 10,
+        filters: Optional[Dict[str, Bounds]] = None,
+        columns: Optional[List[str]] = None,
+        max_age: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        过滤、排序并取前 limit 个交易对
+
+        Args:
+            sort_by: 排序列（SCREENER_COLUMNS 之一）
+            descending: 是否从大到小排序
+            limit: 返回的交易对数量（None 表示全部）
+            filters: {列名: (下限, 上限)}，闭区间，None 表示不限；条件列缺失的交易对被排除
+            columns: 返回的列（默认全部），rank 和排序列总是包含
+            max_age: 可接受的最大快照年龄（秒）
+
+        Returns:
+            以 symbol 为索引的 DataFrame，第一列 rank 为名次（从 1 开始）
+        """
+        for name in [sort_by, *(filters or {}), *(columns or [])]:
+            if name not in SCREENER_COLUMNS:
+                raise ValueError(f"未知的筛选列: {name}（可用: {', '.join(SCREENER_COLUMNS)}）")
+
+        frame = self.frame(max_age)
+        key = frame[sort_by].to_numpy()
+        mask = ~np.isnan(key)
+        for name, (low, high) in (filters or {}).items():
+            values = frame[name].to_numpy()
+            # NaN 与任何值比较都为 False，条件列缺失的交易对自然被排除
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        selected = np.flatnonzero(mask)
+        order = selected[np.argsort(-key[selected] if descending else key[selected], kind='stable')]
+        if limit is not None:
+            order = order[:limit]
+
+        if columns:
+            columns = list(dict.fromkeys([sort_by, *columns]))
+        else:
+            columns = SCREENER_COLUMNS
+        result = frame.iloc[order][columns]
+        result.insert(0, 'rank', np.arange(1, len(order) + 1))
+        result.attrs['matched'] = int(selected.size)
+        result.attrs['universe'] = len(frame)
+        return result
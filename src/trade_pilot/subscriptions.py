@@ -0,0 +1,403 @@
+"""
+Websocket 订阅管理
+在一条 websocket 连接上复用 allMids、l2Book、trades、candle、userEvents 等订阅，
+每个频道保存一个环形缓冲区，并在独立线程中把推送分发给本地订阅者
+"""
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from hyperliquid.websocket_manager import WebsocketManager, subscription_to_identifier
+
+logger = logging.getLogger(__name__)
+
+# 每条推送都是完整快照的频道：消费者来不及处理时只需要最新一条
+CONFLATED_CHANNELS = {'allMids', 'l2Book', 'bbo', 'activeAssetCtx'}
+
+
+class ChannelBuffer:
+    """
+    单个频道的推送缓冲
+
+    - history: 最近 capacity 条推送（环形缓冲区，供读取方按需查看）
+    - pending: 尚未分发给订阅者的推送；可合并频道只保留最新一条，
+      其他频道超过 max_pending 时丢弃最旧的推送并计数
+    """
+
+    def __init__(self, identifier: str, capacity: int, max_pending: int, conflate: bool):
+        self.identifier = identifier
+        self.conflate = conflate
+        self.history: Deque[Any] = deque(maxlen=capacity)
+        self.pending: Deque[Any] = deque(maxlen=1 if conflate else max_pending)
+        self.callbacks: Dict[int, Callable[[Any], None]] = {}
+        self.updated_at: Optional[float] = None
+
+        self.received = 0
+        self.delivered = 0
+        self.conflated = 0
+        self.dropped = 0
+
+    def push(self, data: Any) -> None:
+        """写入一条推送（在 websocket 线程中调用）"""
+        if len(self.pending) == self.pending.maxlen:
+            if self.conflate:
+                self.conflated += 1
+            else:
+                self.dropped += 1
+        self.pending.append(data)
+        self.history.append(data)
+        self.updated_at = time.monotonic()
+        self.received += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """频道统计信息"""
+        return {
+            'subscribers': len(self.callbacks),
+            'buffered': len(self.history),
+            'pending': len(self.pending),
+            'received': self.received,
+            'delivered': self.delivered,
+            'conflated': self.conflated,
+            'dropped': self.dropped,
+            'age': None if self.updated_at is None else time.monotonic() - self.updated_at,
+        }
+
+
+class SubscriptionManager:
+    """
+    Websocket 订阅管理器
+
+    - 所有订阅共用一条 websocket 连接（官方 SDK 的 WebsocketManager），
+      同一频道的多个本地订阅者只向交易所订阅一次
+    - websocket 线程只负责把推送写入频道缓冲区，回调在分发线程中执行，
+      慢回调不会阻塞连接
+    - 快照类频道（allMids、l2Book 等）在积压时合并为最新一条；
+      增量类频道（trades、userEvents 等）积压超过 max_pending 时丢弃最旧的推送
+    - 连接断开（on_close / on_error，或超过 stale_timeout 秒没有推送）后 connected 立即变为 False，
+      由守护线程按指数退避重新连接，并在新连接上重新订阅全部频道
+
+    示例:
+        manager = SubscriptionManager(constants.MAINNET_API_URL)
+        manager.start()
+        sub_id = manager.subscribe({"type": "l2Book", "coin": "BTC"}, on_book)
+        manager.latest({"type": "allMids"})
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        capacity: int = 256,
+        max_pending: int = 1024,
+        websocket_factory: Callable[[str], Any] = WebsocketManager,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        stale_timeout: Optional[float] = None
+    ):
+        """
+        初始化订阅管理器
+
+        Args:
+            base_url: API 地址（http/https），websocket 地址为 ws(s)://.../ws
+            capacity: 每个频道环形缓冲区保存的推送条数
+            max_pending: 增量类频道最多积压的待分发推送条数
+            websocket_factory: 创建 websocket 连接的工厂（默认使用官方 SDK 的 WebsocketManager）
+            reconnect_delay: 断线后第一次重连前的等待时间（秒），连续失败时翻倍
+            max_reconnect_delay: 重连等待时间的上限（秒）
+            stale_timeout: 超过该秒数没有任何推送时视为连接已失效并重连（None 表示不检查）
+        """
+        self.base_url = base_url
+        self.capacity = capacity
+        self.max_pending = max_pending
+        self._websocket_factory = websocket_factory
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.stale_timeout = stale_timeout
+        self._ws: Optional[Any] = None
+        # 当前连接建立的时间（monotonic），未连接时为 None
+        self._connected_at: Optional[float] = None
+        self._message_at: Optional[float] = None
+        self._supervisor: Optional[threading.Thread] = None
+
+        self.connects = 0
+        self.disconnects = 0
+
+        self._channels: Dict[str, ChannelBuffer] = {}
+        self._subscriptions: Dict[str, Dict[str, Any]] = {}
+        self._subscription_ids: Dict[int, str] = {}
+        self._next_id = 0
+        self._ready: Deque[str] = deque()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+
+    # ========== 连接 ==========
+
+    def start(self) -> None:
+        """建立 websocket 连接并启动分发线程和重连守护线程"""
+        with self._cond:
+            if self._supervisor is not None:
+                return
+            self._stop_event.clear()
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="ws-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+            self._supervisor = threading.Thread(
+                target=self._supervise, name="ws-supervisor", daemon=True
+            )
+            self._supervisor.start()
+
+    def stop(self) -> None:
+        """关闭连接并停止分发线程和重连守护线程"""
+        with self._cond:
+            ws, self._ws = self._ws, None
+            self._connected_at = None
+            self._stop_event.set()
+            self._cond.notify_all()
+        if ws is not None:
+            ws.stop()
+        for thread in (self._supervisor, self._dispatcher):
+            if thread is not None:
+                thread.join(timeout=5)
+        self._supervisor = None
+        self._dispatcher = None
+
+    @property
+    def connected(self) -> bool:
+        """websocket 是否已连接（断开后立即变为 False，重连成功后恢复）"""
+        return self._connected_at is not None
+
+    @property
+    def connected_since(self) -> Optional[float]:
+        """当前连接建立的时间（time.monotonic()），未连接时为 None"""
+        return self._connected_at
+
+    def wait_connected(self, timeout: float = 10.0) -> bool:
+        """等待连接建立，超时返回 False"""
+        deadline = time.monotonic() + timeout
+        while not self.connected:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _connect(self) -> Any:
+        """创建新连接，登记全部频道（连接建立后由 WebsocketManager 统一发送订阅）"""
+        ws = self._websocket_factory(self.base_url)
+        ws.daemon = True
+        ws.ping_sender.daemon = True
+
+        # WebsocketManager 不会在连接关闭时清除 ws_ready，连接状态由这里的回调维护
+        app = ws.ws
+        on_open = app.on_open
+
+        def handle_open(_app):
+            # 在锁内发送排队的订阅，与 subscribe() 互斥，避免新订阅既没有排队也没有发送
+            with self._cond:
+                on_open(_app)
+                if self._ws is ws:
+                    self._connected_at = time.monotonic()
+                    self.connects += 1
+            logger.info(f"Websocket 已连接: {self.base_url}")
+
+        def handle_close(_app, *args):
+            self._mark_disconnected(ws)
+
+        def handle_error(_app, error):
+            logger.warning(f"Websocket 连接错误: {error}")
+            self._mark_disconnected(ws)
+
+        app.on_open = handle_open
+        app.on_close = handle_close
+        app.on_error = handle_error
+
+        self._ws = ws
+        self._message_at = None
+        for identifier, subscription in self._subscriptions.items():
+            ws.subscribe(subscription, self._make_handler(identifier))
+        ws.start()
+        return ws
+
+    def _mark_disconnected(self, ws: Any) -> None:
+        with self._cond:
+            if self._ws is ws and self._connected_at is not None:
+                self._connected_at = None
+                self.disconnects += 1
+
+    def _supervise(self) -> None:
+        """连接守护线程：等待当前连接结束，按指数退避重连"""
+        delay = self.reconnect_delay
+        while True:
+            with self._cond:
+                if self._stop_event.is_set():
+                    return
+                ws = self._connect()
+
+            opened = self._watch(ws)
+            self._mark_disconnected(ws)
+            ws.stop()
+            if self._stop_event.is_set():
+                return
+
+            # 连接成功建立过则从最短等待时间重新开始退避
+            if opened:
+                delay = self.reconnect_delay
+            logger.warning(f"Websocket 连接已断开，{delay:.1f} 秒后重连")
+            if self._stop_event.wait(delay):
+                return
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _watch(self, ws: Any) -> bool:
+        """等待连接结束（或超过 stale_timeout 没有推送时主动关闭），返回连接是否建立过"""
+        opened = False
+        while ws.is_alive() and not self._stop_event.is_set():
+            ws.join(timeout=0.2)
+            connected_at = self._connected_at
+            if connected_at is None:
+                if opened:
+                    break
+                continue
+            opened = True
+            if self.stale_timeout is not None:
+                last = max(connected_at, self._message_at or connected_at)
+                if time.monotonic() - last > self.stale_timeout:
+                    logger.warning(f"Websocket 超过 {self.stale_timeout} 秒没有推送，重新连接")
+                    break
+        return opened
+
+    # ========== 订阅 ==========
+
+    def subscribe(self, subscription: Dict[str, Any], callback: Optional[Callable[[Any], None]] = None) -> int:
+        """
+        订阅频道
+
+        Args:
+            subscription: 订阅参数，例如 {"type": "l2Book", "coin": "BTC"}
+            callback: 回调函数，参数为推送的 data 字段（在分发线程中调用）；
+                为 None 时只写入缓冲区，通过 latest() / history() 读取
+
+        Returns:
+            订阅 ID（用于 unsubscribe）
+        """
+        identifier = subscription_to_identifier(subscription)
+        with self._cond:
+            channel = self._channels.get(identifier)
+            if channel is None:
+                channel = ChannelBuffer(
+                    identifier,
+                    capacity=self.capacity,
+                    max_pending=self.max_pending,
+                    conflate=subscription['type'] in CONFLATED_CHANNELS
+                )
+                self._channels[identifier] = channel
+                self._subscriptions[identifier] = subscription
+                # 连接尚未建立时由 WebsocketManager 排队；连接已断开时在重连后统一订阅
+                ws = self._ws
+                if ws is not None and (self._connected_at is not None or not ws.ws_ready):
+                    try:
+                        ws.subscribe(subscription, self._make_handler(identifier))
+                    except Exception as e:
+                        logger.warning(f"发送订阅失败 {identifier}（重连后重新订阅）: {e}")
+
+            self._next_id += 1
+            subscription_id = self._next_id
+            self._subscription_ids[subscription_id] = identifier
+            if callback is not None:
+                channel.callbacks[subscription_id] = callback
+            return subscription_id
+
+    def unsubscribe(self, subscription_id: int) -> bool:
+        """
+        取消订阅（频道的最后一个订阅者取消时保留缓冲区，但不再分发回调）
+
+        Returns:
+            是否找到该订阅
+        """
+        with self._cond:
+            identifier = self._subscription_ids.pop(subscription_id, None)
+            if identifier is None:
+                return False
+            self._channels[identifier].callbacks.pop(subscription_id, None)
+            return True
+
+    def _make_handler(self, identifier: str) -> Callable[[Dict[str, Any]], None]:
+        """创建写入频道缓冲区的 websocket 回调"""
+        def handler(ws_msg: Dict[str, Any]) -> None:
+            with self._cond:
+                self._message_at = time.monotonic()
+                channel = self._channels.get(identifier)
+                if channel is None:
+                    return
+                channel.push(ws_msg.get('data'))
+                if channel.callbacks:
+                    self._ready.append(identifier)
+                    self._cond.notify()
+                else:
+                    channel.pending.clear()
+        return handler
+
+    # ========== 分发 ==========
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready and not self._stop_event.is_set():
+                    self._cond.wait()
+                if self._stop_event.is_set():
+                    return
+                identifier = self._ready.popleft()
+                channel = self._channels[identifier]
+                batch = list(channel.pending)
+                channel.pending.clear()
+                callbacks = list(channel.callbacks.values())
+
+            for data in batch:
+                for callback in callbacks:
+                    try:
+                        callback(data)
+                    except Exception as e:
+                        logger.error(f"订阅回调执行失败 {identifier}: {e}")
+                channel.delivered += 1
+
+    # ========== 读取 ==========
+
+    def latest(self, subscription: Dict[str, Any], max_age: Optional[float] = None) -> Any:
+        """
+        频道最新一条推送
+
+        Args:
+            subscription: 订阅参数
+            max_age: 可接受的最大年龄（秒），超过时返回 None
+
+        Returns:
+            推送的 data 字段，没有数据时返回 None
+        """
+        channel = self._channels.get(subscription_to_identifier(subscription))
+        if channel is None or not channel.history:
+            return None
+        if max_age is not None and time.monotonic() - channel.updated_at > max_age:
+            return None
+        return channel.history[-1]
+
+    def history(self, subscription: Dict[str, Any], n: Optional[int] = None) -> List[Any]:
+        """频道最近 n 条推送（默认全部缓冲内容，按时间从旧到新）"""
+        channel = self._channels.get(subscription_to_identifier(subscription))
+        if channel is None:
+            return []
+        with self._cond:
+            items = list(channel.history)
+        return items if n is None else items[-n:]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """每个频道的订阅者数量、缓冲条数、接收 / 分发 / 合并 / 丢弃次数"""
+        with self._cond:
+            return {identifier: channel.stats() for identifier, channel in self._channels.items()}
+
+    def __enter__(self) -> "SubscriptionManager":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,447 @@
+"""
+合成行情生成器
+用 NumPy 按块批量生成多个交易对的相关价格路径（几何布朗运动 + 可选跳跃），
+并由同一条路径派生 L2 订单簿、逐笔成交和 K 线；给定种子时结果完全可复现，
+支持手动步进、实时和加速回放
+"""
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# 一年的秒数（年化波动率 / 漂移按此换算到每个 tick）
+YEAR_SECONDS = 365 * 24 * 3600
+
+_TIMEFRAME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400, 'M': 30 * 86400}
+
+
+def timeframe_seconds(timeframe: Union[str, int, float]) -> float:
+    """K 线周期（'1m'、'4h'、'1d' 或秒数）转换为秒数"""
+    if isinstance(timeframe, (int, float)):
+        return float(timeframe)
+    unit = _TIMEFRAME_UNITS.get(timeframe[-1:])
+    if unit is None or not timeframe[:-1].isdigit():
+        raise ValueError(f"不支持的 K 线周期: {timeframe}")
+    return float(int(timeframe[:-1]) * unit)
+
+
+class _Block:
+    """一块预生成的 tick 数据（start 起的连续 tick，数组形状为 tick 数 × 交易对数）"""
+    __slots__ = ('start', 'prices', 'volumes')
+
+    def __init__(self, start: int, prices: np.ndarray, volumes: np.ndarray):
+        self.start = start
+        self.prices = prices
+        self.volumes = volumes
+
+
+class _CandleBlock:
+    """一块 tick 数据聚合出的基础 K 线（start 为第一根 K 线的序号）"""
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, start: int, prices: np.ndarray, volumes: np.ndarray, ticks_per_candle: int):
+        count, n = prices.shape[0] // ticks_per_candle, prices.shape[1]
+        grouped = prices.reshape(count, ticks_per_candle, n)
+        self.start = start
+        # 复制首尾价格，避免 K 线引用（并因此保留）整块 tick 数组
+        self.open = grouped[:, 0].copy()
+        self.high = grouped.max(axis=1)
+        self.low = grouped.min(axis=1)
+        self.close = grouped[:, -1].copy()
+        self.volume = volumes.reshape(count, ticks_per_candle, n).sum(axis=1)
+
+
+class SyntheticMarket:
+    """
+    多交易对合成行情
+
+    - 价格：对数收益为相关的正态冲击（单因子模型，或传入完整相关矩阵）加复合泊松跳跃，
+      每次生成 block_size 个 tick × 全部交易对，单块生成一次即可服务大量查询
+    - 订单簿：以当前价为中心按 spread / level_step 生成档位，档位数量由 (种子, tick, 交易对) 决定
+    - 成交：每个 tick 一笔成交，方向由价格变动决定，数量随价格变动幅度放大
+    - K 线：生成数据块时按 candle_seconds 聚合为基础 K 线（保留 candle_history 根），
+      查询更大周期时再次聚合，当前 K 线只包含已回放到的 tick
+    - 回放：默认手动 advance()；play(speed) 按真实时间的 speed 倍推进（1 为实时）
+    - 同一组参数和种子生成的 tick 序列完全相同，与查询顺序和回放方式无关
+
+    示例:
+        market = SyntheticMarket(["BTC", "ETH"], prices={"BTC": 60000, "ETH": 3000}, seed=7)
+        market.advance(3600)
+        market.ticker("BTC")
+        market.orderbook("ETH", limit=10)
+        market.candles("BTC", "5m", limit=12)
+        market.play(speed=60)   # 每秒推进 60 秒的行情
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        prices: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None,
+        tick_seconds: float = 1.0,
+        volatility: Union[float, Dict[str, float]] = 0.8,
+        drift: float = 0.0,
+        correlation: Union[float, np.ndarray] = 0.5,
+        jump_intensity: float = 0.0,
+        jump_mean: float = 0.0,
+        jump_std: float = 0.03,
+        spread: float = 0.0001,
+        level_step: float = 0.0001,
+        level_notional: float = 50_000.0,
+        trade_notional: float = 5_000.0,
+        block_size: int = 4096,
+        candle_seconds: float = 60.0,
+        candle_history: int = 6000,
+        warmup: int = 0,
+        speed: Optional[float] = None,
+        start_time: Optional[int] = None
+    ):
+        """
+        初始化合成行情
+
+        Args:
+            symbols: 交易对列表
+            prices: 回放起点（第 warmup 个 tick）的价格 {symbol: price}，未指定的交易对为 1000
+            seed: 随机种子（None 表示每次不同）
+            tick_seconds: 每个 tick 代表的秒数
+            volatility: 年化波动率（可按交易对指定）
+            drift: 年化漂移
+            correlation: 交易对之间的相关系数（单因子模型），或 N × N 相关矩阵
+            jump_intensity: 每年的平均跳跃次数（0 表示纯几何布朗运动）
+            jump_mean: 跳跃幅度（对数收益）的均值
+            jump_std: 跳跃幅度（对数收益）的标准差
+            spread: 最优买卖价相对中间价的半价差
+            level_step: 相邻档位的价格间隔（相对中间价）
+            level_notional: 第一档的平均名义金额
+            trade_notional: 每笔成交的平均名义金额
+            block_size: 每块生成的 tick 数（向上取整为每根基础 K 线 tick 数的倍数）
+            candle_seconds: 基础 K 线周期（秒），需为 tick_seconds 的整数倍
+            candle_history: 保留的基础 K 线数量
+            warmup: 预先生成的 tick 数（回放从第 warmup 个 tick 开始，之前的数据作为历史 K 线）
+            speed: 创建后立即以该倍速回放（None 表示手动 advance）
+            start_time: 第 0 个 tick 的时间戳（毫秒），默认使当前 tick 对应当前时间
+        """
+        if not symbols:
+            raise ValueError("至少需要一个交易对")
+        self.symbols = list(symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+
+        ticks_per_candle = candle_seconds / tick_seconds
+        if ticks_per_candle < 1 or abs(ticks_per_candle - round(ticks_per_candle)) > 1e-9:
+            raise ValueError("candle_seconds 必须是 tick_seconds 的整数倍")
+        self.tick_seconds = tick_seconds
+        self.candle_seconds = candle_seconds
+        self.ticks_per_candle = int(round(ticks_per_candle))
+        self.block_size = -(-block_size // self.ticks_per_candle) * self.ticks_per_candle
+
+        self.spread = spread
+        self.level_step = level_step
+        self.level_notional = level_notional
+        self.trade_notional = trade_notional
+
+        # 每个 tick 的漂移、波动率和跳跃概率
+        dt = tick_seconds / YEAR_SECONDS
+        if isinstance(volatility, dict):
+            sigma = np.array([volatility.get(s, 0.8) for s in self.symbols], dtype=float)
+        else:
+            sigma = np.full(n, float(volatility))
+        self._sigma = sigma * math.sqrt(dt)
+        self._mu = (drift - 0.5 * sigma ** 2) * dt
+        self._jump_prob = jump_intensity * dt
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+
+        if np.ndim(correlation) == 2:
+            self._cholesky = np.linalg.cholesky(np.asarray(correlation, dtype=float))
+            self._loading = None
+        else:
+            self._cholesky = None
+            self._loading = float(correlation)
+
+        # 种子熵：价格路径用顺序生成的随机数流，订单簿档位按 (熵, tick, 交易对) 派生
+        seed_seq = np.random.SeedSequence(seed)
+        self._entropy = seed_seq.entropy
+        self._rng = np.random.default_rng(seed_seq)
+
+        initial = prices or {}
+        target = np.log(np.array([initial.get(s, 1000.0) for s in self.symbols], dtype=float))
+        self._log_price = target.copy()
+        self._generated = 0
+        self._blocks: Deque[_Block] = deque(maxlen=2)
+        candles_per_block = self.block_size // self.ticks_per_candle
+        self._candles: Deque[_CandleBlock] = deque(maxlen=-(-candle_history // candles_per_block) + 1)
+
+        self.tick = 0
+        self._ensure(warmup)
+        self.tick = warmup
+        if warmup:
+            # 预热历史按比例缩放，使回放起点的价格等于指定价格
+            self._rescale(np.exp(target - np.log(self._tick_row(warmup))))
+
+        tick_ms = tick_seconds * 1000
+        if start_time is None:
+            start_time = int(time.time() * 1000 - warmup * tick_ms)
+            candle_ms = candle_seconds * 1000
+            start_time = int(start_time // candle_ms * candle_ms)
+        self.start_time = start_time
+        self._tick_ms = tick_ms
+
+        self.speed: Optional[float] = None
+        self._play_origin = (0.0, 0)
+        if speed is not None:
+            self.play(speed)
+
+    # ========== 生成 ==========
+
+    def _generate_block(self) -> None:
+        """生成下一块 tick 数据并聚合基础 K 线"""
+        rng, size, n = self._rng, self.block_size, len(self.symbols)
+
+        # 大数组全部原地运算，避免产生临时数组
+        noise = rng.standard_normal((size, n))
+        if self._cholesky is not None:
+            noise = noise @ self._cholesky.T
+        elif self._loading:
+            rho = min(max(self._loading, 0.0), 1.0)
+            factor = rng.standard_normal((size, 1))
+            noise *= math.sqrt(1.0 - rho)
+            noise += math.sqrt(rho) * factor
+        returns = noise * self._sigma
+        returns += self._mu
+
+        if self._jump_prob > 0:
+            jumps = rng.poisson(self._jump_prob, (size, n))
+            hit = jumps > 0
+            returns[hit] += rng.normal(self.jump_mean * jumps[hit], self.jump_std * np.sqrt(jumps[hit]))
+
+        if self._generated == 0:
+            # 第 0 个 tick 为初始价格
+            returns[0] = 0.0
+        log_prices = np.cumsum(returns, axis=0, out=returns)
+        log_prices += self._log_price
+        self._log_price = log_prices[-1].copy()
+        prices = np.exp(log_prices)
+
+        # 成交量随价格变动幅度放大：|冲击| + 0.2 的均值约为 1
+        volumes = np.abs(noise, out=noise)
+        volumes += 0.2
+        volumes *= self.trade_notional
+        volumes /= prices
+
+        start = self._generated
+        self._blocks.append(_Block(start, prices, volumes))
+        self._candles.append(_CandleBlock(start // self.ticks_per_candle, prices, volumes, self.ticks_per_candle))
+        self._generated += size
+
+    def _rescale(self, factors: np.ndarray) -> None:
+        """按交易对缩放已生成的价格（成交量按名义金额不变反向缩放）"""
+        self._log_price += np.log(factors)
+        for block in self._blocks:
+            block.prices *= factors
+            block.volumes /= factors
+        for candles in self._candles:
+            for values in (candles.open, candles.high, candles.low, candles.close):
+                values *= factors
+            candles.volume /= factors
+
+    def _ensure(self, tick: int) -> None:
+        """保证 tick 所在的数据块已生成"""
+        while self._generated <= tick:
+            self._generate_block()
+
+    # ========== 回放 ==========
+
+    def advance(self, ticks: int = 1) -> int:
+        """手动推进 ticks 个 tick，返回当前 tick"""
+        if ticks < 0:
+            raise ValueError("不能回退行情")
+        self._ensure(self.tick + ticks)
+        self.tick += ticks
+        if self.speed is not None:
+            self._play_origin = (time.monotonic(), self.tick)
+        return self.tick
+
+    def play(self, speed: float = 1.0) -> None:
+        """按真实时间的 speed 倍回放（1 为实时，60 表示每秒推进一分钟）"""
+        if speed <= 0:
+            raise ValueError("回放倍速必须大于 0")
+        self.sync()
+        self.speed = speed
+        self._play_origin = (time.monotonic(), self.tick)
+
+    def pause(self) -> None:
+        """停止自动回放（之后只能手动 advance）"""
+        self.sync()
+        self.speed = None
+
+    def sync(self) -> int:
+        """回放模式下按经过的真实时间推进到对应的 tick，返回当前 tick"""
+        if self.speed is not None:
+            origin_time, origin_tick = self._play_origin
+            target = origin_tick + int((time.monotonic() - origin_time) * self.speed / self.tick_seconds)
+            if target > self.tick:
+                self._ensure(target)
+                self.tick = target
+        return self.tick
+
+    def timestamp(self, tick: Optional[int] = None) -> int:
+        """tick 对应的时间戳（毫秒），默认当前 tick"""
+        return int(self.start_time + (self.sync() if tick is None else tick) * self._tick_ms)
+
+    # ========== 查询 ==========
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def _column(self, symbol: str) -> int:
+        i = self._index.get(symbol)
+        if i is None:
+            raise ValueError(f"未知交易对: {symbol}")
+        return i
+
+    def _tick_row(self, tick: int) -> np.ndarray:
+        """tick 时全部交易对的价格（tick 需在保留的数据块内）"""
+        for block in reversed(self._blocks):
+            if tick >= block.start:
+                return block.prices[tick - block.start]
+        raise ValueError(f"tick {tick} 已不在保留的数据中")
+
+    def price(self, symbol: str) -> float:
+        """当前价格"""
+        return float(self._tick_row(self.sync())[self._column(symbol)])
+
+    def prices(self) -> Dict[str, float]:
+        """全部交易对的当前价格"""
+        return dict(zip(self.symbols, self._tick_row(self.sync()).tolist()))
+
+    def orderbook(self, symbol: str, limit: int = 20) -> Dict[str, Any]:
+        """当前 tick 的 L2 订单簿 {'bids': [[价格, 数量], ...], 'asks': [...]}"""
+        tick = self.sync()
+        i = self._column(symbol)
+        mid = float(self._tick_row(tick)[i])
+
+        offsets = self.spread + self.level_step * np.arange(limit)
+        # 越远的档位平均数量越大；同一 (种子, tick, 交易对) 的档位数量相同
+        rng = np.random.default_rng([self._entropy, tick, i])
+        base = self.level_notional / mid * (1.0 + 0.5 * np.arange(limit))
+        sizes = base * rng.uniform(0.2, 1.8, (2, limit))
+        return {
+            'symbol': symbol,
+            'bids': np.column_stack((mid * (1 - offsets), sizes[0])).tolist(),
+            'asks': np.column_stack((mid * (1 + offsets), sizes[1])).tolist(),
+            'timestamp': self.timestamp(tick),
+        }
+
+    def trades(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """最近 limit 个 tick 的成交（最多为保留的数据块范围）"""
+        tick = self.sync()
+        i = self._column(symbol)
+        prices, volumes, ticks = [], [], []
+        for block in self._blocks:
+            end = min(tick + 1, block.start + len(block.prices))
+            if end > block.start:
+                prices.append(block.prices[:end - block.start, i])
+                volumes.append(block.volumes[:end - block.start, i])
+                ticks.append(np.arange(block.start, end))
+        price = np.concatenate(prices)[-(limit + 1):]
+        volume = np.concatenate(volumes)[-limit:]
+        tick_ids = np.concatenate(ticks)[-limit:]
+        if len(price) > len(volume):
+            rising = np.diff(price) >= 0
+            price = price[1:]
+        else:
+            rising = np.concatenate(([True], np.diff(price) >= 0))
+        return [
+            {
+                'timestamp': self.timestamp(int(t)),
+                'price': float(p),
+                'amount': float(v),
+                'side': 'buy' if up else 'sell',
+            }
+            for t, p, v, up in zip(tick_ids, price, volume, rising)
+        ]
+
+    def candles(self, symbol: str, timeframe: Union[str, float] = '1m', limit: int = 100) -> List[List[float]]:
+        """
+        截至当前 tick 的 K 线 [[时间戳, 开, 高, 低, 收, 量], ...]（最后一根为未完成的当前 K 线）
+
+        Args:
+            symbol: 交易对
+            timeframe: K 线周期（需为 candle_seconds 的整数倍）
+            limit: 最多返回的 K 线数量（受 candle_history 限制）
+        """
+        group = timeframe_seconds(timeframe) / self.candle_seconds
+        if group < 1 or abs(group - round(group)) > 1e-9:
+            raise ValueError(f"K 线周期必须是 {self.candle_seconds:g} 秒的整数倍")
+        group = int(round(group))
+
+        tick = self.sync()
+        i = self._column(symbol)
+        candle_ms = self.candle_seconds * 1000
+        # 周期按绝对时间对齐（例如 1h K 线从整点开始）
+        offset = int(self.start_time // candle_ms)
+        current = tick // self.ticks_per_candle
+        first = ((offset + current) // group - limit + 1) * group - offset
+
+        columns: List[List[np.ndarray]] = [[], [], [], [], [], []]
+        for block in self._candles:
+            lo = max(first, block.start)
+            hi = min(current + 1, block.start + len(block.open))
+            if hi <= lo:
+                continue
+            rows = slice(lo - block.start, hi - block.start)
+            columns[0].append(np.arange(lo, hi))
+            for column, values in zip(columns[1:], (block.open, block.high, block.low, block.close, block.volume)):
+                column.append(values[rows, i])
+        if not columns[0]:
+            return []
+        index, opens, highs, lows, closes, volumes = (np.concatenate(c) for c in columns)
+
+        if index[-1] == current:
+            # 当前基础 K 线只统计到当前 tick
+            begin = current * self.ticks_per_candle
+            for block in self._blocks:
+                if block.start <= begin < block.start + len(block.prices):
+                    ticks = slice(begin - block.start, tick - block.start + 1)
+                    prices = block.prices[ticks, i]
+                    highs[-1], lows[-1], closes[-1] = prices.max(), prices.min(), prices[-1]
+                    volumes[-1] = block.volumes[ticks, i].sum()
+                    break
+
+        # 按周期再次聚合
+        keys = (index + offset) // group
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)] - 1
+        result = np.column_stack((
+            keys[starts] * group * candle_ms,
+            opens[starts],
+            np.maximum.reduceat(highs, starts),
+            np.minimum.reduceat(lows, starts),
+            closes[ends],
+            np.add.reduceat(volumes, starts),
+        ))
+        return result[-limit:].tolist()
+
+    def ticker(self, symbol: str) -> Dict[str, Any]:
+        """当前行情（最高价、最低价、成交量为最近 24 小时，受 candle_history 限制）"""
+        tick = self.sync()
+        mid = self.price(symbol)
+        day = self.candles(symbol, self.candle_seconds, limit=max(1, int(86400 // self.candle_seconds)))
+        window = np.asarray(day)
+        open_price = float(window[0, 1])
+        return {
+            'symbol': symbol,
+            'last': mid,
+            'bid': mid * (1 - self.spread),
+            'ask': mid * (1 + self.spread),
+            'high': float(window[:, 2].max()),
+            'low': float(window[:, 3].min()),
+            'open': open_price,
+            'percentage': (mid / open_price - 1) * 100,
+            'volume': float(window[:, 5].sum()),
+            'quoteVolume': float(window[:, 4] @ window[:, 5]),
+            'timestamp': self.timestamp(tick),
+        }
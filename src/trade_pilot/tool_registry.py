@@ -0,0 +1,143 @@
+"""
+工具注册表
+按名称索引 LangChain 工具，提供 O(1) 分发和调用统计
+"""
+import json
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from langchain.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+
+class ToolRegistry:
+    """
+    工具注册表
+
+    - 以工具名为键保存工具，查找为 O(1)
+    - 支持注册多组工具（例如交易工具 + 指标工具）
+    - 调用未知工具时返回结构化错误，而不是静默忽略
+    - 记录每个工具的调用次数、失败次数和耗时
+
+    示例:
+        registry = ToolRegistry(create_trading_tools(client))
+        registry.extend(my_tools)
+        result = registry.invoke("get_ticker", {"symbol": "BTC/USDC:USDC"})
+    """
+
+    def __init__(self, tools: Optional[Iterable[BaseTool]] = None):
+        """
+        初始化工具注册表
+
+        Args:
+            tools: 初始工具列表
+        """
+        self._tools: Dict[str, BaseTool] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        if tools:
+            self.extend(tools)
+
+    def register(self, tool: BaseTool, replace: bool = False) -> None:
+        """
+        注册单个工具
+
+        Args:
+            tool: LangChain 工具
+            replace: 同名工具已存在时是否覆盖
+        """
+        if tool.name in self._tools and not replace:
+            raise ValueError(f"工具已存在: {tool.name}")
+        self._tools[tool.name] = tool
+        self._stats.setdefault(tool.name, {
+            'calls': 0,
+            'errors': 0,
+            'total_time': 0.0,
+            'max_time': 0.0,
+        })
+
+    def extend(self, tools: Iterable[BaseTool], replace: bool = False) -> None:
+        """批量注册工具"""
+        for tool in tools:
+            self.register(tool, replace=replace)
+
+    def unregister(self, name: str) -> None:
+        """移除工具"""
+        self._tools.pop(name, None)
+        self._stats.pop(name, None)
+
+    def get(self, name: str) -> Optional[BaseTool]:
+        """按名称获取工具，不存在时返回 None"""
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        """已注册的工具名列表"""
+        return list(self._tools)
+
+    def tools(self) -> List[BaseTool]:
+        """已注册的工具列表（用于 bind_tools）"""
+        return list(self._tools.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def __iter__(self) -> Iterator[BaseTool]:
+        return iter(list(self._tools.values()))
+
+    def unknown_tool_error(self, name: str) -> str:
+        """未知工具的错误信息（JSON 格式）"""
+        logger.warning(f"调用了未知工具: {name}")
+        return json.dumps({
+            "error": f"未知工具: {name}",
+            "available_tools": self.names()
+        }, ensure_ascii=False)
+
+    def invoke(self, name: str, args: Dict[str, Any]) -> str:
+        """
+        调用工具并记录统计信息
+
+        Args:
+            name: 工具名
+            args: 工具参数
+
+        Returns:
+            工具返回结果（字符串）；工具不存在或执行异常时返回 JSON 格式的错误
+        """
+        tool = self._tools.get(name)
+        if tool is None:
+            return self.unknown_tool_error(name)
+
+        start = time.perf_counter()
+        failed = False
+        try:
+            return str(tool.invoke(args))
+        except Exception as e:
+            failed = True
+            logger.error(f"工具 {name} 执行失败: {e}")
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self._stats.get(name)
+                if stats is not None:
+                    stats['calls'] += 1
+                    stats['errors'] += failed
+                    stats['total_time'] += elapsed
+                    stats['max_time'] = max(stats['max_time'], elapsed)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """每个工具的调用次数、失败次数、总耗时、平均耗时和最大耗时（秒）"""
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    'avg_time': stats['total_time'] / stats['calls'] if stats['calls'] else 0.0,
+                }
+                for name, stats in self._stats.items()
+            }
@@ -2,18 +2,24 @@
 LangChain 交易工具
 将 Hyperliquid 客户端功能封装为 LangChain Tools
 """
-from typing import Optional, Type, Any, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Type, Any, Union
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
-from .hyperliquid_client import HyperliquidClient
-from .mock_client import MockHyperliquidClient
+from .indicators import IndicatorEngine
+from .screener import MarketScreener
 import json
 import logging
+import math
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
-# 客户端类型
-ClientType = Union[HyperliquidClient, MockHyperliquidClient]
+if TYPE_CHECKING:
+    from .hyperliquid_client import HyperliquidClient
+    from .mock_client import MockHyperliquidClient
+
+# 客户端类型（仅用于类型注解，不在运行时导入客户端模块）
+ClientType = Union["HyperliquidClient", "MockHyperliquidClient"]
 
 
 # ============ 工具输入模型 ============
@@ -28,15 +34,30 @@ class PlaceOrderInput(BaseModel):
     reduce_only: bool = Field(default=False, description="是否只减仓")
 
 
+class PlaceOrdersInput(BaseModel):
+    """批量下单工具输入"""
+    orders: List[PlaceOrderInput] = Field(description="订单列表，每项与 place_order 的参数相同")
+
+
 class CancelOrderInput(BaseModel):
     """取消订单工具输入"""
     order_id: str = Field(description="订单 ID")
     symbol: str = Field(description="交易对符号")
 
 
+class ModifyOrderInput(BaseModel):
+    """修改订单工具输入"""
+    order_id: str = Field(description="订单 ID")
+    symbol: str = Field(description="交易对符号")
+    side: str = Field(description="交易方向: 'buy' 或 'sell'")
+    amount: float = Field(description="新的订单数量")
+    price: float = Field(description="新的限价")
+    reduce_only: bool = Field(default=False, description="是否只减仓")
+
+
 class QueryOrderInput(BaseModel):
     """查询订单工具输入"""
-    order_id: str = Field(description="订单 ID")
+    order_id: str = Field(description="订单 ID（oid，或 0x 开头的 cloid）")
     symbol: str = Field(description="交易对符号")
 
 
@@ -55,11 +76,41 @@ class GetTickerInput(BaseModel):
     symbol: str = Field(description="交易对符号，如 'BTC/USDT:USDT'")
 
 
+class GetTickersInput(BaseModel):
+    """批量获取行情工具输入"""
+    symbols: List[str] = Field(description="交易对列表，如 ['BTC/USDT:USDT', 'ETH/USDT:USDT']")
+
+
 class ClosePositionInput(BaseModel):
     """平仓工具输入"""
     symbol: str = Field(description="交易对符号")
 
 
+class GetIndicatorsInput(BaseModel):
+    """获取技术指标工具输入"""
+    symbol: str = Field(description="交易对符号，如 'BTC/USDT:USDT'")
+    timeframe: str = Field(default="1h", description="K 线周期，如 '15m'、'1h'、'4h'、'1d'")
+    limit: int = Field(default=200, description="参与计算的 K 线数量")
+
+
+class ScreenMarketInput(BaseModel):
+    """全市场筛选工具输入"""
+    sort_by: str = Field(
+        default="volume_24h",
+        description="排序列: last、spread_bps、change_24h_pct、volume_24h、open_interest_usd、funding_rate、funding_apr_pct 等"
+    )
+    descending: bool = Field(default=True, description="是否从大到小排序（False 为从小到大，如跌幅最大、资金费率最负）")
+    limit: int = Field(default=10, description="返回的交易对数量（最多 50）")
+    filters: Optional[Dict[str, List[Optional[float]]]] = Field(
+        default=None,
+        description="区间过滤 {列名: [下限, 上限]}，null 表示不限，如 {'volume_24h': [10000000, null]}"
+    )
+    columns: Optional[List[str]] = Field(
+        default=None,
+        description="返回的列（默认 last、change_24h_pct、volume_24h、open_interest_usd、funding_rate，排序列总是包含）"
+    )
+
+
 # ============ LangChain 工具 ============
 
 class PlaceOrderTool(BaseTool):
@@ -124,13 +175,71 @@ class PlaceOrderTool(BaseTool):
                 "amount": order.get('amount'),
                 "price": order.get('price'),
                 "status": order.get('status'),
-                "type": order.get('type')
+                "type": order.get('type'),
+                **({"error": order["error"]} if order.get("error") else {})
             }, ensure_ascii=False)
         except Exception as e:
             logger.error(f"下单失败: {e}")
             return json.dumps({"error": str(e)}, ensure_ascii=False)
 
 
+class PlaceOrdersTool(BaseTool):
+    """批量下单工具"""
+    name: str = "place_orders"
+    description: str = """
+    一次提交多个订单（只需一次签名和一次请求），适合挂单阶梯、同时开多个仓位等场景。
+
+    参数:
+    - orders: 订单列表，每项包含 symbol、side、amount、order_type、price、reduce_only，
+      含义与 place_order 相同
+
+    返回: 每个订单的结果（JSON 格式），顺序与输入一致
+    """
+    args_schema: Type[BaseModel] = PlaceOrdersInput
+    client: Any = Field(default=None)
+
+    def __init__(self, client: ClientType):
+        super().__init__(client=client)
+
+    def _run(self, orders: List[Any]) -> str:
+        """执行批量下单"""
+        try:
+            requests = []
+            for order in orders:
+                if isinstance(order, BaseModel):
+                    order = order.model_dump()
+                requests.append({
+                    "symbol": order["symbol"],
+                    "side": order["side"],
+                    "amount": order["amount"],
+                    "type": order.get("order_type", "market"),
+                    "price": order.get("price"),
+                    "reduce_only": order.get("reduce_only", False),
+                })
+
+            results = self.client.place_orders(requests)
+            return json.dumps({
+                "success": all(r.get("status") != "rejected" for r in results),
+                "count": len(results),
+                "orders": [
+                    {
+                        "order_id": r.get("id"),
+                        "symbol": r.get("symbol"),
+                        "side": r.get("side"),
+                        "amount": r.get("amount"),
+                        "price": r.get("price"),
+                        "status": r.get("status"),
+                        "type": r.get("type"),
+                        **({"error": r["error"]} if r.get("error") else {})
+                    }
+                    for r in results
+                ]
+            }, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"批量下单失败: {e}")
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+
 class CancelOrderTool(BaseTool):
     """取消订单工具"""
     name: str = "cancel_order"
@@ -164,20 +273,80 @@ class CancelOrderTool(BaseTool):
             return json.dumps({"error": str(e)}, ensure_ascii=False)
 
 
+class ModifyOrderTool(BaseTool):
+    """修改订单工具"""
+    name: str = "modify_order"
+    description: str = """
+    修改未成交限价单的价格和数量（一次请求完成，比先取消再下单更快，且不会出现没有挂单的空档）。
+
+    参数:
+    - order_id: 订单 ID
+    - symbol: 交易对符号
+    - side: 'buy' 或 'sell'（与原订单一致）
+    - amount: 新的订单数量
+    - price: 新的限价
+    - reduce_only: 是否只减仓（默认 False）
+
+    返回: 修改后的订单信息（JSON 格式），交易所可能为修改后的订单分配新的订单 ID
+    """
+    args_schema: Type[BaseModel] = ModifyOrderInput
+    client: Any = Field(default=None)
+
+    def __init__(self, client: ClientType):
+        super().__init__(client=client)
+
+    def _run(
+        self,
+        order_id: str,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float,
+        reduce_only: bool = False
+    ) -> str:
+        """执行修改订单"""
+        try:
+            order = self.client.modify_order(
+                order_id=order_id,
+                symbol=symbol,
+                side=side,
+                amount=amount,
+                price=price,
+                reduce_only=reduce_only
+            )
+            if order.get('status') == 'rejected':
+                return json.dumps({"error": order.get('error', '修改订单失败'), "order_id": order_id}, ensure_ascii=False)
+
+            return json.dumps({
+                "success": True,
+                "order_id": order.get('id') or order_id,
+                "previous_order_id": order_id,
+                "symbol": order.get('symbol'),
+                "side": order.get('side'),
+                "amount": order.get('amount'),
+                "price": order.get('price'),
+                "status": order.get('status')
+            }, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"修改订单失败: {e}")
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+
 class QueryOrderStatusTool(BaseTool):
     """查询订单状态工具"""
     name: str = "query_order_status"
     description: str = """
-    查询指定订单的状态。
+    查询指定订单的状态（读取本地订单表，由推送实时更新，不会每次请求交易所）。
 
     参数:
-    - order_id: 订单 ID
+    - order_id: 订单 ID（oid，或下单时返回的 cloid）
     - symbol: 交易对符号
 
     返回: 订单详细信息（JSON 格式）
     """
     args_schema: Type[BaseModel] = QueryOrderInput
     client: Any = Field(default=None)
+    read_only: bool = True
 
     def __init__(self, client: ClientType):
         super().__init__(client=client)
@@ -189,6 +358,7 @@ class QueryOrderStatusTool(BaseTool):
             return json.dumps({
                 "success": True,
                 "order_id": order.get('id'),
+                "cloid": order.get('cloid'),
                 "symbol": order.get('symbol'),
                 "side": order.get('side'),
                 "type": order.get('type'),
@@ -197,7 +367,8 @@ class QueryOrderStatusTool(BaseTool):
                 "filled": order.get('filled'),
                 "remaining": order.get('remaining'),
                 "status": order.get('status'),
-                "timestamp": order.get('timestamp')
+                "timestamp": order.get('timestamp'),
+                "updated_at": order.get('updated_at')
             }, ensure_ascii=False)
         except Exception as e:
             logger.error(f"查询订单状态失败: {e}")
@@ -208,7 +379,7 @@ class GetOpenOrdersTool(BaseTool):
     """获取未成交订单工具"""
     name: str = "get_open_orders"
     description: str = """
-    获取当前所有未成交的订单。
+    获取当前所有未成交的订单（读取本地订单表，由推送实时更新，不会每次请求交易所）。
 
     参数:
     - symbol: 交易对符号（可选，不填则获取所有交易对的订单）
@@ -217,6 +388,7 @@ class GetOpenOrdersTool(BaseTool):
     """
     args_schema: Type[BaseModel] = GetOpenOrdersInput
     client: Any = Field(default=None)
+    read_only: bool = True
 
     def __init__(self, client: ClientType):
         super().__init__(client=client)
@@ -227,6 +399,7 @@ class GetOpenOrdersTool(BaseTool):
             orders = self.client.get_open_orders(symbol)
             orders_info = [{
                 "order_id": o.get('id'),
+                "cloid": o.get('cloid'),
                 "symbol": o.get('symbol'),
                 "side": o.get('side'),
                 "type": o.get('type'),
@@ -257,6 +430,7 @@ class GetPositionsTool(BaseTool):
     """
     args_schema: Type[BaseModel] = GetPositionsInput
     client: Any = Field(default=None)
+    read_only: bool = True
 
     def __init__(self, client: ClientType):
         super().__init__(client=client)
@@ -298,6 +472,7 @@ class GetTickerTool(BaseTool):
     """
     args_schema: Type[BaseModel] = GetTickerInput
     client: Any = Field(default=None)
+    read_only: bool = True
 
     def __init__(self, client: ClientType):
         super().__init__(client=client)
@@ -322,6 +497,70 @@ class GetTickerTool(BaseTool):
             return json.dumps({"error": str(e)}, ensure_ascii=False)
 
 
+def _table_value(value: Any) -> Any:
+    """表格单元格：数值保留 6 位有效数字，NaN 输出为 null（NumPy 标量转换为 Python 数值）"""
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(f"{value:.6g}")
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+# get_tickers 输出表的列：(列名, 行情字段)
+_TICKER_COLUMNS = [
+    ("symbol", "symbol"),
+    ("last", "last"),
+    ("bid", "bid"),
+    ("ask", "ask"),
+    ("change_24h_pct", "percentage"),
+    ("volume_24h", "quoteVolume"),
+    ("open_interest", "openInterest"),
+    ("funding_rate", "fundingRate"),
+]
+
+
+class GetTickersTool(BaseTool):
+    """批量获取行情工具"""
+    name: str = "get_tickers"
+    description: str = """
+    一次获取多个交易对的实时行情（同一份全市场快照），适合查看持仓组合或比较多个币种。
+
+    参数:
+    - symbols: 交易对列表，如 ['BTC/USDT:USDT', 'ETH/USDT:USDT']
+
+    返回: 行情表（JSON 格式，columns 为列名，rows 每行一个交易对）：
+    最新价、买一、卖一、24 小时涨跌幅（%）、24 小时成交额、持仓量、资金费率；未找到的交易对列在 missing 中
+    """
+    args_schema: Type[BaseModel] = GetTickersInput
+    client: Any = Field(default=None)
+    read_only: bool = True
+
+    def __init__(self, client: ClientType):
+        super().__init__(client=client)
+
+    def _run(self, symbols: List[str]) -> str:
+        """执行批量获取行情"""
+        try:
+            tickers = self.client.get_tickers(symbols)
+            rows = [
+                [_table_value(ticker.get(field)) for _, field in _TICKER_COLUMNS]
+                for ticker in tickers.values()
+            ]
+            result = {
+                "success": True,
+                "count": len(rows),
+                "columns": [column for column, _ in _TICKER_COLUMNS],
+                "rows": rows,
+            }
+            missing = [symbol for symbol in symbols if symbol not in tickers]
+            if missing:
+                result["missing"] = missing
+            return json.dumps(result, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"批量获取行情失败: {e}")
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+
 class ClosePositionTool(BaseTool):
     """平仓工具"""
     name: str = "close_position"
@@ -360,6 +599,110 @@ class ClosePositionTool(BaseTool):
             return json.dumps({"error": str(e)}, ensure_ascii=False)
 
 
+class GetIndicatorsTool(BaseTool):
+    """获取技术指标工具"""
+    name: str = "get_indicators"
+    description: str = """
+    计算指定交易对最新的技术指标：SMA、EMA、RSI、ATR、布林带、MACD。
+
+    参数:
+    - symbol: 交易对符号，如 'BTC/USDT:USDT'
+    - timeframe: K 线周期（默认 '1h'）
+    - limit: 参与计算的 K 线数量（默认 200）
+
+    返回: 最后一根 K 线的指标值（JSON 格式）
+    """
+    args_schema: Type[BaseModel] = GetIndicatorsInput
+    client: Any = Field(default=None)
+    engine: Any = Field(default=None)
+    read_only: bool = True
+
+    def __init__(self, client: ClientType, engine: Optional[IndicatorEngine] = None):
+        super().__init__(client=client, engine=engine or IndicatorEngine())
+
+    def _run(self, symbol: str, timeframe: str = "1h", limit: int = 200) -> str:
+        """执行指标计算"""
+        try:
+            df = self.client.fetch_ohlcv(symbol, timeframe, limit=limit)
+            latest = self.engine.latest(df, symbol, timeframe)
+            indicators = {
+                k: (float(f"{v:.6g}") if isinstance(v, float) else v)
+                for k, v in latest.items()
+            }
+            return json.dumps({
+                "success": True,
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "bars": len(df),
+                "indicators": indicators
+            }, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"计算技术指标失败: {e}")
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+
+# screen_market 默认返回的列（排序列总是包含）
+_SCREEN_COLUMNS = ['last', 'change_24h_pct', 'volume_24h', 'open_interest_usd', 'funding_rate']
+
+
+class ScreenMarketTool(BaseTool):
+    """全市场筛选工具"""
+    name: str = "screen_market"
+    description: str = """
+    在全部交易对中按条件筛选并排名（一次请求获取全市场数据），
+    例如资金费率最高 / 最低、24 小时涨幅 / 跌幅最大、成交额最大的币种。
+
+    参数:
+    - sort_by: 排序列（默认 'volume_24h'）
+    - descending: 是否从大到小排序（默认 True）
+    - limit: 返回数量（默认 10，最多 50）
+    - filters: 区间过滤，如 {'volume_24h': [10000000, null], 'funding_rate': [0, null]}
+    - columns: 返回的列（可选，默认 last、change_24h_pct、volume_24h、open_interest_usd、funding_rate）
+
+    可用列: last、bid、ask、spread_bps（买卖价差，基点）、change_24h_pct、volume_24h（USD）、
+    open_interest、open_interest_usd、funding_rate（每小时）、funding_apr_pct（年化 %）
+
+    返回: 排名表（JSON 格式，columns 为列名，rows 每行一个交易对），matched 为满足条件的数量
+    """
+    args_schema: Type[BaseModel] = ScreenMarketInput
+    client: Any = Field(default=None)
+    screener: Any = Field(default=None)
+    read_only: bool = True
+
+    def __init__(self, client: ClientType, screener: Optional[MarketScreener] = None):
+        super().__init__(client=client, screener=screener or MarketScreener(client))
+
+    def _run(
+        self,
+        sort_by: str = "volume_24h",
+        descending: bool = True,
+        limit: int = 10,
+        filters: Optional[Dict[str, List[Optional[float]]]] = None,
+        columns: Optional[List[str]] = None
+    ) -> str:
+        """执行全市场筛选"""
+        try:
+            bounds = {name: (values[0], values[1] if len(values) > 1 else None) for name, values in (filters or {}).items()}
+            result = self.screener.screen(
+                sort_by=sort_by,
+                descending=descending,
+                limit=max(1, min(limit, 50)),
+                filters=bounds,
+                columns=columns or _SCREEN_COLUMNS
+            )
+            rows = [[_table_value(v) for v in row] for row in result.reset_index().itertuples(index=False)]
+            return json.dumps({
+                "success": True,
+                "universe": result.attrs['universe'],
+                "matched": result.attrs['matched'],
+                "columns": ["symbol", *result.columns],
+                "rows": rows
+            }, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"全市场筛选失败: {e}")
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+
 def create_trading_tools(client: ClientType) -> list:
     """
     创建所有交易工具
@@ -372,11 +715,16 @@ def create_trading_tools(client: ClientType) -> list:
     """
     return [
         PlaceOrderTool(client=client),
+        PlaceOrdersTool(client=client),
         CancelOrderTool(client=client),
+        ModifyOrderTool(client=client),
         QueryOrderStatusTool(client=client),
         GetOpenOrdersTool(client=client),
         GetPositionsTool(client=client),
         GetTickerTool(client=client),
-        ClosePositionTool(client=client)
+        GetTickersTool(client=client),
+        ClosePositionTool(client=client),
+        GetIndicatorsTool(client=client),
+        ScreenMarketTool(client=client)
     ]
 
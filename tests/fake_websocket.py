@@ -0,0 +1,70 @@
+"""测试用的假 websocket 连接（接口与官方 SDK 的 WebsocketManager 一致）"""
+import threading
+import time
+
+from hyperliquid.websocket_manager import subscription_to_identifier
+
+
+class _FakeApp:
+    """模拟 websocket.WebSocketApp 的回调属性"""
+
+    def __init__(self, on_open):
+        self.on_open = on_open
+        self.on_close = None
+        self.on_error = None
+
+
+class FakeWebsocketManager(threading.Thread):
+    """与官方 SDK WebsocketManager 接口一致的假连接，由测试控制建立 / 断开"""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+        self.ws_ready = False
+        self.ws = _FakeApp(self.on_open)
+        self.ping_sender = threading.Thread(target=lambda: None)
+        self.queued = []
+        self.sent = []
+        self.handlers = {}
+        self._closed = threading.Event()
+
+    def run(self):
+        self._closed.wait()
+
+    def stop(self):
+        self._closed.set()
+
+    def on_open(self, _app):
+        self.ws_ready = True
+        for subscription, callback in self.queued:
+            self._send(subscription, callback)
+
+    def subscribe(self, subscription, callback):
+        if self.ws_ready:
+            self._send(subscription, callback)
+        else:
+            self.queued.append((subscription, callback))
+
+    def _send(self, subscription, callback):
+        self.sent.append(subscription)
+        self.handlers[subscription_to_identifier(subscription)] = callback
+
+    # 测试辅助
+    def open(self):
+        self.ws.on_open(self.ws)
+
+    def drop(self):
+        # 与 SDK 一致：连接关闭后 ws_ready 仍为 True
+        self.ws.on_close(self.ws, None, None)
+        self._closed.set()
+
+    def push(self, subscription, data):
+        self.handlers[subscription_to_identifier(subscription)]({'data': data})
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met before timeout")
+        time.sleep(0.005)
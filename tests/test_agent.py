@@ -0,0 +1,55 @@
+"""TradingAgent 只读工具的执行方式"""
+import threading
+import unittest
+
+from trade_pilot.agent import TradingAgent
+from trade_pilot.mock_client import MockHyperliquidClient
+
+
+class _RecordingClient(MockHyperliquidClient):
+    """记录 get_ticker 在哪个线程中执行"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.threads = []
+
+    def get_ticker(self, symbol):
+        self.threads.append(threading.current_thread())
+        return super().get_ticker(symbol)
+
+
+class _ConcurrentClient(_RecordingClient):
+    concurrent_reads = True
+
+
+def _ticker_calls(count):
+    return [
+        {"name": "get_ticker", "args": {"symbol": "BTC/USDT:USDT"}, "id": f"call_{i}"}
+        for i in range(count)
+    ]
+
+
+class ReadOnlyToolConcurrencyTest(unittest.TestCase):
+    def test_mock_client_reads_run_sequentially(self):
+        client = _RecordingClient()
+        agent = TradingAgent(client, openrouter_api_key="test", max_tool_concurrency=4)
+
+        messages = agent._execute_tool_calls(_ticker_calls(3))
+
+        self.assertEqual(agent.max_tool_concurrency, 1)
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(client.threads, [threading.current_thread()] * 3)
+
+    def test_thread_safe_client_reads_run_concurrently(self):
+        client = _ConcurrentClient()
+        agent = TradingAgent(client, openrouter_api_key="test", max_tool_concurrency=4)
+
+        messages = agent._execute_tool_calls(_ticker_calls(3))
+
+        self.assertEqual(agent.max_tool_concurrency, 4)
+        self.assertEqual([m.tool_call_id for m in messages], ["call_0", "call_1", "call_2"])
+        self.assertNotIn(threading.current_thread(), client.threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
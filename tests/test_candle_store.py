@@ -0,0 +1,83 @@
+"""CandleStore 磁盘文件与内存数据一致"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from trade_pilot.candle_store import CandleStore
+
+HOUR = 3600_000
+
+
+def _candles(start, count, close=100.0):
+    return pd.DataFrame({
+        'timestamp': [start + i * HOUR for i in range(count)],
+        'open': [close] * count,
+        'high': [close + 1] * count,
+        'low': [close - 1] * count,
+        'close': [close] * count,
+        'volume': [10.0] * count,
+    })
+
+
+class CandleStoreDiskTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+        self.store = CandleStore(self.directory)
+        self.path = os.path.join(self.directory, 'BTC_1h.csv')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def assertDiskMatchesMemory(self):
+        on_disk = pd.read_csv(self.path)
+        self.assertFalse(on_disk['timestamp'].duplicated().any())
+        pd.testing.assert_frame_equal(on_disk, self.store.get('BTC', '1h'), check_dtype=False)
+
+    def test_forming_candle_is_rewritten_in_place(self):
+        self.store.merge('BTC', '1h', _candles(0, 5))
+        # 每次增量拉取都会重新拉到未收盘的最后一根
+        for close in (101.0, 102.0, 103.0):
+            self.store.merge('BTC', '1h', _candles(4 * HOUR, 1, close))
+            self.assertDiskMatchesMemory()
+        self.store.merge('BTC', '1h', _candles(4 * HOUR, 3, 104.0))
+
+        self.assertDiskMatchesMemory()
+        self.assertEqual(len(pd.read_csv(self.path)), 7)
+
+    def test_new_rows_only_are_appended(self):
+        self.store.merge('BTC', '1h', _candles(0, 5))
+        # 与已存数据相同的重叠部分不重复写入
+        self.store.merge('BTC', '1h', _candles(3 * HOUR, 4))
+
+        self.assertDiskMatchesMemory()
+        self.assertEqual(len(pd.read_csv(self.path)), 7)
+
+    def test_older_bar_update_rewrites_file(self):
+        self.store.merge('BTC', '1h', _candles(0, 5))
+        self.store.merge('BTC', '1h', _candles(HOUR, 2, 99.0))
+
+        self.assertDiskMatchesMemory()
+        self.assertEqual(pd.read_csv(self.path)['close'].tolist(), [100.0, 99.0, 99.0, 100.0, 100.0])
+
+    def test_reloaded_store_updates_last_row_in_place(self):
+        self.store.merge('BTC', '1h', _candles(0, 5))
+        self.store = CandleStore(self.directory)
+        self.store.merge('BTC', '1h', _candles(4 * HOUR, 2, 105.0))
+
+        self.assertDiskMatchesMemory()
+        self.assertEqual(pd.read_csv(self.path)['close'].tolist()[-2:], [105.0, 105.0])
+
+    def test_legacy_file_with_duplicates_is_compacted(self):
+        pd.concat([_candles(0, 3), _candles(2 * HOUR, 1, 101.0)]).to_csv(self.path, index=False)
+
+        df = self.store.get('BTC', '1h')
+
+        self.assertEqual(df['close'].tolist(), [100.0, 100.0, 101.0])
+        self.assertDiskMatchesMemory()
+
+
+if __name__ == "__main__":
+    unittest.main()
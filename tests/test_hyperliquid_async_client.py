@@ -0,0 +1,97 @@
+"""AsyncHyperliquidSDKClient 未成交订单查询与批量撤单"""
+import unittest
+
+from trade_pilot.hyperliquid_async_client import AsyncHyperliquidSDKClient
+from trade_pilot.hyperliquid_parsers import parse_open_orders
+
+WALLET = "0x0000000000000000000000000000000000000001"
+PRIVATE_KEY = "0x" + "11" * 32
+
+# frontendOpenOrders 的真实响应结构
+FRONTEND_OPEN_ORDERS = [
+    {
+        "coin": "BTC", "side": "B", "limitPx": "60000.0", "sz": "0.3", "oid": 91490942,
+        "timestamp": 1718000000000, "origSz": "0.5", "cloid": "0x00000000000000000000000000000001",
+        "triggerCondition": "N/A", "isTrigger": False, "triggerPx": "0.0", "children": [],
+        "isPositionTpsl": False, "reduceOnly": False, "orderType": "Limit", "tif": "Gtc",
+    },
+    {
+        "coin": "ETH", "side": "A", "limitPx": "3500.5", "sz": "2.0", "oid": 91490943,
+        "timestamp": 1718000000100, "origSz": "2.0", "cloid": None,
+        "triggerCondition": "N/A", "isTrigger": False, "triggerPx": "0.0", "children": [],
+        "isPositionTpsl": False, "reduceOnly": True, "orderType": "Limit", "tif": "Alo",
+    },
+]
+
+# clearinghouseState 中没有挂单
+CLEARINGHOUSE_STATE = {
+    "marginSummary": {"accountValue": "1000.0", "totalNtlPos": "0.0", "totalRawUsd": "1000.0", "totalMarginUsed": "0.0"},
+    "assetPositions": [],
+    "withdrawable": "1000.0",
+    "time": 1718000000200,
+}
+
+
+class _FakeExchange:
+    def __init__(self):
+        self.cancels = []
+
+    def bulk_cancel(self, requests):
+        self.cancels.extend(requests)
+        return {"status": "ok", "response": {"type": "cancel", "data": {"statuses": ["success"] * len(requests)}}}
+
+
+class AsyncOpenOrdersTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = AsyncHyperliquidSDKClient(wallet_address=WALLET, private_key=PRIVATE_KEY)
+        self.requests = []
+
+        async def post_info(payload):
+            self.requests.append(payload)
+            if payload["type"] == "frontendOpenOrders":
+                return FRONTEND_OPEN_ORDERS
+            if payload["type"] == "clearinghouseState":
+                return CLEARINGHOUSE_STATE
+            raise AssertionError(f"unexpected request {payload}")
+
+        self.client._post_info = post_info
+        self.exchange = _FakeExchange()
+
+        async def get_exchange():
+            return self.exchange
+
+        self.client._get_exchange = get_exchange
+
+    async def test_open_orders_come_from_frontend_open_orders(self):
+        orders = await self.client.get_open_orders()
+
+        self.assertEqual(self.requests, [{"type": "frontendOpenOrders", "user": WALLET}])
+        self.assertEqual([order["id"] for order in orders], [91490942, 91490943])
+        btc = orders[0]
+        self.assertEqual(btc["symbol"], "BTC")
+        self.assertEqual(btc["side"], "buy")
+        self.assertEqual(btc["amount"], 0.5)
+        self.assertAlmostEqual(btc["filled"], 0.2)
+        self.assertEqual(btc["price"], 60000.0)
+        self.assertEqual(btc["cloid"], "0x00000000000000000000000000000001")
+        self.assertEqual(orders[1]["side"], "sell")
+
+    async def test_open_orders_filter_by_symbol(self):
+        orders = await self.client.get_open_orders("ETH/USDC:USDC")
+        self.assertEqual([order["id"] for order in orders], [91490943])
+
+    async def test_cancel_all_orders_cancels_every_open_order(self):
+        result = await self.client.cancel_all_orders()
+
+        self.assertEqual(result["cancelled_count"], 2)
+        self.assertEqual([(r["coin"], r["oid"]) for r in self.exchange.cancels], [("BTC", 91490942), ("ETH", 91490943)])
+
+
+class ParseOpenOrdersTest(unittest.TestCase):
+    def test_empty_payload(self):
+        self.assertEqual(parse_open_orders(None), [])
+        self.assertEqual(parse_open_orders([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""HyperliquidSDKClient 批量撤单后的订单表"""
+import unittest
+
+from trade_pilot.hyperliquid_sdk_client import HyperliquidSDKClient
+
+WALLET = "0x0000000000000000000000000000000000000001"
+PRIVATE_KEY = "0x" + "11" * 32
+CLOID = "0x00000000000000000000000000000001"
+
+# frontendOpenOrders 的真实响应结构
+OPEN_ORDERS = [
+    {"coin": "BTC", "side": "B", "limitPx": "60000.0", "sz": "0.5", "oid": 101, "timestamp": 1718000000000,
+     "origSz": "0.5", "cloid": CLOID, "orderType": "Limit", "tif": "Gtc", "reduceOnly": False},
+    {"coin": "ETH", "side": "A", "limitPx": "3500.0", "sz": "2.0", "oid": 102, "timestamp": 1718000000100,
+     "origSz": "2.0", "cloid": None, "orderType": "Limit", "tif": "Gtc", "reduceOnly": False},
+    {"coin": "SOL", "side": "B", "limitPx": "150.0", "sz": "10.0", "oid": 103, "timestamp": 1718000000200,
+     "origSz": "10.0", "cloid": None, "orderType": "Limit", "tif": "Gtc", "reduceOnly": False},
+]
+
+
+class _FakeExchange:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.requests = []
+
+    def bulk_cancel(self, requests):
+        self.requests = list(requests)
+        return {"status": "ok", "response": {"type": "cancel", "data": {"statuses": self.statuses}}}
+
+
+class CancelAllOrdersTest(unittest.TestCase):
+    def setUp(self):
+        self.client = HyperliquidSDKClient(
+            wallet_address=WALLET, private_key=PRIVATE_KEY,
+            custom_endpoint="https://api.example", lazy_markets=True
+        )
+        self.client._markets_loaded = True
+        self.snapshot = list(OPEN_ORDERS)
+        self.client.info.frontend_open_orders = lambda user: self.snapshot
+        # 订单表在 max_age 内不再对账，撤单结果必须直接写入订单表
+        self.client.order_index.max_age = 60.0
+
+    def test_cancelled_orders_leave_open_orders_immediately(self):
+        self.client.exchange = _FakeExchange(["success", "success", {"error": "Order was never placed"}])
+        self.assertEqual(len(self.client.get_open_orders()), 3)
+
+        result = self.client.cancel_all_orders()
+
+        self.assertEqual(result["cancelled_count"], 2)
+        self.assertEqual([order["id"] for order in self.client.get_open_orders()], [103])
+        self.assertEqual(self.client.order_index.get(CLOID)["status"], "canceled")
+        self.assertEqual(self.client.order_index.get_by_oid(102)["status"], "canceled")
+
+    def test_failed_bulk_cancel_keeps_orders_open(self):
+        self.client.exchange = _FakeExchange([])
+        self.client.exchange.bulk_cancel = lambda requests: {"status": "err", "response": "rate limited"}
+        self.client.get_open_orders()
+
+        result = self.client.cancel_all_orders()
+
+        self.assertEqual(result["cancelled_count"], 0)
+        self.assertEqual(len(self.client.get_open_orders()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
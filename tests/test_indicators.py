@@ -0,0 +1,61 @@
+"""IndicatorEngine 增量计算与全量计算一致"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from trade_pilot.indicators import IndicatorEngine
+
+HOUR = 3600_000
+
+
+def _candles(count, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    spread = close * rng.uniform(0.001, 0.01, count)
+    return pd.DataFrame({
+        'timestamp': np.arange(count, dtype='int64') * HOUR,
+        'open': np.r_[close[0], close[:-1]],
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.uniform(1, 10, count),
+    })
+
+
+class IndicatorIncrementalTest(unittest.TestCase):
+    def assertSameIndicators(self, cached, df):
+        fresh = IndicatorEngine().compute(df)
+        pd.testing.assert_frame_equal(cached.reset_index(drop=True), fresh, rtol=1e-9, atol=1e-9)
+
+    def test_sliding_window_matches_full_computation(self):
+        data = _candles(400)
+        engine = IndicatorEngine()
+        # 按 limit=150 滑动：开头的 K 线被丢弃时不能沿用旧的递推状态
+        for end in range(150, 400, 7):
+            window = data.iloc[end - 150:end].reset_index(drop=True)
+            self.assertSameIndicators(engine.compute(window, "BTC", "1h"), window)
+        self.assertEqual(engine.incremental_computations, 0)
+
+    def test_appended_bars_are_computed_incrementally(self):
+        data = _candles(400)
+        engine = IndicatorEngine()
+        for end in (200, 201, 205, 205, 260):
+            df = data.iloc[:end]
+            self.assertSameIndicators(engine.compute(df, "BTC", "1h"), df)
+        self.assertEqual(engine.full_computations, 1)
+        self.assertEqual(engine.incremental_computations, 4)
+
+    def test_updated_last_bar_matches_full_computation(self):
+        data = _candles(300)
+        engine = IndicatorEngine()
+        engine.compute(data.iloc[:250], "BTC", "1h")
+        forming = data.iloc[:250].copy()
+        forming.loc[249, ['close', 'high']] = forming.loc[249, 'close'] * 1.02
+
+        self.assertSameIndicators(engine.compute(forming, "BTC", "1h"), forming)
+        self.assertEqual(engine.incremental_computations, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""MockHyperliquidClient 改单、自成交保护和保证金检查"""
+import unittest
+
+from trade_pilot.matching_engine import MatchingEngine
+from trade_pilot.mock_client import MockHyperliquidClient
+
+BTC = 'BTC/USDT:USDT'
+
+
+class ModifyOrderTest(unittest.TestCase):
+    def setUp(self):
+        # 外部流动性每次只有 0.01 BTC，穿价后挂单只部分成交
+        self.client = MockHyperliquidClient(
+            engine=MatchingEngine(liquidity=440.0), prices={BTC: 45000.0}
+        )
+        self.order = self.client.create_limit_order(BTC, 'buy', 0.03, 44900.0)
+        self.client.set_price(BTC, 44000.0)
+
+    def test_partial_fill(self):
+        self.assertAlmostEqual(self.order['filled'], 0.01)
+        self.assertAlmostEqual(self.order['remaining'], 0.02)
+
+    def test_rejects_amount_not_above_filled(self):
+        for amount in (0.01, 0.005):
+            result = self.client.modify_order(self.order['id'], BTC, 'buy', amount, 43950.0)
+            self.assertEqual(result['status'], 'rejected')
+
+        # 原挂单保持不变，仍在订单簿和挂单索引中
+        self.assertEqual(self.order['status'], 'open')
+        self.assertEqual(self.order['amount'], 0.03)
+        self.assertEqual(self.order['price'], 44900.0)
+        self.assertAlmostEqual(self.order['remaining'], 0.02)
+        self.assertIn(self.order['id'], self.client.engine.book(BTC))
+        self.assertEqual([o['id'] for o in self.client.get_open_orders(BTC)], [self.order['id']])
+
+    def test_shrinks_to_above_filled(self):
+        result = self.client.modify_order(self.order['id'], BTC, 'buy', 0.02, 43950.0)
+        self.assertEqual(result['status'], 'open')
+        self.assertAlmostEqual(result['remaining'], 0.01)
+        self.assertEqual(self.client.engine.book(BTC).depth()['bids'], [[43950.0, result['remaining']]])
+
+
+class SelfTradeTest(unittest.TestCase):
+    def _client(self, **kwargs):
+        # 外部报价 44550 / 45450，簿内订单之间可以在外部报价以内交叉
+        return MockHyperliquidClient(
+            engine=MatchingEngine(half_spread=0.01, **kwargs), prices={BTC: 45000.0}
+        )
+
+    def test_taker_cancels_crossed_resting_order(self):
+        client = self._client()
+        sell = client.create_limit_order(BTC, 'sell', 0.01, 45000.0)
+        buy = client.create_limit_order(BTC, 'buy', 0.01, 45100.0)
+
+        self.assertEqual(sell['status'], 'canceled')
+        self.assertEqual(buy['status'], 'open')
+        self.assertEqual(buy['filled'], 0.0)
+        self.assertEqual(client.engine.fill_count, 0)
+        self.assertEqual([o['id'] for o in client.get_open_orders(BTC)], [buy['id']])
+        self.assertEqual(client.get_order_status(sell['id'], BTC)['status'], 'canceled')
+
+    def test_taker_keeps_resting_orders_it_does_not_reach(self):
+        client = self._client()
+        sell = client.create_limit_order(BTC, 'sell', 0.01, 45200.0)
+        client.create_limit_order(BTC, 'buy', 0.01, 45100.0)
+        self.assertEqual(sell['status'], 'open')
+
+    def test_self_trade_when_prevention_disabled(self):
+        client = self._client(self_trade_prevention=False)
+        sell = client.create_limit_order(BTC, 'sell', 0.01, 45000.0)
+        buy = client.create_limit_order(BTC, 'buy', 0.01, 45100.0)
+
+        self.assertEqual((sell['status'], buy['status']), ('closed', 'closed'))
+        self.assertEqual(client.engine.fill_count, 2)
+
+
+class MarginTest(unittest.TestCase):
+    def setUp(self):
+        self.client = MockHyperliquidClient(initial_balance=1000.0, prices={BTC: 45000.0})
+
+    def test_open_orders_reserve_margin(self):
+        first = self.client.create_limit_order(BTC, 'buy', 0.02, 44000.0)
+        self.assertEqual(first['status'], 'open')
+        self.assertAlmostEqual(self.client.get_balance()['used']['USDT'], 880.0)
+
+        second = self.client.create_limit_order(BTC, 'buy', 0.01, 44000.0)
+        self.assertEqual(second['status'], 'rejected')
+        self.assertIn('保证金不足', second['error'])
+
+        # 撤单释放保证金
+        self.client.cancel_order(first['id'], BTC)
+        self.assertAlmostEqual(self.client.get_balance()['used']['USDT'], 0.0)
+        self.assertEqual(self.client.create_limit_order(BTC, 'buy', 0.02, 44000.0)['status'], 'open')
+
+    def test_leverage_scales_margin(self):
+        self.client.set_leverage(BTC, 5)
+        self.assertEqual(self.client.create_limit_order(BTC, 'buy', 0.1, 44000.0)['status'], 'open')
+
+    def test_closing_orders_need_no_margin(self):
+        self.assertEqual(self.client.create_market_order(BTC, 'buy', 0.02)['status'], 'closed')
+        self.assertEqual(self.client.create_market_order(BTC, 'buy', 0.01)['status'], 'rejected')
+
+        close = self.client.create_market_order(BTC, 'sell', 0.02)
+        self.assertEqual(close['status'], 'closed')
+        self.assertEqual(self.client.get_positions(), [])
+        self.assertGreater(self.client.get_balance()['total']['USDT'], 0.0)
+
+    def test_closing_allowed_when_under_margined(self):
+        self.client.set_leverage(BTC, 10)
+        self.assertEqual(self.client.create_market_order(BTC, 'buy', 0.2)['status'], 'closed')
+        self.client.set_price(BTC, 43200.0)
+        self.assertLess(self.client.get_balance()['free']['USDT'], 0.0)
+
+        self.assertEqual(self.client.create_limit_order(BTC, 'buy', 0.01, 43000.0)['status'], 'rejected')
+        self.assertEqual(self.client.create_market_order(BTC, 'sell', 0.2)['status'], 'closed')
+        self.assertEqual(self.client.get_positions(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""OrderTracker 推送断开后回退到 max_age 对账"""
+import time
+import unittest
+
+from fake_websocket import FakeWebsocketManager, wait_until
+from trade_pilot.hyperliquid_sdk_client import HyperliquidSDKClient
+from trade_pilot.order_tracker import OrderTracker
+
+WALLET = "0x0000000000000000000000000000000000000001"
+PRIVATE_KEY = "0x" + "11" * 32
+
+
+class StreamFreshnessTest(unittest.TestCase):
+    def setUp(self):
+        self.snapshots = 0
+        self.since = None
+
+        def fetch_open_orders():
+            self.snapshots += 1
+            return []
+
+        self.tracker = OrderTracker(reconcile=fetch_open_orders, max_age=0.02, stream_resync=60.0)
+        self.tracker.attach_stream(lambda: self.since)
+
+    def test_live_stream_uses_stream_resync(self):
+        self.since = time.monotonic()
+        self.tracker.open_orders()
+        time.sleep(0.05)
+        self.tracker.open_orders()
+
+        self.assertEqual(self.snapshots, 1)
+        self.assertEqual(self.tracker.freshness()['source'], 'stream')
+
+    def test_dead_stream_reverts_to_max_age(self):
+        self.since = time.monotonic()
+        self.tracker.open_orders()
+
+        self.since = None
+        time.sleep(0.05)
+        self.tracker.open_orders()
+
+        self.assertEqual(self.snapshots, 2)
+        self.assertEqual(self.tracker.freshness()['source'], 'rest')
+        self.assertEqual(self.tracker.freshness()['max_age'], 0.02)
+
+    def test_reconnected_stream_reconciles_before_trusting_pushes(self):
+        self.since = time.monotonic()
+        self.tracker.open_orders()
+
+        # 断线期间的推送已丢失：重连后的第一次读取仍按 max_age 对账
+        time.sleep(0.05)
+        self.since = time.monotonic()
+        self.assertFalse(self.tracker.streaming())
+        self.tracker.open_orders()
+        self.assertEqual(self.snapshots, 2)
+
+        time.sleep(0.05)
+        self.tracker.open_orders()
+        self.assertEqual(self.snapshots, 2)
+        self.assertTrue(self.tracker.streaming())
+
+
+class SDKClientStreamFreshnessTest(unittest.TestCase):
+    def setUp(self):
+        self.client = HyperliquidSDKClient(
+            wallet_address=WALLET, private_key=PRIVATE_KEY,
+            custom_endpoint="https://api.example", lazy_markets=True
+        )
+        self.snapshots = 0
+
+        def fetch_open_orders():
+            self.snapshots += 1
+            return []
+
+        self.client.order_index.reconcile_fn = fetch_open_orders
+        self.client.order_index.max_age = 0.02
+        self.connections = []
+
+        def factory(base_url):
+            ws = FakeWebsocketManager(base_url)
+            self.connections.append(ws)
+            return ws
+
+        self.client.start_websocket(websocket_factory=factory, reconnect_delay=10.0)
+        wait_until(lambda: self.connections)
+
+    def tearDown(self):
+        self.client.stop_websocket()
+
+    def test_dropped_websocket_falls_back_to_max_age(self):
+        self.connections[0].open()
+        self.client.get_open_orders()
+        time.sleep(0.05)
+        self.client.get_open_orders()
+        self.assertEqual(self.snapshots, 1)
+
+        self.connections[0].drop()
+        time.sleep(0.05)
+        self.client.get_open_orders()
+
+        self.assertEqual(self.snapshots, 2)
+        self.assertEqual(self.client.order_index.freshness()['source'], 'rest')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""SubscriptionManager 断线检测与重连"""
+import time
+import unittest
+
+from hyperliquid.websocket_manager import subscription_to_identifier
+
+from fake_websocket import FakeWebsocketManager, wait_until
+from trade_pilot.subscriptions import SubscriptionManager
+
+
+class SubscriptionReconnectTest(unittest.TestCase):
+    def setUp(self):
+        self.connections = []
+
+        def factory(base_url):
+            ws = FakeWebsocketManager(base_url)
+            self.connections.append(ws)
+            return ws
+
+        self.manager = SubscriptionManager("https://api.example", websocket_factory=factory, reconnect_delay=0.01)
+        self.received = []
+        self.manager.subscribe({"type": "allMids"}, self.received.append)
+        self.manager.subscribe({"type": "l2Book", "coin": "BTC"})
+
+    def tearDown(self):
+        self.manager.stop()
+
+    def _connection(self, count):
+        wait_until(lambda: len(self.connections) >= count)
+        return self.connections[count - 1]
+
+    def test_drop_resets_connected_and_reconnect_resubscribes(self):
+        self.manager.start()
+        first = self._connection(1)
+        self.assertFalse(self.manager.connected)
+        first.open()
+        self.assertTrue(self.manager.connected)
+        since = self.manager.connected_since
+
+        first.drop()
+        self.assertFalse(self.manager.connected)
+        self.assertIsNone(self.manager.connected_since)
+        self.assertEqual(self.manager.disconnects, 1)
+
+        # 断线期间新增的订阅在重连后发送
+        self.manager.subscribe({"type": "trades", "coin": "ETH"})
+        second = self._connection(2)
+        second.open()
+
+        self.assertTrue(self.manager.connected)
+        self.assertGreater(self.manager.connected_since, since)
+        self.assertEqual(
+            sorted(subscription_to_identifier(s) for s in second.sent),
+            ["allMids", "l2Book:btc", "trades:eth"]
+        )
+        second.push({"type": "allMids"}, {"mids": {"BTC": "1"}})
+        wait_until(lambda: self.received)
+        self.assertEqual(self.received, [{"mids": {"BTC": "1"}}])
+
+    def test_stale_connection_is_replaced(self):
+        self.manager.stale_timeout = 0.05
+        self.manager.start()
+        first = self._connection(1)
+        first.open()
+
+        second = self._connection(2)
+        wait_until(lambda: not first.is_alive())
+        self.assertEqual(self.manager.disconnects, 1)
+        second.open()
+        self.assertTrue(self.manager.connected)
+
+    def test_stop_does_not_reconnect(self):
+        self.manager.start()
+        self._connection(1).open()
+        self.manager.stop()
+
+        self.assertFalse(self.manager.connected)
+        time.sleep(0.05)
+        self.assertEqual(len(self.connections), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()